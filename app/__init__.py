@@ -10,6 +10,10 @@ from app.urls import register_blueprints
 from app.utils.jwt_handlers import register_jwt_error_handlers
 from app.celery_app import make_celery
 from app.utils.exception_handler import handle_error
+from app.utils.count_cache import register_count_cache_listeners
+from app.utils.report_cache import register_report_cache_listeners
+from app.services.transaction_rollup import register_rollup_listeners
+from app.utils.query_stats import register_query_stats
 
 
 def create_app(test_config=None):
@@ -41,6 +45,18 @@ def create_app(test_config=None):
     app.celery = make_celery(app)
     handle_error(app)
 
+    # Invalidate cached list counts on committed writes
+    register_count_cache_listeners()
+
+    # Invalidate cached reports on committed writes to their data
+    register_report_cache_listeners()
+
+    # Maintain the daily transaction rollups read by reports
+    register_rollup_listeners()
+
+    # Per request query count and database time, slow query logging
+    register_query_stats(app)
+
     @app.before_request
     def validate_uuid_params():
         # Check if view_args is populated and has an 'id' key
@@ -22,6 +22,7 @@ def make_celery(app=None):
             "app.tasks.recurring_transaction",
             "app.tasks.report",
             "app.tasks.cleanup",
+            "app.tasks.reconciliation",
         ],
     )
 
@@ -49,9 +50,15 @@ def make_celery(app=None):
     )
     # Configure Celery Beat Schedule
     celery.conf.beat_schedule = {
+        "dispatch-due-recurring-transactions": {
+            "task": "dispatch_due_recurring_transactions",
+            "schedule": float(
+                os.getenv("RECURRING_DISPATCH_INTERVAL", "15")
+            ),  # seconds
+        },
         "process-recurring-transactions": {
             "task": "process_recurring_transactions",
-            "schedule": crontab(minute="*/5"),
+            "schedule": crontab(minute=0),  # Hourly sweep behind the dispatcher
         },
         "hard-delete-soft-deleted-items-daily": {
             "task": "hard_delete_soft_deleted_items",
@@ -61,6 +68,10 @@ def make_celery(app=None):
             "task": "cleanup_expired_access_tokens",
             "schedule": crontab(hour=0, minute=0),
         },
+        "reconcile-denormalized-state": {
+            "task": "reconcile_denormalized_state",
+            "schedule": crontab(minute=30),  # Hourly, throttled per chunk
+        },
     }
 
     class ContextTask(celery.Task):
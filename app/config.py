@@ -42,6 +42,67 @@ class Config:
         int(os.getenv("JWT_REFRESH_TOKEN_EXPIRES", "30")) * 24 * 60 * 60
     )  # days to seconds
 
+    # Per-worker in-memory cache of authenticated principals in front of Redis
+    PRINCIPAL_L1_CACHE_SIZE = int(os.getenv("PRINCIPAL_L1_CACHE_SIZE", "1024"))
+    PRINCIPAL_L1_CACHE_TTL = int(
+        os.getenv("PRINCIPAL_L1_CACHE_TTL", "5")
+    )  # seconds, upper bound on revocation latency if a message is missed
+    PRINCIPAL_INVALIDATION_CHANNEL = os.getenv(
+        "PRINCIPAL_INVALIDATION_CHANNEL", "principal_invalidation"
+    )
+    PRINCIPAL_REVOCATION_TTL = int(
+        os.getenv("PRINCIPAL_REVOCATION_TTL", "10")
+    )  # seconds a revoked principal may not be cached again by in-flight requests
+
+    # Parent to child user lookup cache
+    CHILD_CACHE_TTL = int(os.getenv("CHILD_CACHE_TTL", "3600"))  # seconds
+
+    # Cached total counts of paginated lists, per owner and filters
+    COUNT_CACHE_TTL = int(os.getenv("COUNT_CACHE_TTL", "300"))  # seconds
+
+    # Cached report payloads, invalidated by writes to their data
+    REPORT_CACHE_TTL = int(os.getenv("REPORT_CACHE_TTL", "600"))  # seconds
+
+    # Query instrumentation, statements slower than the threshold are logged
+    SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "200"))
+    QUERY_STATS_HEADER = (
+        os.getenv("QUERY_STATS_HEADER", "True") == "True"
+    )  # Server-Timing header with the query stats of each response
+
+    # Due recurring transactions executed per chunk and commit, 0 processes
+    # them one by one
+    RECURRING_BATCH_SIZE = int(os.getenv("RECURRING_BATCH_SIZE", "500"))
+    RECURRING_CATCH_UP_LIMIT = int(
+        os.getenv("RECURRING_CATCH_UP_LIMIT", "400")
+    )  # missed occurrences executed per item and chunk
+    RECURRING_SHARDS = int(
+        os.getenv("RECURRING_SHARDS", "4")
+    )  # parallel tasks per run, by user id range
+    RECURRING_RUN_LOCK_TTL = int(
+        os.getenv("RECURRING_RUN_LOCK_TTL", "900")
+    )  # seconds, upper bound on a run that never releases its lock
+
+    # Redis schedule of upcoming recurring executions
+    RECURRING_DISPATCH_LIMIT = int(
+        os.getenv("RECURRING_DISPATCH_LIMIT", "10000")
+    )  # executions dispatched per tick
+    RECURRING_DISPATCH_LEASE = int(
+        os.getenv("RECURRING_DISPATCH_LEASE", "120")
+    )  # seconds before an unfinished dispatched execution is handed out again
+    RECURRING_SCHEDULE_HORIZON = int(
+        os.getenv("RECURRING_SCHEDULE_HORIZON", "7200")
+    )  # seconds ahead the sweep refills the schedule
+
+    # Reconciliation of wallet balances and budget spending
+    RECONCILIATION_PARTITIONS = int(os.getenv("RECONCILIATION_PARTITIONS", "4"))
+    RECONCILIATION_CHUNK_SIZE = int(
+        os.getenv("RECONCILIATION_CHUNK_SIZE", "200")
+    )  # users per transaction
+    RECONCILIATION_CHUNK_DELAY = float(
+        os.getenv("RECONCILIATION_CHUNK_DELAY", "0.5")
+    )  # seconds between chunks
+    RECONCILIATION_LOCK_TTL = int(os.getenv("RECONCILIATION_LOCK_TTL", "3600"))
+
     # Security Timeouts
     PASSWORD_RESET_LINK_VALIDITY = int(os.getenv("PASSWORD_RESET_LINK_VALIDITY", "300"))
     PASSWORD_RESET_LINK_SEND_RATE_LIMIT = int(
@@ -83,3 +144,5 @@ class TestConfig(Config):
 
     # Run Celery tasks synchronously for testing
     CELERY_TASK_ALWAYS_EAGER = True
+
+    RECONCILIATION_CHUNK_DELAY = 0
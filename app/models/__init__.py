@@ -3,6 +3,7 @@ from app.models import (
     auth,
     category,
     transaction,
+    transaction_rollup,
     wallet,
     interwallet_transaction,
     budget,
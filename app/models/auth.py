@@ -10,13 +10,13 @@ class ActiveAccessToken(db.Model):
         """Return the current UTC time with timezone awareness"""
         return datetime.now(timezone.utc)
 
-    id = db.Column(db.UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    access_token = db.Column(db.String(500), unique=True, nullable=False)
+    jti = db.Column(db.UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = db.Column(
         db.UUID(as_uuid=True),
         db.ForeignKey("users.id", ondelete="CASCADE"),
         nullable=False,
     )
+    expires_at = db.Column(db.DateTime(timezone=True), nullable=False)
     created_at = db.Column(db.DateTime, default=utc_now)
 
     # Define relationship with User
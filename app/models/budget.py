@@ -30,6 +30,18 @@ class Budget(BaseModel):
     warning_notification_sent = db.Column(db.Boolean, nullable=False, default=False)
     exceeded_notification_sent = db.Column(db.Boolean, nullable=False, default=False)
 
+    __table_args__ = (
+        # Budget of a transaction's category and month, see find_matching_budget
+        db.Index(
+            "ix_budgets_user_category_period",
+            "user_id",
+            "category_id",
+            "year",
+            "month",
+            postgresql_where=db.text("is_deleted = false"),
+        ),
+    )
+
     # Relationship
     user = db.relationship(
         "User", backref=db.backref("budgets", lazy="dynamic", cascade="all, delete")
@@ -43,6 +43,15 @@ class RecurringTransaction(BaseModel):
         index=True,
     )
 
+    __table_args__ = (
+        # Due recurring transactions, see get_due_recurring_transactions
+        db.Index(
+            "ix_recurring_transactions_due",
+            "next_execution_at",
+            postgresql_where=db.text("is_deleted = false"),
+        ),
+    )
+
     # Relationships
     user = db.relationship(
         "User",
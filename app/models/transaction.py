@@ -35,6 +35,15 @@ class Transaction(BaseModel):
         nullable=False,
     )
 
+    # Recurring transaction occurrence this transaction executes, unique
+    # together so an occurrence is never executed twice
+    recurring_transaction_id = db.Column(
+        db.UUID(as_uuid=True),
+        db.ForeignKey("recurring_transactions.id", ondelete="SET NULL"),
+        nullable=True,
+    )
+    occurrence_at = db.Column(db.DateTime, nullable=True)
+
     # Relationships
     user = db.relationship(
         "User",
@@ -49,6 +58,34 @@ class Transaction(BaseModel):
         backref=db.backref("transactions", lazy="dynamic", cascade="all, delete"),
     )
 
+    __table_args__ = (
+        # Transaction lists newest first, see get_user_transactions. A backward
+        # scan gives the descending order of all three sort columns.
+        db.Index(
+            "ix_transactions_user_listing",
+            "user_id",
+            "is_deleted",
+            "transaction_at",
+            "created_at",
+            "id",
+        ),
+        # Idempotency key of recurring executions, see process_due_chunk
+        db.Index(
+            "ix_transactions_recurring_occurrence",
+            "recurring_transaction_id",
+            "occurrence_at",
+            unique=True,
+        ),
+        # Monthly budget spending, see calculate_month_spending
+        db.Index(
+            "ix_transactions_debit_user_category_at",
+            "user_id",
+            "category_id",
+            "transaction_at",
+            postgresql_where=db.text("is_deleted = false AND type = 'DEBIT'"),
+        ),
+    )
+
     def __repr__(self):
         return f"<Transaction {self.user_id} | {self.wallet_id} | {self.type.value} {self.amount}>"
 
@@ -0,0 +1,36 @@
+from app.extensions import db
+from app.utils.enums import TransactionType
+
+
+class TransactionDailyRollup(db.Model):
+    """
+    Daily aggregates of non deleted transactions, maintained incrementally
+    whenever a transaction is created, updated or deleted.
+    """
+
+    __tablename__ = "transaction_daily_rollups"
+
+    user_id = db.Column(
+        db.UUID(as_uuid=True),
+        db.ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    day = db.Column(db.Date, primary_key=True)
+    category_id = db.Column(
+        db.UUID(as_uuid=True),
+        db.ForeignKey("categories.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    wallet_id = db.Column(
+        db.UUID(as_uuid=True),
+        db.ForeignKey("wallets.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    type = db.Column(
+        db.Enum(TransactionType, name="transaction_type"), primary_key=True
+    )
+    total_amount = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    transaction_count = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<TransactionDailyRollup {self.user_id} | {self.day} | {self.type.value} {self.total_amount}>"
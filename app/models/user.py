@@ -1,6 +1,13 @@
+from flask import g, has_request_context
+
 from app.extensions import db, bcrypt
 from app.models.base import BaseModel
 from app.utils.logger import logger
+from app.utils.child_cache import (
+    cache_child_id,
+    get_cached_child_id,
+    invalidate_child_cache,
+)
 from app.utils.enums import UserRole, Gender
 import uuid
 
@@ -71,16 +78,36 @@ class User(BaseModel):
         return bcrypt.check_password_hash(self.password, password)
 
     def get_child(self):
-        """Get all child users for this parent"""
-        # Filter children by deletion status based on the parameter
-        relation = self.children.filter_by(is_deleted=False).first()
-
-        # Return the child user object if relation exists, otherwise None
-        return relation.child_user if relation else None
+        """
+        Get the active child user for this parent.
+        Memoized for the current request and backed by the parent->child cache.
+        """
+        memo = g.setdefault("child_users", {}) if has_request_context() else {}
+        if self.id in memo:
+            return memo[self.id]
+
+        child = None
+        child_id = get_cached_child_id(self.id)
+
+        if child_id:
+            child = db.session.get(User, uuid.UUID(child_id))
+            if child is None or child.is_deleted:
+                # Cached before the child was deleted and never invalidated
+                invalidate_child_cache(self.id)
+                child = child_id = None
+
+        if child_id is None:
+            relation = self.children.filter_by(is_deleted=False).first()
+            if relation and not relation.child_user.is_deleted:
+                child = relation.child_user
+            cache_child_id(self.id, child.id if child else None)
+
+        memo[self.id] = child
+        return child
 
     def has_child(self):
         """Check if user has any active children"""
-        return self.children.filter_by(is_deleted=False).count() > 0
+        return self.get_child() is not None
 
     def get_parent(self):
         """Get parent user for this child"""
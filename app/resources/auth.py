@@ -1,7 +1,7 @@
 import uuid
 from flask_restful import Resource
 from flask import request
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 from marshmallow import ValidationError
 from flask import g
 from app.extensions import db
@@ -81,12 +81,7 @@ class LogoutResource(Resource):
     def post(self):
         """Log out the current user by invalidating their token."""
         logger.info("Received logout request")
-        auth_header = request.headers.get("Authorization", "")
-        token = auth_header.split(" ")[1] if auth_header.startswith("Bearer ") else None
-        if not token:
-            return {"error": "Invalid authorization header"}, 401
-
-        TokenHandler.invalidate_access_token(token)
+        TokenHandler.invalidate_access_token(get_jwt()["jti"])
         return {"message": "Successfully logged out"}, 200
 
 
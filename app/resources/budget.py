@@ -15,6 +15,8 @@ from app.utils.permissions import authenticated_user, object_permission
 from app.utils.responses import validation_error_response
 from app.utils.pagination import paginate
 from app.utils.logger import logger
+from sqlalchemy.orm import joinedload
+from app.services.common import get_list_count_options
 
 
 class BudgetListResource(Resource):
@@ -54,6 +56,7 @@ class BudgetListResource(Resource):
                 query=query,
                 schema=budgets_schema,
                 endpoint="budget.budgets",
+                **get_list_count_options(user, user_role, query_params),
             )
             logger.info(f"Returned budget list to user {user.id}")
             return result, 200
@@ -93,7 +96,9 @@ class BudgetDetailResource(Resource):
     """
 
     method_decorators = [
-        object_permission(Budget),
+        object_permission(
+            Budget, scoped=True, load_options=(joinedload(Budget.category),)
+        ),
         authenticated_user,
     ]
 
@@ -17,9 +17,11 @@ from app.services.interwallet_transaction import (
     update_interwallet_transaction,
 )
 from app.utils.permissions import authenticated_user, object_permission
-from app.utils.responses import validation_error_response
+from app.utils.responses import validation_error_response, ndjson_stream_response
 from app.utils.pagination import paginate
 from app.utils.logger import logger
+from sqlalchemy.orm import joinedload
+from app.services.common import get_list_count_options
 
 
 class InterWalletTransactionListCreateResource(Resource):
@@ -51,6 +53,7 @@ class InterWalletTransactionListCreateResource(Resource):
                 query=query,
                 schema=interwallet_transactions_schema,
                 endpoint="interwallet_transaction.transactions",
+                **get_list_count_options(user, user_role, query_params),
             )
             return result, 200
         except ValidationError as err:
@@ -75,11 +78,43 @@ class InterWalletTransactionListCreateResource(Resource):
             return validation_error_response(err)
 
 
+class InterWalletTransactionStreamResource(Resource):
+    """Resource for streaming all matching interwallet transactions as NDJSON"""
+
+    method_decorators = [authenticated_user]
+
+    def get(self):
+        """Stream interwallet transactions with the same filters as the list endpoint"""
+        try:
+            user = g.user
+
+            query_params = {
+                "user_id": request.args.get("user_id"),
+                "child_id": request.args.get("child_id"),
+                "from_date": request.args.get("from_date"),
+                "to_date": request.args.get("to_date"),
+            }
+            logger.info(f"InterWalletTransaction stream requested by user {user.id}")
+
+            query = get_user_interwallet_transactions(user, g.role, query_params)
+
+            return ndjson_stream_response(query, interwallet_transaction_schema)
+        except ValidationError as err:
+            return validation_error_response(err)
+
+
 class InterWalletTransactionDetailResource(Resource):
     """Resource for retrieving, updating and deleting a specific interwallet transaction"""
 
     method_decorators = [
-        object_permission(InterWalletTransaction),
+        object_permission(
+            InterWalletTransaction,
+            scoped=True,
+            load_options=(
+                joinedload(InterWalletTransaction.source_wallet),
+                joinedload(InterWalletTransaction.destination_wallet),
+            ),
+        ),
         authenticated_user,
     ]
 
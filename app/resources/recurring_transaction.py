@@ -19,6 +19,9 @@ from app.utils.permissions import authenticated_user, object_permission
 from app.utils.responses import validation_error_response
 from app.utils.pagination import paginate
 from app.utils.logger import logger
+from app.utils.recurring_schedule import unschedule_executions
+from sqlalchemy.orm import joinedload
+from app.services.common import get_list_count_options
 
 
 class RecurringTransactionListResource(Resource):
@@ -39,6 +42,7 @@ class RecurringTransactionListResource(Resource):
                 query,
                 recurring_transactions_schema,
                 endpoint="recurring_transaction.recurring_transactions",
+                **get_list_count_options(g.user, g.role, query_params),
             )
 
         except ValidationError as err:
@@ -75,7 +79,14 @@ class RecurringTransactionDetailResource(Resource):
     """Resource for retrieving, updating and deleting a recurring transaction"""
 
     method_decorators = [
-        object_permission(RecurringTransaction),
+        object_permission(
+            RecurringTransaction,
+            scoped=True,
+            load_options=(
+                joinedload(RecurringTransaction.category),
+                joinedload(RecurringTransaction.wallet),
+            ),
+        ),
         authenticated_user,
     ]
 
@@ -131,6 +142,7 @@ class RecurringTransactionDetailResource(Resource):
         # Mark as deleted
         recurring_transaction.is_deleted = True
         db.session.commit()
+        unschedule_executions([recurring_transaction.id])
 
         logger.info(
             f"Recurring transaction {id} deleted successfully by user {g.user.id}"
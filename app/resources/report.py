@@ -2,7 +2,11 @@ from flask_restful import Resource
 from flask import g, request
 from marshmallow import ValidationError
 
-from app.services.report import generate_transaction_report, get_spending_trends
+from app.services.report import (
+    generate_transaction_report,
+    get_spending_trends,
+    get_transaction_time_series,
+)
 from app.utils.permissions import authenticated_user
 from app.utils.logger import logger
 from app.services.export_report import export_transactions
@@ -55,6 +59,27 @@ class SpendingTrendsResource(Resource):
             return {"error": str(err)}, 400
 
 
+class TransactionTimeSeriesResource(Resource):
+    """Resource for credit and debit totals bucketed by day, week or month"""
+
+    @authenticated_user
+    def get(self):
+        """Generate a gap filled time series of transaction totals"""
+        try:
+            user = g.user
+            query_params = request.args.to_dict()
+            logger.info(
+                f"User {user.id} requested transaction time series with params: {query_params}"
+            )
+
+            time_series = get_transaction_time_series(user, query_params)
+            logger.info(f"Transaction time series generated successfully")
+            return time_series, 200
+
+        except ValidationError as err:
+            return {"error": str(err)}, 400
+
+
 class TransactionExportResource(Resource):
     """Resource for exporting transactions"""
 
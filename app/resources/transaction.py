@@ -6,7 +6,7 @@ import copy
 from app.models.transaction import Transaction
 from app.schemas.transaction import (
     transaction_schema,
-    transactions_schema,
+    transactions_column_serializer,
     transaction_update_schema,
 )
 from app.services.transaction import (
@@ -19,9 +19,11 @@ from app.utils.permissions import (
     authenticated_user,
     object_permission,
 )
-from app.utils.responses import validation_error_response
+from app.utils.responses import validation_error_response, ndjson_stream_response
 from app.utils.pagination import paginate
 from app.utils.logger import logger
+from sqlalchemy.orm import joinedload
+from app.services.common import get_list_count_options
 
 
 class TransactionListResource(Resource):
@@ -44,7 +46,15 @@ class TransactionListResource(Resource):
 
         # Use pagination utility
         result = paginate(
-            query=query, schema=transactions_schema, endpoint="transaction.transactions"
+            query=query,
+            schema=transactions_column_serializer,
+            endpoint="transaction.transactions",
+            cursor_columns=(
+                Transaction.transaction_at,
+                Transaction.created_at,
+                Transaction.id,
+            ),
+            **get_list_count_options(user, user_role, query_params),
         )
 
         logger.info(f"Returned transactions to user {user.id}")
@@ -75,11 +85,39 @@ class TransactionListResource(Resource):
             return validation_error_response(err)
 
 
+class TransactionStreamResource(Resource):
+    """Resource for streaming all matching transactions as NDJSON"""
+
+    method_decorators = [authenticated_user]
+
+    def get(self):
+        """Stream transactions with the same filters as the list endpoint"""
+        try:
+            user = g.user
+            query_params = request.args.to_dict()
+
+            logger.info(
+                f"User {user.id} requested transactions stream with filters: {query_params}"
+            )
+            query = get_user_transactions(user, g.role, query_params)
+
+            return ndjson_stream_response(query, transaction_schema)
+        except ValidationError as err:
+            return validation_error_response(err)
+
+
 class TransactionDetailResource(Resource):
     """Resource for retrieving, updating and deleting a transaction"""
 
     method_decorators = [
-        object_permission(Transaction),
+        object_permission(
+            Transaction,
+            scoped=True,
+            load_options=(
+                joinedload(Transaction.category),
+                joinedload(Transaction.wallet),
+            ),
+        ),
         authenticated_user,
     ]
 
@@ -7,7 +7,7 @@ from app.models.wallet import Wallet
 from app.models.user import User
 from app.schemas.wallet import (
     wallet_schema,
-    wallets_schema,
+    wallets_column_serializer,
     wallet_update_schema,
 )
 from app.services.wallet import get_user_wallets, delete_wallet
@@ -19,6 +19,7 @@ from app.utils.responses import validation_error_response
 from app.utils.pagination import paginate
 from app.utils.validators import normalize_name
 from app.utils.logger import logger
+from app.services.common import get_list_count_options
 
 
 class WalletListCreateResource(Resource):
@@ -43,8 +44,9 @@ class WalletListCreateResource(Resource):
             # Return paginated response
             result = paginate(
                 query=query,
-                schema=wallets_schema,
+                schema=wallets_column_serializer,
                 endpoint="wallet.wallet-list-create",
+                **get_list_count_options(user, user_role, query_params),
             )
             return result, 200
 
@@ -85,7 +87,7 @@ class WalletDetailResource(Resource):
         - CHILD_USER: Can view, update and delete only own wallets
     """
 
-    method_decorators = [object_permission(Wallet), authenticated_user]
+    method_decorators = [object_permission(Wallet, scoped=True), authenticated_user]
 
     def get(self, id):
         """Get a specific wallet."""
@@ -20,6 +20,8 @@ class BudgetSchema(ma.SQLAlchemyAutoSchema):
         model = Budget
         load_instance = True
         include_fk = True
+        # Relationships eager loaded with their dumped columns by paginate
+        eager_load = ("category",)
         fields = (
             "id",
             "user_id",
@@ -25,6 +25,8 @@ class InterWalletTransactionSchema(ma.SQLAlchemyAutoSchema):
         model = InterWalletTransaction
         load_instance = True
         include_fk = True
+        # Relationships eager loaded with their dumped columns by paginate
+        eager_load = ("source_wallet", "destination_wallet")
         fields = (
             "id",
             "user_id",
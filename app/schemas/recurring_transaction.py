@@ -24,6 +24,8 @@ class RecurringTransactionSchema(ma.SQLAlchemyAutoSchema):
         model = RecurringTransaction
         load_instance = True
         include_fk = True
+        # Relationships eager loaded with their dumped columns by paginate
+        eager_load = ("category", "wallet")
         fields = (
             "id",
             "user_id",
@@ -15,6 +15,7 @@ from app.models.category import Category
 from app.models.user import User
 from app.models.wallet import Wallet
 from app.utils.logger import logger
+from app.utils.serializers import ColumnSerializer
 from app.utils.enums import UserRole
 from app.utils.constants import (
     AMOUNT_MIN_VALUE as min_val,
@@ -29,6 +30,8 @@ class TransactionSchema(ma.SQLAlchemyAutoSchema):
         model = Transaction
         load_instance = True
         include_fk = True
+        # Relationships eager loaded with their dumped columns by paginate
+        eager_load = ("category", "wallet")
         fields = (
             "id",
             "user_id",
@@ -176,4 +179,5 @@ class TransactionUpdateSchema(ma.SQLAlchemyAutoSchema):
 # Initialize schemas
 transaction_schema = TransactionSchema()
 transactions_schema = TransactionSchema(many=True)
+transactions_column_serializer = ColumnSerializer(transactions_schema)
 transaction_update_schema = TransactionUpdateSchema()
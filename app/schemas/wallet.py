@@ -10,6 +10,7 @@ from app.utils.constants import (
     WALLET_NAME_MAX_LENGTH as max_len,
 )
 from flask import g
+from app.utils.serializers import ColumnSerializer
 
 
 class WalletSchema(ma.SQLAlchemyAutoSchema):
@@ -141,4 +142,5 @@ class WalletUpdateSchema(ma.SQLAlchemyAutoSchema):
 # Initialize schemas
 wallet_schema = WalletSchema()
 wallets_schema = WalletSchema(many=True)
+wallets_column_serializer = ColumnSerializer(wallets_schema)
 wallet_update_schema = WalletUpdateSchema()
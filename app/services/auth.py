@@ -7,6 +7,8 @@ from sqlalchemy.exc import IntegrityError
 from app.models.user import User
 from app.utils.logger import logger
 from app.utils.tokens import TokenHandler
+from app.utils.principal_cache import invalidate_user_principals
+from app.utils.child_cache import invalidate_child_cache
 from app.tasks.auth import send_verification_email, send_password_reset_email
 from app.models.user import ParentChildRelation
 from app.models.wallet import Wallet
@@ -49,6 +51,11 @@ def create_user(user_data):
 
     db.session.commit()
 
+    # Cached principals and child lookups of the parent still point at no child
+    if "parent_id" in user_data and user_data.get("parent_id"):
+        invalidate_user_principals(user_data.get("parent_id"))
+        invalidate_child_cache(user_data.get("parent_id"))
+
     return new_user
 
 
@@ -1,7 +1,7 @@
 from datetime import datetime
 from decimal import Decimal
 from marshmallow import ValidationError
-from sqlalchemy import extract
+from sqlalchemy import func
 
 from app.utils.validators import is_valid_uuid
 from app.models.transaction import Transaction
@@ -153,6 +153,34 @@ def update_budget(updated_budget, old_budget):
         return {"error": f"Failed to update budget: {str(e)}"}, 500
 
 
+def month_bounds(month, year):
+    """
+    Half open [start, end) datetime range of a month, to compare transaction
+    times against without wrapping the column in a function
+    """
+    start = datetime(year, month, 1)
+    if month == 12:
+        return start, datetime(year + 1, 1, 1)
+    return start, datetime(year, month + 1, 1)
+
+
+def month_spending_query(user_id, category_id, month, year):
+    """
+    Query summing the debits of a user in a category over a month, served by
+    ix_transactions_debit_user_category_at
+    """
+    month_start, next_month_start = month_bounds(month, year)
+
+    return db.session.query(func.coalesce(func.sum(Transaction.amount), 0)).filter(
+        Transaction.user_id == user_id,
+        Transaction.category_id == category_id,
+        Transaction.transaction_at >= month_start,
+        Transaction.transaction_at < next_month_start,
+        Transaction.is_deleted == False,
+        Transaction.type == TransactionType.DEBIT,  # Only count expense transactions
+    )
+
+
 def calculate_month_spending(user_id, category_id, month, year):
     """
     Calculate total spending for a specific month/year/category
@@ -166,19 +194,6 @@ def calculate_month_spending(user_id, category_id, month, year):
     Returns:
         Decimal: Total spending amount
     """
-    # Query for transactions in the given month/year for this category and user
-    transactions = Transaction.query.filter(
-        Transaction.user_id == user_id,
-        Transaction.category_id == category_id,
-        extract("month", Transaction.transaction_at) == month,
-        extract("year", Transaction.transaction_at) == year,
-        Transaction.is_deleted == False,
-        Transaction.type == TransactionType.DEBIT,  # Only count expense transactions
-    ).all()
-
-    # Sum up the amounts
-    total = Decimal("0.00")
-    for transaction in transactions:
-        total += transaction.amount
+    total = month_spending_query(user_id, category_id, month, year).scalar()
 
-    return total
+    return Decimal(total).quantize(Decimal("0.01"))
@@ -2,7 +2,7 @@ from app.utils.logger import logger
 from app.utils.validators import is_valid_uuid
 from app.models.user import User
 from marshmallow import ValidationError
-from app.utils.enums import UserRole
+from app.utils.enums import UserRole, CountStrategy
 
 
 def fetch_standard_resources(
@@ -95,3 +95,34 @@ def fetch_standard_resources(
         logger.info(f"Child user {user.id} retrieving own {resource_name}s")
 
     return query
+
+
+def get_resource_owner_id(user, role, query_params={}):
+    """
+    Get the id of the single user whose resources fetch_standard_resources
+    returns for these parameters, or None for admin listings across all users.
+    """
+    if role == UserRole.ADMIN.value:
+        return query_params.get("user_id") or None
+    if role == UserRole.USER.value:
+        return query_params.get("child_id") or user.id
+    return user.id
+
+
+def get_list_count_options(user, role, query_params={}):
+    """
+    Pick how a paginated list of user owned resources counts its total.
+
+    Lists scoped to a single owner use the count cached per owner and filters,
+    admin listings across all users use the Postgres planner estimate.
+    Call it after fetch_standard_resources has validated user_id and child_id.
+
+    Returns:
+        Dict of count_strategy and count_owner_id keyword arguments for paginate
+    """
+    owner_id = get_resource_owner_id(user, role, query_params)
+
+    if not owner_id:
+        return {"count_strategy": CountStrategy.ESTIMATED}
+
+    return {"count_strategy": CountStrategy.CACHED, "count_owner_id": str(owner_id)}
@@ -4,9 +4,9 @@ from app.extensions import db
 from app.tasks.budget import check_budget_thresholds
 
 
-def find_matching_budget(transaction):
+def matching_budget_query(transaction):
     """
-    Find a budget matching a transaction's user, category, month and year.
+    Query of the budget matching a transaction's user, category, month and year.
     """
 
     # Extract transaction date components
@@ -14,16 +14,20 @@ def find_matching_budget(transaction):
     month = txn_date.month
     year = txn_date.year
 
-    # Find matching budget
-    budget = Budget.query.filter(
+    return Budget.query.filter(
         Budget.user_id == transaction.user_id,
         Budget.category_id == transaction.category_id,
         Budget.month == month,
         Budget.year == year,
         Budget.is_deleted == False,
-    ).first()
+    )
 
-    return budget
+
+def find_matching_budget(transaction):
+    """
+    Find a budget matching a transaction's user, category, month and year.
+    """
+    return matching_budget_query(transaction).first()
 
 
 def update_budget_on_transaction_created(transaction):
@@ -0,0 +1,215 @@
+import uuid
+from decimal import Decimal
+
+from sqlalchemy import and_, case, func, literal_column, select, text, update
+
+from app.extensions import db
+from app.models.budget import Budget
+from app.models.interwallet_transaction import InterWalletTransaction
+from app.models.transaction import Transaction
+from app.models.user import User
+from app.models.wallet import Wallet
+from app.utils.enums import TransactionType
+from app.utils.logger import logger
+
+UUID_SPACE = 2**128
+
+
+def partition_bounds(partition, partitions):
+    """
+    Lower (inclusive) and upper (exclusive, None for the last partition) user
+    id of one of `partitions` equal slices of the uuid space. User ids are
+    random uuids, so the slices hold about the same number of users.
+    """
+    lower = uuid.UUID(int=partition * UUID_SPACE // partitions)
+    if partition == partitions - 1:
+        return lower, None
+    return lower, uuid.UUID(int=(partition + 1) * UUID_SPACE // partitions)
+
+
+def next_user_chunk(lower_id, upper_id, chunk_size, after_id=None):
+    """
+    Next chunk of user ids in [lower_id, upper_id) after after_id, in id order.
+
+    Returns:
+        Tuple of first and last user id of the chunk, or None when done
+    """
+    query = select(User.id).where(User.id >= lower_id)
+    if upper_id is not None:
+        query = query.where(User.id < upper_id)
+    if after_id is not None:
+        query = query.where(User.id > after_id)
+    ids = db.session.scalars(query.order_by(User.id).limit(chunk_size)).all()
+    if not ids:
+        return None
+    return ids[0], ids[-1]
+
+
+def _lock_rows(model, first_id, last_id):
+    """
+    Lock the live rows of a model owned by users in [first_id, last_id],
+    skipping rows an API request is writing right now. Skipped rows are
+    picked up by the next run.
+    """
+    return (
+        select(model.id)
+        .where(
+            model.user_id >= first_id,
+            model.user_id <= last_id,
+            model.is_deleted == False,
+        )
+        .with_for_update(skip_locked=True)
+    )
+
+
+def _wallet_amount_sum(model, wallet_column, wallet_id, amount):
+    return (
+        select(func.coalesce(func.sum(amount), 0))
+        .where(wallet_column == wallet_id, model.is_deleted == False)
+        .scalar_subquery()
+    )
+
+
+def reconcile_wallet_balances(first_id, last_id):
+    """
+    Recompute the balance of the wallets of users in [first_id, last_id] from
+    their transactions and transfers and repair the ones that drifted.
+
+    Returns:
+        List of (wallet_id, recorded, expected) of the repaired wallets
+    """
+    locked = db.session.scalars(_lock_rows(Wallet, first_id, last_id)).all()
+    if not locked:
+        return []
+
+    expected = (
+        _wallet_amount_sum(
+            Transaction,
+            Transaction.wallet_id,
+            Wallet.id,
+            case(
+                (Transaction.type == TransactionType.CREDIT, Transaction.amount),
+                else_=-Transaction.amount,
+            ),
+        )
+        + _wallet_amount_sum(
+            InterWalletTransaction,
+            InterWalletTransaction.destination_wallet_id,
+            Wallet.id,
+            InterWalletTransaction.amount,
+        )
+        - _wallet_amount_sum(
+            InterWalletTransaction,
+            InterWalletTransaction.source_wallet_id,
+            Wallet.id,
+            InterWalletTransaction.amount,
+        )
+    )
+    drift = (
+        select(
+            Wallet.id.label("id"),
+            Wallet.balance.label("recorded"),
+            expected.label("expected"),
+        )
+        .where(Wallet.id.in_(locked))
+        .cte("wallet_drift")
+    )
+
+    return db.session.execute(
+        update(Wallet)
+        .where(Wallet.id == drift.c.id, drift.c.recorded != drift.c.expected)
+        .values(balance=drift.c.expected)
+        .returning(Wallet.id, drift.c.recorded, drift.c.expected),
+        execution_options={"synchronize_session": False},
+    ).all()
+
+
+def reconcile_budget_spending(first_id, last_id):
+    """
+    Recompute the spent amount of the budgets of users in [first_id, last_id]
+    from the debit transactions of their category and month and repair the
+    ones that drifted.
+
+    Returns:
+        List of (budget_id, recorded, expected) of the repaired budgets
+    """
+    locked = db.session.scalars(_lock_rows(Budget, first_id, last_id)).all()
+    if not locked:
+        return []
+
+    drift = (
+        select(
+            Budget.id.label("id"),
+            Budget.spent_amount.label("recorded"),
+            func.coalesce(func.sum(Transaction.amount), 0).label("expected"),
+        )
+        .outerjoin(
+            Transaction,
+            and_(
+                Transaction.user_id == Budget.user_id,
+                Transaction.category_id == Budget.category_id,
+                Transaction.type == TransactionType.DEBIT,
+                Transaction.is_deleted == False,
+                Transaction.transaction_at
+                >= func.make_date(Budget.year, Budget.month, 1),
+                Transaction.transaction_at
+                < func.make_date(Budget.year, Budget.month, 1)
+                + literal_column("interval '1 month'"),
+            ),
+        )
+        .where(Budget.id.in_(locked))
+        .group_by(Budget.id, Budget.spent_amount)
+        .cte("budget_drift")
+    )
+
+    return db.session.execute(
+        update(Budget)
+        .where(Budget.id == drift.c.id, drift.c.recorded != drift.c.expected)
+        .values(spent_amount=drift.c.expected)
+        .returning(Budget.id, drift.c.recorded, drift.c.expected),
+        execution_options={"synchronize_session": False},
+    ).all()
+
+
+def _log_drift(kind, rows):
+    for row_id, recorded, expected in rows:
+        logger.warning(
+            f"Reconciled {kind} {row_id}: recorded {recorded}, expected {expected}, "
+            f"drift {Decimal(expected) - Decimal(recorded)}"
+        )
+
+
+def reconcile_user_range(first_id, last_id):
+    """
+    Reconcile wallet balances and budget spending of the users in
+    [first_id, last_id] in one short transaction.
+
+    Returns:
+        Dict of drift metrics for the chunk
+    """
+    try:
+        # Give way to API requests instead of queueing behind their locks
+        db.session.execute(text("SET LOCAL lock_timeout = '2s'"))
+
+        wallets = reconcile_wallet_balances(first_id, last_id)
+        budgets = reconcile_budget_spending(first_id, last_id)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    _log_drift("wallet", wallets)
+    _log_drift("budget", budgets)
+
+    return {
+        "wallets_repaired": len(wallets),
+        "wallet_drift": sum(
+            abs(Decimal(expected) - Decimal(recorded))
+            for _, recorded, expected in wallets
+        ),
+        "budgets_repaired": len(budgets),
+        "budget_drift": sum(
+            abs(Decimal(expected) - Decimal(recorded))
+            for _, recorded, expected in budgets
+        ),
+    }
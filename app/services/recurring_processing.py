@@ -0,0 +1,360 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from flask import current_app
+from sqlalchemy import DateTime, Integer, Numeric, column, select, update, values
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import joinedload
+
+from app.extensions import db
+from app.models.budget import Budget
+from app.models.recurring_transaction import RecurringTransaction
+from app.models.transaction import Transaction
+from app.models.wallet import Wallet
+from app.services.recurring_transaction import (
+    get_due_recurring_transactions,
+    get_missed_occurrences,
+)
+from app.services.transaction_rollup import add_to_rollups
+from app.tasks.budget import check_budget_thresholds
+from app.utils.count_cache import invalidate_counts
+from app.utils.enums import TransactionType
+from app.utils.logger import logger
+from app.utils.recurring_schedule import schedule_executions, unschedule_executions
+from app.utils.report_cache import invalidate_reports
+
+
+def claim_due_chunk(
+    now, chunk_size, exclude_ids=(), lower_id=None, upper_id=None, ids=None
+):
+    """
+    Lock the next chunk of recurring transactions due at or before now,
+    oldest first, with their user, wallet and category loaded in the same
+    query. Rows locked by another worker are skipped, so concurrent runs
+    claim disjoint chunks.
+
+    Args:
+        exclude_ids: Ids to leave out, e.g. items that already failed this run
+        lower_id: Lowest user id (inclusive) to claim items of
+        upper_id: User id (exclusive) to claim items below
+        ids: Only claim among these ids, e.g. the ones the schedule has due
+    """
+    query = get_due_recurring_transactions(now).options(
+        joinedload(RecurringTransaction.user, innerjoin=True),
+        joinedload(RecurringTransaction.wallet, innerjoin=True),
+        joinedload(RecurringTransaction.category, innerjoin=True),
+    )
+    if ids is not None:
+        query = query.filter(RecurringTransaction.id.in_(ids))
+    if exclude_ids:
+        query = query.filter(RecurringTransaction.id.notin_(exclude_ids))
+    if lower_id is not None:
+        query = query.filter(RecurringTransaction.user_id >= lower_id)
+    if upper_id is not None:
+        query = query.filter(RecurringTransaction.user_id < upper_id)
+
+    return (
+        query.order_by(RecurringTransaction.next_execution_at, RecurringTransaction.id)
+        .limit(chunk_size)
+        .with_for_update(of=RecurringTransaction, skip_locked=True)
+        .all()
+    )
+
+
+def is_expired(recurring_txn):
+    """Whether a recurring transaction can not run anymore"""
+    return (
+        recurring_txn.user.is_deleted
+        or recurring_txn.wallet.is_deleted
+        or recurring_txn.category.is_deleted
+        or (
+            recurring_txn.end_at is not None
+            and recurring_txn.end_at.date() < recurring_txn.next_execution_at.date()
+        )
+    )
+
+
+def _values_table(name, columns, rows):
+    """A VALUES list usable as a table in UPDATE ... FROM"""
+    return values(
+        *(column(column_name, type_) for column_name, type_ in columns), name=name
+    ).data(rows)
+
+
+def _apply_wallet_deltas(deltas):
+    """Add the net amount of each wallet to its balance in one statement"""
+    if not deltas:
+        return
+    wallet_deltas = _values_table(
+        "wallet_deltas",
+        [("id", UUID(as_uuid=True)), ("delta", Numeric(15, 2))],
+        sorted(deltas.items()),
+    )
+    db.session.execute(
+        update(Wallet)
+        .where(Wallet.id == wallet_deltas.c.id)
+        .values(balance=Wallet.balance + wallet_deltas.c.delta),
+        execution_options={"synchronize_session": False},
+    )
+
+
+def _apply_budget_spending(spending):
+    """
+    Add debit totals by (user, category, month, year) to the spent amount of
+    the matching budgets in one statement.
+
+    Returns:
+        Ids of the updated budgets
+    """
+    if not spending:
+        return []
+    budget_spending = _values_table(
+        "budget_spending",
+        [
+            ("user_id", UUID(as_uuid=True)),
+            ("category_id", UUID(as_uuid=True)),
+            ("month", Integer()),
+            ("year", Integer()),
+            ("amount", Numeric(10, 2)),
+        ],
+        [(*key, amount) for key, amount in spending.items()],
+    )
+    return db.session.scalars(
+        update(Budget)
+        .where(
+            Budget.user_id == budget_spending.c.user_id,
+            Budget.category_id == budget_spending.c.category_id,
+            Budget.month == budget_spending.c.month,
+            Budget.year == budget_spending.c.year,
+            Budget.is_deleted == False,
+        )
+        .values(spent_amount=Budget.spent_amount + budget_spending.c.amount)
+        .returning(Budget.id),
+        execution_options={"synchronize_session": False},
+    ).all()
+
+
+def _advance_schedules(schedules):
+    """Move each recurring transaction to its next execution in one statement"""
+    if not schedules:
+        return
+    next_runs = _values_table(
+        "next_runs",
+        [
+            ("id", UUID(as_uuid=True)),
+            ("last_executed_at", DateTime()),
+            ("next_execution_at", DateTime()),
+        ],
+        schedules,
+    )
+    db.session.execute(
+        update(RecurringTransaction)
+        .where(RecurringTransaction.id == next_runs.c.id)
+        .values(
+            last_executed_at=next_runs.c.last_executed_at,
+            next_execution_at=next_runs.c.next_execution_at,
+        ),
+        execution_options={"synchronize_session": False},
+    )
+
+
+def _occurrence_key(row):
+    return row["recurring_transaction_id"], row["occurrence_at"]
+
+
+def _insert_occurrences(rows):
+    """
+    Insert the transactions of recurring occurrences in one statement,
+    skipping occurrences that already have a transaction.
+
+    Returns:
+        Dict of the ids of the inserted transactions by occurrence key
+    """
+    statement = pg_insert(Transaction).on_conflict_do_nothing(
+        index_elements=["recurring_transaction_id", "occurrence_at"]
+    )
+    result = db.session.execute(
+        statement.returning(
+            Transaction.id,
+            Transaction.recurring_transaction_id,
+            Transaction.occurrence_at,
+        ),
+        rows,
+    )
+    return {
+        (recurring_transaction_id, occurrence_at): transaction_id
+        for transaction_id, recurring_transaction_id, occurrence_at in result
+    }
+
+
+def process_due_chunk(chunk, now):
+    """
+    Execute every occurrence up to now of the recurring transactions of a
+    chunk locked by claim_due_chunk, with set based statements and one
+    commit: a bulk insert of the transactions, one update each for wallet
+    balances, budget spending and the schedules.
+
+    Items that fell several periods behind are caught up in one go, up to
+    RECURRING_CATCH_UP_LIMIT occurrences per item and chunk, with a single
+    net adjustment of each wallet and budget. Occurrences that already have
+    a transaction are skipped with all their effects.
+
+    Returns:
+        Dict with the processed and skipped item counts, the number of
+        occurrences executed and (recurring transaction id, transaction id)
+        pairs of the latest transaction created for each item
+    """
+    # At least the due occurrence, or an item would never leave the due set
+    catch_up_limit = max(1, current_app.config["RECURRING_CATCH_UP_LIMIT"])
+    try:
+        expired, due = [], []
+        for txn in chunk:
+            (expired if is_expired(txn) else due).append(txn)
+        # Read before the commit expires the loaded objects
+        expired_ids = [txn.id for txn in expired]
+        expired_user_ids = {str(txn.user_id) for txn in expired}
+
+        if expired:
+            db.session.execute(
+                update(RecurringTransaction)
+                .where(RecurringTransaction.id.in_(expired_ids))
+                .values(is_deleted=True),
+                execution_options={"synchronize_session": False},
+            )
+            logger.info(
+                f"Skipped {len(expired)} recurring transactions with invalid "
+                f"state or related objects"
+            )
+
+        rows = []
+        schedules = []
+        for txn in due:
+            occurrences, next_execution_at = get_missed_occurrences(
+                txn, now, catch_up_limit
+            )
+            for occurrence in occurrences:
+                rows.append(
+                    {
+                        "user_id": txn.user_id,
+                        "wallet_id": txn.wallet_id,
+                        "category_id": txn.category_id,
+                        "type": txn.type,
+                        "amount": txn.amount,
+                        "description": txn.description or "Recurring transaction",
+                        "transaction_at": occurrence,
+                        "recurring_transaction_id": txn.id,
+                        "occurrence_at": occurrence,
+                    }
+                )
+            schedules.append((txn.id, occurrences[-1], next_execution_at))
+
+        inserted = {}
+        budget_ids = []
+        if rows:
+            inserted = _insert_occurrences(rows)
+            duplicates = len(rows) - len(inserted)
+            if duplicates:
+                logger.warning(
+                    f"Skipped {duplicates} recurring transaction occurrences "
+                    f"that were already executed"
+                )
+            rows = [row for row in rows if _occurrence_key(row) in inserted]
+
+            wallet_deltas = defaultdict(Decimal)
+            spending = defaultdict(Decimal)
+            for row in rows:
+                if row["type"] == TransactionType.CREDIT:
+                    wallet_deltas[row["wallet_id"]] += row["amount"]
+                else:
+                    wallet_deltas[row["wallet_id"]] -= row["amount"]
+                    at = row["transaction_at"]
+                    key = (row["user_id"], row["category_id"], at.month, at.year)
+                    spending[key] += row["amount"]
+
+            _apply_wallet_deltas(wallet_deltas)
+            budget_ids = _apply_budget_spending(spending)
+            add_to_rollups(rows)
+            _advance_schedules(schedules)
+
+        db.session.commit()
+
+    except Exception:
+        db.session.rollback()
+        raise
+
+    schedule_executions(
+        {recurring_id: next_at for recurring_id, _, next_at in schedules}
+    )
+    unschedule_executions(expired_ids)
+
+    # The bulk statements bypass the cache invalidation listeners
+    for user_id in {str(row["user_id"]) for row in rows}:
+        invalidate_counts(Transaction.__tablename__, user_id)
+        invalidate_reports(user_id)
+    for user_id in expired_user_ids:
+        invalidate_counts(RecurringTransaction.__tablename__, user_id)
+
+    for budget_id in budget_ids:
+        check_budget_thresholds.delay(budget_id)
+
+    # Rows are in occurrence order, the last transaction of an item wins
+    latest = {
+        row["recurring_transaction_id"]: inserted[_occurrence_key(row)] for row in rows
+    }
+    caught_up = len(rows) - len(latest)
+    if caught_up:
+        logger.info(f"Caught up {caught_up} missed recurring transaction occurrences")
+
+    return {
+        "processed": len(due),
+        "skipped": len(expired),
+        "occurrences": len(rows),
+        "created": list(latest.items()),
+    }
+
+
+def sync_schedule(recurring_ids):
+    """
+    Put recurring transactions back in the schedule at the next execution
+    stored in the database, or take them off when they are gone or deleted.
+    """
+    executions = dict(
+        db.session.execute(
+            select(
+                RecurringTransaction.id, RecurringTransaction.next_execution_at
+            ).where(
+                RecurringTransaction.id.in_(recurring_ids),
+                RecurringTransaction.is_deleted == False,
+            )
+        ).all()
+    )
+
+    schedule_executions(executions)
+    unschedule_executions(
+        [
+            recurring_id
+            for recurring_id in recurring_ids
+            if recurring_id not in executions
+        ]
+    )
+
+
+def schedule_upcoming(until, batch_size=1000):
+    """
+    Put every live recurring transaction executing before until in the
+    schedule, to recover items the schedule lost, e.g. on a Redis restart.
+    Reads the due index range only, not the whole table.
+    """
+    statement = (
+        get_due_recurring_transactions(until)
+        .with_entities(RecurringTransaction.id, RecurringTransaction.next_execution_at)
+        .statement.execution_options(yield_per=batch_size)
+    )
+    scheduled = 0
+    for partition in db.session.execute(statement).partitions():
+        schedule_executions(dict(partition))
+        scheduled += len(partition)
+
+    logger.info(f"Scheduled {scheduled} recurring transactions due before {until}")
+    return scheduled
@@ -10,6 +10,15 @@ from app.utils.validators import is_valid_uuid
 import calendar
 from dateutil.relativedelta import relativedelta
 from app.utils.enums import TransactionType, TransactionFrequency
+from app.utils.recurring_schedule import schedule_executions
+
+
+def get_due_recurring_transactions(now):
+    """Query of the live recurring transactions due at or before now"""
+    return RecurringTransaction.query.filter(
+        RecurringTransaction.next_execution_at <= now,
+        RecurringTransaction.is_deleted == False,
+    )
 
 
 def get_user_recurring_transactions(user, role, query_params=None):
@@ -94,6 +103,10 @@ def create_recurring_transaction(recurring_transaction):
         db.session.add(recurring_transaction)
         db.session.commit()
 
+        schedule_executions(
+            {recurring_transaction.id: recurring_transaction.next_execution_at}
+        )
+
         logger.info(f"Created recurring transaction: {recurring_transaction.id}")
         return recurring_transaction
 
@@ -125,6 +138,10 @@ def update_recurring_transaction(recurring_transaction, update_data):
         # Save changes
         db.session.commit()
 
+        schedule_executions(
+            {recurring_transaction.id: recurring_transaction.next_execution_at}
+        )
+
         logger.info(f"Updated recurring transaction: {recurring_transaction.id}")
         return recurring_transaction
 
@@ -185,6 +202,35 @@ def calculate_next_execution_date(recurring_transaction, from_date=None):
     return next_date
 
 
+def get_missed_occurrences(recurring_transaction, now, limit):
+    """
+    Occurrences of a recurring transaction from its next execution up to now,
+    stopping at its end date and after limit occurrences.
+
+    Args:
+        recurring_transaction: RecurringTransaction object
+        now: Latest execution time to include
+        limit: Most occurrences to return
+    Returns:
+        tuple: List of occurrence datetimes and the next execution after them
+    """
+    occurrences = []
+    occurrence = recurring_transaction.next_execution_at
+    end_at = recurring_transaction.end_at
+
+    while (
+        occurrence <= now
+        and len(occurrences) < limit
+        and (end_at is None or occurrence.date() <= end_at.date())
+    ):
+        occurrences.append(occurrence)
+        occurrence = calculate_next_execution_date(
+            recurring_transaction, from_date=occurrence
+        )
+
+    return occurrences, occurrence
+
+
 def calculate_next_yearly_date(recurring_transaction, base_date):
     """
     Calculate next yearly execution date, properly handling leap years.
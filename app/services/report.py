@@ -1,14 +1,35 @@
-from sqlalchemy import func, case
-from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from sqlalchemy import (
+    DateTime,
+    and_,
+    case,
+    cast,
+    func,
+    literal,
+    literal_column,
+    or_,
+    select,
+    tuple_,
+)
+from datetime import datetime, timedelta, timezone
 from marshmallow import ValidationError
 
 from app.models.transaction import Transaction, TransactionType
+from app.models.transaction_rollup import TransactionDailyRollup
 from app.models.category import Category
 from app.models.wallet import Wallet
 from app.utils.logger import logger
-from app.services.common import fetch_standard_resources
+from app.utils.report_cache import (
+    cache_report,
+    get_cached_report,
+    get_report_versions,
+)
+from app.services.common import fetch_standard_resources, get_resource_owner_id
 from app.models.interwallet_transaction import InterWalletTransaction
-from app.utils.enums import UserRole
+from app.utils.enums import UserRole, TimeSeriesInterval
+from app.utils.constants import TIME_SERIES_MAX_BUCKETS
+from app.extensions import db
 
 
 def parse_and_validate_dates(start_date, end_date):
@@ -73,101 +94,279 @@ def get_interwallet_transactions_query(
     return query
 
 
+def _sum_by_type(transaction_type):
+    """Conditional sum of the amounts of one transaction type"""
+    return func.coalesce(
+        func.sum(
+            case((Transaction.type == transaction_type, Transaction.amount), else_=0)
+        ),
+        0,
+    )
+
+
+def _count_by_type(transaction_type):
+    """Conditional count of the transactions of one transaction type"""
+    return func.count(case((Transaction.type == transaction_type, Transaction.id)))
+
+
 def calculate_transaction_totals(query):
     """
-    Calculate total credit, debit, and transaction count
+    Calculate total credit and debit in a single scan
     """
-    total_credit = (
-        query.filter(Transaction.type == TransactionType.CREDIT)
-        .with_entities(func.coalesce(func.sum(Transaction.amount), 0))
-        .scalar()
+    total_credit, total_debit = query.with_entities(
+        _sum_by_type(TransactionType.CREDIT), _sum_by_type(TransactionType.DEBIT)
+    ).one()
+
+    return format(float(total_credit or 0), ".2f"), format(
+        float(total_debit or 0), ".2f"
     )
 
-    total_debit = (
-        query.filter(Transaction.type == TransactionType.DEBIT)
-        .with_entities(func.coalesce(func.sum(Transaction.amount), 0))
-        .scalar()
+
+def _split_grouping_sets(rows):
+    """Sort GROUPING SETS result rows into totals, category and wallet rows"""
+    aggregates = {
+        "total_credit": 0,
+        "total_debit": 0,
+        "categories": [],
+        "wallets": [],
+    }
+
+    # GROUPING() is 0 for the columns a result row is grouped by
+    for row in rows:
+        if row.category_grouped == 0:
+            aggregates["categories"].append(row)
+        elif row.wallet_grouped == 0:
+            aggregates["wallets"].append(row)
+        else:
+            aggregates["total_credit"] = row.total_credit or 0
+            aggregates["total_debit"] = row.total_debit or 0
+
+    return aggregates
+
+
+def _report_grouping_sets():
+    return func.grouping_sets(
+        tuple_(Category.id, Category.name),
+        tuple_(Wallet.id, Wallet.name),
+        tuple_(),
     )
 
-    return format(float(total_credit or 0), ".2f"), format(
-        float(total_debit or 0), ".2f"
+
+def aggregate_transactions(transaction_query):
+    """
+    Aggregate a filtered transaction query in a single pass.
+
+    Uses GROUPING SETS over (category), (wallet) and () so the per category
+    rows, per wallet rows and the grand totals all come out of one scan.
+
+    Returns:
+        Dict with totals and raw per category and per wallet aggregates
+    """
+    rows = (
+        transaction_query.join(Category, Transaction.category_id == Category.id)
+        .join(Wallet, Transaction.wallet_id == Wallet.id)
+        .with_entities(
+            Category.id.label("category_id"),
+            Category.name.label("category_name"),
+            Wallet.id.label("wallet_id"),
+            Wallet.name.label("wallet_name"),
+            func.grouping(Category.id).label("category_grouped"),
+            func.grouping(Wallet.id).label("wallet_grouped"),
+            _sum_by_type(TransactionType.CREDIT).label("total_credit"),
+            _sum_by_type(TransactionType.DEBIT).label("total_debit"),
+            _count_by_type(TransactionType.DEBIT).label("debit_count"),
+            func.count(Transaction.id).label("transaction_count"),
+        )
+        .group_by(_report_grouping_sets())
+        .all()
+    )
+
+    return _split_grouping_sets(rows)
+
+
+def _rollup_sum_by_type(transaction_type, column):
+    return func.coalesce(
+        func.sum(
+            case((TransactionDailyRollup.type == transaction_type, column), else_=0)
+        ),
+        0,
     )
 
 
-def get_category_summary(transaction_query):
+def aggregate_rollups(owner_id, first_day, end_day):
     """
-    Calculate category-wise summary of transactions
+    Aggregate the daily rollups of a user for the days in [first_day, end_day),
+    in the same shape as aggregate_transactions.
     """
-    category_summary = (
-        transaction_query.join(Category)
-        .group_by(Category.id, Category.name)
+    rows = (
+        TransactionDailyRollup.query.join(
+            Category, TransactionDailyRollup.category_id == Category.id
+        )
+        .join(Wallet, TransactionDailyRollup.wallet_id == Wallet.id)
+        .filter(
+            TransactionDailyRollup.user_id == owner_id,
+            TransactionDailyRollup.day >= first_day,
+            TransactionDailyRollup.day < end_day,
+            TransactionDailyRollup.transaction_count > 0,
+        )
         .with_entities(
-            Category.id,
-            Category.name,
-            func.sum(
-                case(
-                    (Transaction.type == TransactionType.CREDIT, Transaction.amount),
-                    else_=0,
-                )
+            Category.id.label("category_id"),
+            Category.name.label("category_name"),
+            Wallet.id.label("wallet_id"),
+            Wallet.name.label("wallet_name"),
+            func.grouping(Category.id).label("category_grouped"),
+            func.grouping(Wallet.id).label("wallet_grouped"),
+            _rollup_sum_by_type(
+                TransactionType.CREDIT, TransactionDailyRollup.total_amount
             ).label("total_credit"),
-            func.sum(
-                case(
-                    (Transaction.type == TransactionType.DEBIT, Transaction.amount),
-                    else_=0,
-                )
+            _rollup_sum_by_type(
+                TransactionType.DEBIT, TransactionDailyRollup.total_amount
             ).label("total_debit"),
-            func.count(Transaction.id).label("transaction_count"),
+            _rollup_sum_by_type(
+                TransactionType.DEBIT, TransactionDailyRollup.transaction_count
+            ).label("debit_count"),
+            func.coalesce(func.sum(TransactionDailyRollup.transaction_count), 0).label(
+                "transaction_count"
+            ),
         )
+        .group_by(_report_grouping_sets())
         .all()
     )
 
+    return _split_grouping_sets(rows)
+
+
+def _merge_rows(rows, id_field, name_field):
+    merged = {}
+    for row in rows:
+        entry = merged.get(getattr(row, id_field))
+        if entry is None:
+            merged[getattr(row, id_field)] = SimpleNamespace(
+                **{
+                    id_field: getattr(row, id_field),
+                    name_field: getattr(row, name_field),
+                    "total_credit": row.total_credit or 0,
+                    "total_debit": row.total_debit or 0,
+                    "debit_count": row.debit_count,
+                    "transaction_count": row.transaction_count,
+                }
+            )
+        else:
+            entry.total_credit += row.total_credit or 0
+            entry.total_debit += row.total_debit or 0
+            entry.debit_count += row.debit_count
+            entry.transaction_count += row.transaction_count
+    return list(merged.values())
+
+
+def merge_aggregates(*parts):
+    """Combine aggregates of disjoint transaction sets"""
+    return {
+        "total_credit": sum(part["total_credit"] for part in parts),
+        "total_debit": sum(part["total_debit"] for part in parts),
+        "categories": _merge_rows(
+            [row for part in parts for row in part["categories"]],
+            "category_id",
+            "category_name",
+        ),
+        "wallets": _merge_rows(
+            [row for part in parts for row in part["wallets"]],
+            "wallet_id",
+            "wallet_name",
+        ),
+    }
+
+
+def _full_day_bounds(start_date, end_date):
+    """
+    First midnight at or after start_date and the midnight right after the
+    last whole day ending by end_date (inclusive end, as parsed from the request)
+    """
+    midnight = dict(hour=0, minute=0, second=0, microsecond=0)
+    full_start = start_date.replace(**midnight)
+    if full_start < start_date:
+        full_start += timedelta(days=1)
+    full_end = (end_date + timedelta(microseconds=1)).replace(**midnight)
+    return full_start, full_end
+
+
+def aggregate_report_transactions(transaction_query, owner_id, start_date, end_date):
+    """
+    Aggregate the transactions of one owner between start_date and end_date.
+
+    Whole days are read from the daily rollups, only partial days at the edges
+    of the range are aggregated from the transactions table.
+    """
+    full_start, full_end = _full_day_bounds(start_date, end_date)
+    if not owner_id or full_start >= full_end:
+        return aggregate_transactions(transaction_query)
+
+    aggregates = aggregate_rollups(owner_id, full_start.date(), full_end.date())
+
+    if start_date < full_start or end_date >= full_end:
+        edges = aggregate_transactions(
+            transaction_query.filter(
+                or_(
+                    Transaction.transaction_at < full_start,
+                    Transaction.transaction_at >= full_end,
+                )
+            )
+        )
+        aggregates = merge_aggregates(aggregates, edges)
+
+    return aggregates
+
+
+def get_category_summary(aggregates):
+    """
+    Format the category-wise summary of aggregated transactions
+    """
     return [
         {
-            "category": {"id": str(category.id), "name": category.name},
+            "category": {
+                "id": str(category.category_id),
+                "name": category.category_name,
+            },
             "total_credit": format(float(category.total_credit or 0), ".2f"),
             "total_debit": format(float(category.total_debit or 0), ".2f"),
             "transaction_count": category.transaction_count,
         }
-        for category in category_summary
+        for category in aggregates["categories"]
     ]
 
 
-def get_wallet_summary(transaction_query):
+def get_wallet_summary(aggregates):
     """
-    Calculate wallet-wise summary of transactions (without transaction count)
+    Format the wallet-wise summary of aggregated transactions (without transaction count)
     """
-    wallet_summary = (
-        transaction_query.join(Wallet, Transaction.wallet_id == Wallet.id)
-        .group_by(Wallet.id, Wallet.name)
-        .with_entities(
-            Wallet.id,
-            Wallet.name,
-            func.sum(
-                case(
-                    (Transaction.type == TransactionType.CREDIT, Transaction.amount),
-                    else_=0,
-                )
-            ).label("total_credit"),
-            func.sum(
-                case(
-                    (Transaction.type == TransactionType.DEBIT, Transaction.amount),
-                    else_=0,
-                )
-            ).label("total_debit"),
-        )
-        .all()
-    )
-
     return [
         {
-            "wallet": {"id": str(wallet.id), "name": wallet.name},
+            "wallet": {"id": str(wallet.wallet_id), "name": wallet.wallet_name},
             "total_credit": format(float(wallet.total_credit or 0), ".2f"),
             "total_debit": format(float(wallet.total_debit or 0), ".2f"),
         }
-        for wallet in wallet_summary
+        for wallet in aggregates["wallets"]
     ]
 
 
+def _report_cache_lookup(kind, owner_id, params):
+    """
+    Look up a cached report of a single owner.
+
+    Returns:
+        Tuple of the data versions to cache a freshly built report under
+        (None when it must not be cached) and the cached payload or None
+    """
+    if not owner_id:
+        return None, None
+
+    versions = get_report_versions(owner_id)
+    if versions is None:
+        return None, None
+
+    return versions, get_cached_report(kind, owner_id, params, versions)
+
+
 def generate_transaction_report(current_user, query_params={}):
     """
     Generate a simplified transaction report including:
@@ -199,19 +398,29 @@ def generate_transaction_report(current_user, query_params={}):
         query_params=query_params,
     )
 
-    category_summary = get_category_summary(transaction_query)
-    wallet_summary = get_wallet_summary(transaction_query)
-    total_credit, total_debit = calculate_transaction_totals(transaction_query)
+    owner_id = get_resource_owner_id(current_user, current_user_role, query_params)
+    cache_params = {"start_date": start_date, "end_date": end_date}
+    versions, cached = _report_cache_lookup("transactions", owner_id, cache_params)
+    if cached is not None:
+        logger.info(f"Serving cached transactions report for user {owner_id}")
+        return cached
+
+    aggregates = aggregate_report_transactions(
+        transaction_query, owner_id, start_date, end_date
+    )
 
     report = {
         "start_date": start_date.strftime("%Y-%m-%d"),
         "end_date": end_date.strftime("%Y-%m-%d"),
-        "total_credit": total_credit,
-        "total_debit": total_debit,
-        "category_summary": category_summary,
-        "wallet_summary": wallet_summary,
+        "total_credit": format(float(aggregates["total_credit"] or 0), ".2f"),
+        "total_debit": format(float(aggregates["total_debit"] or 0), ".2f"),
+        "category_summary": get_category_summary(aggregates),
+        "wallet_summary": get_wallet_summary(aggregates),
     }
 
+    if versions:
+        cache_report("transactions", owner_id, cache_params, versions, report)
+
     logger.info(f"Transaction report generated successfully. ")
     return report
 
@@ -250,30 +459,30 @@ def get_spending_trends(current_user, query_params={}):
         end_date=end_date,
         query_params=query_params,
     )
-    total_credit, total_debit = calculate_transaction_totals(transaction_query)
+    owner_id = get_resource_owner_id(current_user, current_user_role, query_params)
+    cache_params = {"start_date": start_date, "end_date": end_date}
+    versions, cached = _report_cache_lookup("trends", owner_id, cache_params)
+    if cached is not None:
+        logger.info(f"Serving cached trends report for user {owner_id}")
+        return cached
+
+    aggregates = aggregate_report_transactions(
+        transaction_query, owner_id, start_date, end_date
+    )
 
-    total_credit = round(float(total_credit or 0), 2)
-    total_debit = round(float(total_debit or 0), 2)
+    total_credit = round(float(aggregates["total_credit"] or 0), 2)
+    total_debit = round(float(aggregates["total_debit"] or 0), 2)
 
-    # Get all debit transactions grouped by category
-    category_transactions = (
-        transaction_query.join(Category, Transaction.category_id == Category.id)
-        .filter(Transaction.type == TransactionType.DEBIT)
-        .with_entities(
-            Category.id,
-            Category.name,
-            func.sum(Transaction.amount).label("total_amount"),
-            func.count(Transaction.id).label("transaction_count"),
-        )
-        .group_by(Category.id, Category.name)
-        .all()
-    )
+    # Categories with debit transactions, from the same aggregation as reports
+    category_transactions = [
+        category for category in aggregates["categories"] if category.debit_count > 0
+    ]
     spending_trends = []
 
     for result in category_transactions:
-        category_id = str(result.id)
+        category_id = str(result.category_id)
         total_amount = round(
-            float(result.total_amount or 0), 2
+            float(result.total_debit or 0), 2
         )  # Convert Decimal to float
 
         percentage = format(
@@ -282,10 +491,10 @@ def get_spending_trends(current_user, query_params={}):
 
         spending_trends.append(
             {
-                "category": {"id": category_id, "name": result.name},
+                "category": {"id": category_id, "name": result.category_name},
                 "amount": format(total_amount, ".2f"),
                 "percentage": percentage,
-                "transaction_count": result.transaction_count,
+                "transaction_count": result.debit_count,
             }
         )
     spending_trends.sort(key=lambda x: x["amount"], reverse=True)
@@ -301,4 +510,227 @@ def get_spending_trends(current_user, query_params={}):
         f"Spending trends generated successfully with {len(spending_trends)} categories"
     )
 
+    if versions:
+        cache_report("trends", owner_id, cache_params, versions, trends_data)
+
     return trends_data
+
+
+def parse_time_series_interval(interval):
+    """Parse the bucket size of a time series, months by default"""
+    try:
+        return TimeSeriesInterval((interval or "month").upper())
+    except ValueError:
+        raise ValidationError(
+            "Invalid interval. Use one of: "
+            + ", ".join(i.value.lower() for i in TimeSeriesInterval)
+        )
+
+
+def _bucket_count(start_date, end_date, interval):
+    """Upper bound of the number of buckets a range is split into"""
+    days = (end_date - start_date).days + 1
+    if interval == TimeSeriesInterval.DAY:
+        return days
+    if interval == TimeSeriesInterval.WEEK:
+        return days // 7 + 2
+    return (
+        (end_date.year - start_date.year) * 12 + end_date.month - start_date.month + 1
+    )
+
+
+def aggregate_time_series(owner_id, start_date, end_date, interval, by_category):
+    """
+    Bucket the daily rollups of an owner between start_date and end_date.
+
+    A single query generates every bucket of the range with generate_series,
+    left joins the rollups truncated to the bucket size and groups them, so
+    buckets without transactions come back with zero totals. With
+    by_category the per category rows of each bucket come out of the same
+    query through GROUPING SETS.
+
+    Returns:
+        Result rows ordered by bucket, per category rows have category_grouped 0
+    """
+    unit = interval.value.lower()
+    first_day = start_date.date()
+    end_day = (end_date + timedelta(microseconds=1)).date()
+
+    buckets = select(
+        func.generate_series(
+            func.date_trunc(unit, cast(literal(first_day), DateTime)),
+            func.date_trunc(unit, cast(literal(end_day - timedelta(days=1)), DateTime)),
+            # unit comes from TimeSeriesInterval, never from the request
+            literal_column(f"interval '1 {unit}'"),
+        ).label("bucket")
+    ).cte("buckets")
+
+    rollup_filter = [
+        func.date_trunc(unit, cast(TransactionDailyRollup.day, DateTime))
+        == buckets.c.bucket,
+        TransactionDailyRollup.day >= first_day,
+        TransactionDailyRollup.day < end_day,
+        TransactionDailyRollup.transaction_count > 0,
+    ]
+    if owner_id:
+        rollup_filter.append(TransactionDailyRollup.user_id == owner_id)
+
+    totals = (
+        _rollup_sum_by_type(
+            TransactionType.CREDIT, TransactionDailyRollup.total_amount
+        ).label("total_credit"),
+        _rollup_sum_by_type(
+            TransactionType.DEBIT, TransactionDailyRollup.total_amount
+        ).label("total_debit"),
+        func.coalesce(func.sum(TransactionDailyRollup.transaction_count), 0).label(
+            "transaction_count"
+        ),
+    )
+    source = buckets.outerjoin(TransactionDailyRollup, and_(*rollup_filter))
+
+    if by_category:
+        query = (
+            select(
+                buckets.c.bucket,
+                Category.id.label("category_id"),
+                Category.name.label("category_name"),
+                func.grouping(Category.id).label("category_grouped"),
+                *totals,
+            )
+            .select_from(
+                source.outerjoin(
+                    Category, TransactionDailyRollup.category_id == Category.id
+                )
+            )
+            .group_by(
+                func.grouping_sets(
+                    tuple_(buckets.c.bucket),
+                    tuple_(buckets.c.bucket, Category.id, Category.name),
+                )
+            )
+            # Keep every bucket row but only the categories it has rollups of
+            .having(
+                or_(
+                    func.grouping(Category.id) == 1,
+                    func.sum(TransactionDailyRollup.transaction_count) > 0,
+                )
+            )
+        )
+    else:
+        query = (
+            select(
+                buckets.c.bucket,
+                literal(1).label("category_grouped"),
+                *totals,
+            )
+            .select_from(source)
+            .group_by(buckets.c.bucket)
+        )
+
+    return db.session.execute(query.order_by(buckets.c.bucket)).all()
+
+
+def get_transaction_time_series(current_user, query_params={}):
+    """
+    Generate credit and debit totals per day, week or month of a date range,
+    optionally split by category, for drawing charts in a single request.
+
+    Args:
+        current_user: The authenticated user
+        query_params: Query parameters including start_date, end_date,
+            interval (day, week or month), group_by=category and user_id or
+            child_id as for the other reports
+
+    Returns:
+        Dict: Buckets of the range in order, including empty ones
+    """
+    logger.info(
+        f"Generating transaction time series for user {current_user.id} with params: {query_params}"
+    )
+
+    start_date, end_date = parse_and_validate_dates(
+        query_params.get("start_date"), query_params.get("end_date")
+    )
+    interval = parse_time_series_interval(query_params.get("interval"))
+
+    group_by = query_params.get("group_by")
+    if group_by not in (None, "", "category"):
+        raise ValidationError("Invalid group_by. Only category is supported")
+    by_category = group_by == "category"
+
+    if _bucket_count(start_date, end_date, interval) > TIME_SERIES_MAX_BUCKETS:
+        raise ValidationError(
+            f"Date range is too long for {interval.value.lower()} buckets, "
+            f"at most {TIME_SERIES_MAX_BUCKETS} buckets are allowed"
+        )
+
+    current_user_role = current_user.role.value
+
+    if current_user.role == UserRole.ADMIN:
+        if "user_id" not in query_params:
+            raise ValidationError("Admin users must provide a user_id of a normal user")
+
+    # Validates user_id and child_id against the permissions of the user
+    get_transactions_query(
+        user=current_user,
+        role=current_user_role,
+        start_date=start_date,
+        end_date=end_date,
+        query_params=query_params,
+    )
+
+    owner_id = get_resource_owner_id(current_user, current_user_role, query_params)
+    cache_params = {
+        "start_date": start_date,
+        "end_date": end_date,
+        "interval": interval.value,
+        "by_category": by_category,
+    }
+    versions, cached = _report_cache_lookup("time_series", owner_id, cache_params)
+    if cached is not None:
+        logger.info(f"Serving cached time_series report for user {owner_id}")
+        return cached
+
+    rows = aggregate_time_series(owner_id, start_date, end_date, interval, by_category)
+
+    series = []
+    for row in rows:
+        if row.category_grouped == 1:
+            bucket = {
+                "bucket": row.bucket.strftime("%Y-%m-%d"),
+                "total_credit": format(float(row.total_credit or 0), ".2f"),
+                "total_debit": format(float(row.total_debit or 0), ".2f"),
+                "transaction_count": row.transaction_count,
+            }
+            if by_category:
+                bucket["categories"] = []
+            series.append(bucket)
+
+    if by_category:
+        buckets = {bucket["bucket"]: bucket for bucket in series}
+        for row in rows:
+            if row.category_grouped == 0:
+                buckets[row.bucket.strftime("%Y-%m-%d")]["categories"].append(
+                    {
+                        "category": {
+                            "id": str(row.category_id),
+                            "name": row.category_name,
+                        },
+                        "total_credit": format(float(row.total_credit or 0), ".2f"),
+                        "total_debit": format(float(row.total_debit or 0), ".2f"),
+                        "transaction_count": row.transaction_count,
+                    }
+                )
+
+    time_series = {
+        "start_date": start_date.strftime("%Y-%m-%d"),
+        "end_date": end_date.strftime("%Y-%m-%d"),
+        "interval": interval.value.lower(),
+        "series": series,
+    }
+
+    if versions:
+        cache_report("time_series", owner_id, cache_params, versions, time_series)
+
+    logger.info(f"Transaction time series generated with {len(series)} buckets")
+    return time_series
@@ -41,8 +41,11 @@ def get_user_transactions(user, role, query_params=None):
         query_params=query_params,
     )
 
+    # id breaks ties so the order is stable for cursor pagination
     query = query.order_by(
-        Transaction.transaction_at.desc(), Transaction.created_at.desc()
+        Transaction.transaction_at.desc(),
+        Transaction.created_at.desc(),
+        Transaction.id.desc(),
     )
 
     # Apply filters if provided
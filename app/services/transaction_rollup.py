@@ -0,0 +1,220 @@
+from datetime import timezone
+from decimal import Decimal
+
+from sqlalchemy import event, func, insert, inspect, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.extensions import db
+from app.models.transaction import Transaction
+from app.models.transaction_rollup import TransactionDailyRollup
+from app.utils.logger import logger
+
+ROLLUP_KEY_COLUMNS = ("user_id", "day", "category_id", "wallet_id", "type")
+ROLLUP_FIELDS = ("amount", "transaction_at", "category_id", "wallet_id", "type")
+# Fields whose previous value decides which rollup row a change comes out of
+HISTORY_FIELDS = ("user_id", "is_deleted", *ROLLUP_FIELDS)
+
+
+def rollup_day(transaction_at):
+    """Day a transaction is rolled up into, transaction times are stored in UTC"""
+    if transaction_at.tzinfo is not None:
+        transaction_at = transaction_at.astimezone(timezone.utc)
+    return transaction_at.date()
+
+
+def _upsert_rollups(connection, rows):
+    """Add rollup rows onto the existing ones, rows must have distinct keys"""
+    statement = pg_insert(TransactionDailyRollup).values(rows)
+    statement = statement.on_conflict_do_update(
+        index_elements=ROLLUP_KEY_COLUMNS,
+        set_={
+            "total_amount": TransactionDailyRollup.total_amount
+            + statement.excluded.total_amount,
+            "transaction_count": TransactionDailyRollup.transaction_count
+            + statement.excluded.transaction_count,
+        },
+    )
+    connection.execute(statement)
+
+
+def _rollup_key(values):
+    return (
+        values["user_id"],
+        rollup_day(values["transaction_at"]),
+        values["category_id"],
+        values["wallet_id"],
+        values["type"],
+    )
+
+
+def _rollup_delta(connection, values, sign):
+    """
+    Add (sign=1) or remove (sign=-1) one transaction in its daily rollup row.
+    A removal only updates the row, which is already gone when the user,
+    category or wallet it belongs to was deleted in the same flush.
+    """
+    key = dict(zip(ROLLUP_KEY_COLUMNS, _rollup_key(values)))
+    amount = Decimal(str(values["amount"])) * sign
+    if sign > 0:
+        _upsert_rollups(
+            connection, [dict(key, total_amount=amount, transaction_count=sign)]
+        )
+        return
+
+    connection.execute(
+        update(TransactionDailyRollup)
+        .filter_by(**key)
+        .values(
+            total_amount=TransactionDailyRollup.total_amount + amount,
+            transaction_count=TransactionDailyRollup.transaction_count + sign,
+        )
+    )
+
+
+def _values(transaction, previous=False):
+    """
+    Rollup relevant values of a transaction, as flushed or, with previous,
+    as they were before the pending changes.
+    """
+    state = inspect(transaction)
+    values = {}
+    for field in HISTORY_FIELDS:
+        history = state.attrs[field].history
+        if previous and history.deleted:
+            values[field] = history.deleted[0]
+        else:
+            values[field] = getattr(transaction, field)
+    return values
+
+
+def _update_rollups(session, flush_context):
+    """Apply the transactions written in a flush to the daily rollups"""
+    connection = session.connection()
+
+    for obj in session.new:
+        if isinstance(obj, Transaction) and not obj.is_deleted:
+            _rollup_delta(connection, _values(obj), 1)
+
+    for obj in session.dirty:
+        if not isinstance(obj, Transaction):
+            continue
+        old = _values(obj, previous=True)
+        new = _values(obj)
+        if old == new:
+            continue
+        if not old["is_deleted"]:
+            _rollup_delta(connection, old, -1)
+        if not new["is_deleted"]:
+            _rollup_delta(connection, new, 1)
+
+    for obj in session.deleted:
+        if isinstance(obj, Transaction):
+            old = _values(obj, previous=True)
+            if not old["is_deleted"]:
+                _rollup_delta(connection, old, -1)
+
+
+def _keep_previous(target, value, oldvalue, initiator):
+    """No-op set listener, registered for its active_history"""
+
+
+def register_rollup_listeners():
+    """
+    Keep the daily rollups in step with every ORM write to transactions.
+    Bulk statements bypass the listener and have to adjust the rollups
+    themselves, see add_to_rollups, delete_user_rollups and rebuild_rollups.
+
+    Setting an attribute of an expired transaction, the usual state after a
+    commit, records no previous value unless the attribute has active
+    history, which loads the committed row before the first change.
+    """
+    for field in HISTORY_FIELDS:
+        attribute = getattr(Transaction, field)
+        if not event.contains(attribute, "set", _keep_previous):
+            event.listen(attribute, "set", _keep_previous, active_history=True)
+
+    if not event.contains(Session, "after_flush", _update_rollups):
+        event.listen(Session, "after_flush", _update_rollups)
+
+
+def add_to_rollups(transactions):
+    """
+    Add transactions inserted with bulk statements, which bypass the flush
+    listener, to the daily rollups in a single upsert.
+
+    Args:
+        transactions: Dicts of the inserted transaction column values
+    """
+    totals = {}
+    for values in transactions:
+        key = _rollup_key(values)
+        amount, count = totals.get(key, (Decimal("0"), 0))
+        totals[key] = (amount + Decimal(str(values["amount"])), count + 1)
+
+    if totals:
+        _upsert_rollups(
+            db.session.connection(),
+            [
+                dict(
+                    zip(ROLLUP_KEY_COLUMNS, key),
+                    total_amount=amount,
+                    transaction_count=count,
+                )
+                for key, (amount, count) in totals.items()
+            ],
+        )
+
+
+def delete_user_rollups(user_id):
+    """Drop the rollups of a user whose transactions were all soft deleted"""
+    deleted = TransactionDailyRollup.query.filter_by(user_id=user_id).delete(
+        synchronize_session=False
+    )
+    logger.info(f"Deleted {deleted} transaction rollups for user {user_id}")
+
+
+def rebuild_rollups(user_id=None):
+    """
+    Recompute the daily rollups from the transactions table, for one user or
+    for everyone. The caller commits.
+    """
+    rollups = TransactionDailyRollup.query
+    transactions = select(
+        Transaction.user_id,
+        func.date(Transaction.transaction_at).label("day"),
+        Transaction.category_id,
+        Transaction.wallet_id,
+        Transaction.type,
+        func.sum(Transaction.amount).label("total_amount"),
+        func.count(Transaction.id).label("transaction_count"),
+    ).where(Transaction.is_deleted == False)
+
+    if user_id:
+        rollups = rollups.filter_by(user_id=user_id)
+        transactions = transactions.where(Transaction.user_id == user_id)
+
+    transactions = transactions.group_by(
+        Transaction.user_id,
+        func.date(Transaction.transaction_at),
+        Transaction.category_id,
+        Transaction.wallet_id,
+        Transaction.type,
+    )
+
+    rollups.delete(synchronize_session=False)
+    db.session.execute(
+        insert(TransactionDailyRollup).from_select(
+            [
+                "user_id",
+                "day",
+                "category_id",
+                "wallet_id",
+                "type",
+                "total_amount",
+                "transaction_count",
+            ],
+            transactions,
+        )
+    )
+    logger.info(f"Rebuilt transaction rollups for {user_id or 'all users'}")
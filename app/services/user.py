@@ -1,4 +1,5 @@
 from flask import request, current_app
+from flask_jwt_extended import get_jwt
 import uuid
 import secrets
 import string
@@ -13,6 +14,8 @@ from app.tasks.user import soft_delete_user_related_objects
 from app.utils.tokens import TokenHandler
 from app.utils.enums import UserRole
 from app.models.auth import ActiveAccessToken
+from app.utils.principal_cache import invalidate_user_principals
+from app.utils.child_cache import invalidate_child_cache
 
 
 def request_email_change(user, new_email):
@@ -181,17 +184,15 @@ def logout_other_sessions(user):
     """
     Invalidate all active tokens for a given user except the current one.
     """
-    # Get current token
-    auth_header = request.headers.get("Authorization", "")
-    current_token = (
-        auth_header.split(" ")[1] if auth_header.startswith("Bearer ") else None
-    )
+    current_jti = uuid.UUID(get_jwt()["jti"])
+
     # Invalidate all tokens except current one
-    tokens = ActiveAccessToken.query.filter_by(user_id=user.id).all()
-    for token in tokens:
-        if token.access_token != current_token:
-            db.session.delete(token)
+    ActiveAccessToken.query.filter(
+        ActiveAccessToken.user_id == user.id,
+        ActiveAccessToken.jti != current_jti,
+    ).delete(synchronize_session=False)
     db.session.commit()
+    invalidate_user_principals(user.id, keep_jti=current_jti)
     logger.info(f"Invalidated all other tokens for user: {user.id}")
 
 
@@ -201,6 +202,8 @@ def delete_user_account(current_user, target_user, password=None):
     """
     try:
         logger.info(f"Starting deletion process for user {target_user.id}")
+        deleted_user_ids = [target_user.id]
+        parent_user = target_user.get_parent()
 
         if target_user.role.value == UserRole.USER.value:
             child_user = target_user.get_child()
@@ -217,10 +220,20 @@ def delete_user_account(current_user, target_user, password=None):
                 logger.info(f"Deleting parent-child relation {relation.id}")
 
                 soft_delete_user_related_objects.delay(str(child_user_id))
+                deleted_user_ids.append(child_user_id)
 
         target_user.is_deleted = True
         db.session.commit()
 
+        # Drop cached principals so the deletion takes effect on the next request
+        for user_id in deleted_user_ids:
+            invalidate_user_principals(user_id)
+        invalidate_child_cache(target_user.id)
+        if parent_user:
+            # The parent's principal still carries the deleted child's id
+            invalidate_user_principals(parent_user.id)
+            invalidate_child_cache(parent_user.id)
+
         soft_delete_user_related_objects.delay(str(target_user.id))
 
         logger.info(
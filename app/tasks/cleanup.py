@@ -62,19 +62,14 @@ def hard_delete_soft_deleted_items(self):
 
 @celery.task(name="cleanup_expired_access_tokens")
 def cleanup_expired_tokens():
-    """Delete access tokens older than JWT_ACCESS_TOKEN_EXPIRES minutes."""
-    expiration_threshold = datetime.now(timezone.utc) - timedelta(
-        seconds=current_app.config["JWT_ACCESS_TOKEN_EXPIRES"]
-    )
-    expired_tokens = ActiveAccessToken.query.filter(
-        ActiveAccessToken.created_at < expiration_threshold
-    ).all()
+    """Delete allowlisted access tokens that are past their expiry."""
+    deleted_count = ActiveAccessToken.query.filter(
+        ActiveAccessToken.expires_at < datetime.now(timezone.utc)
+    ).delete(synchronize_session=False)
 
-    if expired_tokens:
-        for token in expired_tokens:
-            db.session.delete(token)
+    if deleted_count:
         db.session.commit()
-        logger.info(f"Deleted {len(expired_tokens)} expired access tokens.")
+        logger.info(f"Deleted {deleted_count} expired access tokens.")
     else:
         logger.info("No expired access tokens found.")
 
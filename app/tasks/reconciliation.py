@@ -0,0 +1,100 @@
+import time
+import uuid
+from decimal import Decimal
+
+from flask import current_app
+
+from app.celery_app import celery
+from app.extensions import redis_client
+from app.services.reconciliation import (
+    next_user_chunk,
+    partition_bounds,
+    reconcile_user_range,
+)
+from app.utils.logger import logger
+
+
+def _lock_key(partition):
+    return f"reconciliation:lock:{partition}"
+
+
+def _cursor_key(partition):
+    return f"reconciliation:cursor:{partition}"
+
+
+@celery.task(name="reconcile_denormalized_state")
+def reconcile_denormalized_state():
+    """Fan out the reconciliation of wallet balances and budget spending"""
+    partitions = current_app.config["RECONCILIATION_PARTITIONS"]
+    for partition in range(partitions):
+        reconcile_partition.delay(partition, partitions)
+
+    logger.info(f"Scheduled reconciliation of {partitions} user partitions")
+    return partitions
+
+
+@celery.task(name="reconcile_partition", bind=True, max_retries=3)
+def reconcile_partition(self, partition, partitions):
+    """
+    Reconcile the users of one partition of the user id space chunk by chunk.
+
+    The last reconciled user id is kept in Redis, so a run that fails or is
+    killed resumes after the last committed chunk. Chunks are spaced out by
+    RECONCILIATION_CHUNK_DELAY to keep the load on the database low.
+    """
+    config = current_app.config
+    lock_key = _lock_key(partition)
+
+    if not redis_client.set(
+        lock_key, self.request.id or "1", nx=True, ex=config["RECONCILIATION_LOCK_TTL"]
+    ):
+        logger.info(f"Reconciliation of partition {partition} is already running")
+        return False
+
+    try:
+        lower_id, upper_id = partition_bounds(partition, partitions)
+        cursor = redis_client.get(_cursor_key(partition))
+        after_id = uuid.UUID(cursor) if cursor else None
+        if after_id:
+            logger.info(
+                f"Resuming reconciliation of partition {partition} after {after_id}"
+            )
+
+        metrics = {
+            "chunks": 0,
+            "wallets_repaired": 0,
+            "wallet_drift": Decimal("0"),
+            "budgets_repaired": 0,
+            "budget_drift": Decimal("0"),
+        }
+
+        while True:
+            chunk = next_user_chunk(
+                lower_id, upper_id, config["RECONCILIATION_CHUNK_SIZE"], after_id
+            )
+            if chunk is None:
+                break
+
+            chunk_metrics = reconcile_user_range(*chunk)
+            metrics["chunks"] += 1
+            for key, value in chunk_metrics.items():
+                metrics[key] += value
+
+            after_id = chunk[1]
+            redis_client.set(_cursor_key(partition), str(after_id))
+            time.sleep(config["RECONCILIATION_CHUNK_DELAY"])
+
+        redis_client.delete(_cursor_key(partition))
+
+        metrics["wallet_drift"] = str(metrics["wallet_drift"])
+        metrics["budget_drift"] = str(metrics["budget_drift"])
+        logger.info(f"Reconciled partition {partition}/{partitions}: {metrics}")
+        return metrics
+
+    except Exception as e:
+        logger.error(f"Error reconciling partition {partition}: {str(e)}")
+        if self.request.retries < self.max_retries:
+            self.retry(exc=e, countdown=60 * (self.request.retries + 1))
+        return False
+    finally:
+        redis_client.delete(lock_key)
@@ -1,47 +1,296 @@
-from datetime import datetime
+import uuid
+from datetime import datetime, timedelta
+
+import redis
+from celery import chord
+from flask import current_app
+from sqlalchemy.exc import IntegrityError
 from app.celery_app import celery
-from app.extensions import db
+from app.extensions import db, redis_client
 from app.models.recurring_transaction import RecurringTransaction
 from app.models.transaction import Transaction
 from app.models.wallet import Wallet
 from app.utils.logger import logger
 from app.utils.email_helper import send_templated_email
 from app.utils.enums import TransactionType
-from app.services.recurring_transaction import calculate_next_execution_date
+from app.utils.recurring_schedule import (
+    claim_due_executions,
+    schedule_executions,
+    unschedule_executions,
+)
+from app.services.recurring_transaction import (
+    calculate_next_execution_date,
+    get_due_recurring_transactions,
+)
 from app.services.manage_budget import update_budget_on_transaction_created
+from app.services.recurring_processing import (
+    claim_due_chunk,
+    process_due_chunk,
+    schedule_upcoming,
+    sync_schedule,
+)
+from app.services.reconciliation import partition_bounds
+
+# Counts reported by a batch run and summed over its shards
+COUNT_KEYS = ("processed", "skipped", "failed", "occurrences")
+
+RUN_LOCK_KEY = "recurring_transactions:run_lock"
+
+# Delete the run lock only if it still holds the token of the releasing run,
+# it may have expired and been taken by the next run
+RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
 
 
 @celery.task(name="process_recurring_transactions", bind=True, max_retries=3)
 def process_recurring_transactions(self):
-    """Process all due recurring transactions"""
+    """
+    Process all due recurring transactions, fanned out over
+    RECURRING_SHARDS shard tasks by user id range in batch mode. This sweep
+    backs up dispatch_due_recurring_transactions, which runs the scheduled
+    executions on time, and refills the schedule for the next
+    RECURRING_SCHEDULE_HORIZON seconds.
+
+    A Redis run lock, released once the last shard is summarized, keeps a
+    tick from starting while the previous run is still going.
+    """
+    lock_token = self.request.id or str(uuid.uuid4())
+    if not redis_client.set(
+        RUN_LOCK_KEY,
+        lock_token,
+        nx=True,
+        ex=current_app.config["RECURRING_RUN_LOCK_TTL"],
+    ):
+        logger.info("Previous recurring transaction run is still in progress")
+        return False
+
     try:
         now = datetime.now()
         logger.info(f"Processing recurring transactions due before {now}")
 
-        # Get all non-deleted recurring transactions that are due
-        due_transactions = RecurringTransaction.query.filter(
-            RecurringTransaction.next_execution_at <= now,
-            RecurringTransaction.is_deleted == False,
-        ).all()
+        # Recover executions the schedule lost before the dispatcher needs them
+        schedule_upcoming(
+            now + timedelta(seconds=current_app.config["RECURRING_SCHEDULE_HORIZON"])
+        )
 
-        logger.info(f"Found {len(due_transactions)} due recurring transactions")
+        if current_app.config["RECURRING_BATCH_SIZE"]:
+            shards = current_app.config["RECURRING_SHARDS"]
+            chord(
+                process_recurring_shard.s(shard, shards, now.isoformat())
+                for shard in range(shards)
+            )(summarize_recurring_shards.s(now.isoformat(), lock_token))
+            logger.info(f"Dispatched {shards} recurring transaction shards")
+            return shards
 
-        for recurring_txn in due_transactions:
-            try:
-                result = process_single_transaction(recurring_txn.id)
+        try:
+            # Get all non-deleted recurring transactions that are due
+            due_transactions = get_due_recurring_transactions(now).all()
 
-            except Exception as e:
-                logger.error(
-                    f"Error processing recurring transaction {recurring_txn.id}: {str(e)}"
-                )
+            logger.info(f"Found {len(due_transactions)} due recurring transactions")
+
+            for recurring_txn in due_transactions:
+                try:
+                    result = process_single_transaction(recurring_txn.id)
+
+                except Exception as e:
+                    logger.error(
+                        f"Error processing recurring transaction {recurring_txn.id}: {str(e)}"
+                    )
+        finally:
+            release_run_lock(lock_token)
 
     except Exception as e:
+        release_run_lock(lock_token)
         logger.error(f"Error in process_recurring_transactions task: {str(e)}")
         if self.request.retries < self.max_retries:
             self.retry(exc=e, countdown=60 * (self.request.retries + 1))
         return False
 
 
+@celery.task(name="dispatch_due_recurring_transactions")
+def dispatch_due_recurring_transactions():
+    """
+    Dispatch the executions the Redis schedule has due, in tasks of
+    RECURRING_BATCH_SIZE items, without querying the recurring transactions
+    table for them.
+    """
+    now = datetime.now()
+    config = current_app.config
+    due_ids = claim_due_executions(now, config["RECURRING_DISPATCH_LIMIT"])
+    if not due_ids:
+        return 0
+
+    batch_size = config["RECURRING_BATCH_SIZE"] or 1
+    for start in range(0, len(due_ids), batch_size):
+        process_scheduled_recurring.delay(
+            due_ids[start : start + batch_size], now.isoformat()
+        )
+
+    logger.info(f"Dispatched {len(due_ids)} scheduled recurring transactions")
+    return len(due_ids)
+
+
+@celery.task(name="process_scheduled_recurring", bind=True, max_retries=3)
+def process_scheduled_recurring(self, recurring_ids, now):
+    """
+    Execute recurring transactions dispatched from the schedule. Items that
+    were not executed, because they are not due anymore, were deleted or are
+    being executed by another run, are put back at their stored next
+    execution or taken off the schedule.
+
+    Returns:
+        Dict with the batch counts
+    """
+    try:
+        recurring_ids = [uuid.UUID(recurring_id) for recurring_id in recurring_ids]
+        counts = process_due_in_batches(
+            datetime.fromisoformat(now),
+            len(recurring_ids),
+            recurring_ids=recurring_ids,
+        )
+        sync_schedule(recurring_ids)
+        return counts
+
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error processing scheduled recurring transactions: {str(e)}")
+        if self.request.retries < self.max_retries:
+            self.retry(exc=e, countdown=10 * (self.request.retries + 1))
+        # Left leased, the schedule hands them out again after the lease
+        return {**empty_counts(), "error": str(e)}
+
+
+def release_run_lock(lock_token):
+    """Release the run lock if it is still held by the given run"""
+    try:
+        redis_client.eval(RELEASE_LOCK_SCRIPT, 1, RUN_LOCK_KEY, lock_token)
+    except redis.RedisError as e:
+        logger.warning(f"Failed to release recurring transaction run lock: {str(e)}")
+
+
+@celery.task(name="process_recurring_shard", bind=True, max_retries=3)
+def process_recurring_shard(self, shard, shards, now):
+    """
+    Process the due recurring transactions of the users in one of `shards`
+    slices of the user id space. Every item of a user lands in the same
+    shard, and rows are claimed with SKIP LOCKED, so shards and overlapping
+    runs never execute the same item twice.
+
+    Returns:
+        Dict with the shard's counts, plus an error when it gave up
+    """
+    try:
+        lower_id, upper_id = partition_bounds(shard, shards)
+        return process_due_in_batches(
+            datetime.fromisoformat(now),
+            current_app.config["RECURRING_BATCH_SIZE"],
+            lower_id=lower_id,
+            upper_id=upper_id,
+        )
+
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error processing recurring transaction shard {shard}: {str(e)}")
+        if self.request.retries < self.max_retries:
+            self.retry(exc=e, countdown=60 * (self.request.retries + 1))
+        return {**empty_counts(), "error": str(e)}
+
+
+@celery.task(name="summarize_recurring_shards")
+def summarize_recurring_shards(results, now, lock_token=None):
+    """
+    Add up and log the counts of all shards of a recurring run and release
+    the run lock
+    """
+    if lock_token:
+        release_run_lock(lock_token)
+
+    summary = empty_counts()
+    summary["failed_shards"] = 0
+    for result in results:
+        if "error" in result:
+            summary["failed_shards"] += 1
+        for key in COUNT_KEYS:
+            summary[key] += result[key]
+
+    logger.info(f"Processed recurring transactions due before {now}: {summary}")
+    return summary
+
+
+def empty_counts():
+    return dict.fromkeys(COUNT_KEYS, 0)
+
+
+def process_due_in_batches(
+    now, batch_size, lower_id=None, upper_id=None, recurring_ids=None
+):
+    """
+    Process the recurring transactions due before now in chunks of
+    batch_size, each executed with set based statements and one commit.
+    Items behind by several periods get all their missed occurrences.
+    lower_id and upper_id limit the run to a range of user ids,
+    recurring_ids to the given items.
+
+    A chunk that fails is retried item by item, so one broken item does not
+    hold back the rest of its chunk. Items that fail on their own are left
+    for the next run.
+
+    Returns:
+        Dict with the processed, skipped and failed item counts and the
+        number of occurrences executed
+    """
+    counts = empty_counts()
+    failed_ids = set()
+
+    while True:
+        chunk = claim_due_chunk(
+            now,
+            batch_size,
+            exclude_ids=failed_ids,
+            lower_id=lower_id,
+            upper_id=upper_id,
+            ids=recurring_ids,
+        )
+        if not chunk:
+            break
+        chunk_ids = [recurring_txn.id for recurring_txn in chunk]
+
+        try:
+            result = process_due_chunk(chunk, now)
+        except Exception as e:
+            logger.error(
+                f"Error processing chunk of {len(chunk_ids)} recurring "
+                f"transactions, retrying one by one: {str(e)}"
+            )
+            for recurring_txn_id in chunk_ids:
+                result = process_single_transaction(recurring_txn_id)
+                if result is True:
+                    counts["processed"] += 1
+                    counts["occurrences"] += 1
+                elif result is False:
+                    counts["skipped"] += 1
+                else:
+                    counts["failed"] += 1
+                    failed_ids.add(recurring_txn_id)
+            continue
+
+        counts["processed"] += result["processed"]
+        counts["skipped"] += result["skipped"]
+        counts["occurrences"] += result["occurrences"]
+        for recurring_txn_id, transaction_id in result["created"]:
+            send_recurring_transaction_email.delay(recurring_txn_id, transaction_id)
+
+    logger.info(
+        f"Processed recurring transactions of users {lower_id} to {upper_id} "
+        f"due before {now}: {counts}"
+    )
+    return counts
+
+
 def process_single_transaction(recurring_transaction_id):
     """
     Process a single recurring transaction within a database transaction.
@@ -52,8 +301,14 @@ def process_single_transaction(recurring_transaction_id):
       - Tuple with error info if error occurred
     """
     try:
-        # Get recurring transaction with fresh data
-        recurring_txn = RecurringTransaction.query.get(recurring_transaction_id)
+        # Lock the recurring transaction with fresh data, a concurrent run
+        # executing the same item waits here and sees it advanced
+        recurring_txn = (
+            RecurringTransaction.query.filter_by(id=recurring_transaction_id)
+            .with_for_update()
+            .populate_existing()
+            .first()
+        )
 
         if not recurring_txn:
             logger.warning(
@@ -61,6 +316,11 @@ def process_single_transaction(recurring_transaction_id):
             )
             return False
 
+        if recurring_txn.is_deleted or recurring_txn.next_execution_at > datetime.now():
+            logger.info(f"Recurring transaction {recurring_txn.id} is not due anymore")
+            db.session.rollback()
+            return False
+
         # Check if related objects are deleted or invalid
         if (
             recurring_txn.user.is_deleted
@@ -76,15 +336,17 @@ def process_single_transaction(recurring_transaction_id):
             )
             recurring_txn.is_deleted = True
             db.session.commit()
+            unschedule_executions([recurring_transaction_id])
             return False
 
         # Lock the wallet for update to prevent race conditions
         wallet = (
-            Wallet.query.filter_by(id=recurring_txn.wallet_id).with_for_update().first()
+            Wallet.query.filter_by(id=recurring_txn.wallet_id)
+            .with_for_update()
+            .populate_existing()
+            .first()
         )
 
-        wallet = Wallet.query.get(recurring_txn.wallet_id)
-
         # Create the actual transaction
         new_transaction = Transaction(
             user_id=recurring_txn.user_id,
@@ -94,10 +356,18 @@ def process_single_transaction(recurring_transaction_id):
             amount=recurring_txn.amount,
             description=recurring_txn.description or "Recurring transaction",
             transaction_at=recurring_txn.next_execution_at,
+            recurring_transaction_id=recurring_txn.id,
+            occurrence_at=recurring_txn.next_execution_at,
         )
 
         db.session.add(new_transaction)
-        db.session.flush()  # Get the ID assigned
+        try:
+            db.session.flush()  # Get the ID assigned
+        except IntegrityError:
+            # The occurrence was executed before its schedule was advanced
+            db.session.rollback()
+            advance_executed_occurrence(recurring_transaction_id)
+            return False
 
         # Update wallet balance directly
         if recurring_txn.type == TransactionType.CREDIT:
@@ -114,6 +384,7 @@ def process_single_transaction(recurring_transaction_id):
 
         # Commit the transaction
         db.session.commit()
+        schedule_executions({recurring_txn.id: next_date})
 
         # Schedule email notification
         send_recurring_transaction_email.delay(recurring_txn.id, new_transaction.id)
@@ -131,6 +402,24 @@ def process_single_transaction(recurring_transaction_id):
         return {"error": f"Failed to process recurring transaction: {str(e)}"}, 500
 
 
+def advance_executed_occurrence(recurring_transaction_id):
+    """Move a recurring transaction past an occurrence that already ran"""
+    recurring_txn = (
+        RecurringTransaction.query.filter_by(id=recurring_transaction_id)
+        .with_for_update()
+        .first()
+    )
+    logger.warning(
+        f"Occurrence {recurring_txn.next_execution_at} of recurring transaction "
+        f"{recurring_txn.id} was already executed"
+    )
+    recurring_txn.last_executed_at = recurring_txn.next_execution_at
+    next_date = calculate_next_execution_date(recurring_txn)
+    recurring_txn.next_execution_at = next_date
+    db.session.commit()
+    schedule_executions({recurring_transaction_id: next_date})
+
+
 @celery.task(name="send_recurring_transaction_email")
 def send_recurring_transaction_email(recurring_txn_id, transaction_id):
     """
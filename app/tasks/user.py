@@ -3,8 +3,17 @@ from app.extensions import mail, db
 from app.utils.logger import logger
 from app.celery_app import celery
 from app.utils.tokens import TokenHandler
+from app.models.budget import Budget
+from app.models.category import Category
+from app.models.interwallet_transaction import InterWalletTransaction
+from app.models.recurring_transaction import RecurringTransaction
+from app.models.transaction import Transaction
 from app.models.user import User
+from app.models.wallet import Wallet
 from app.utils.email_helper import send_templated_email
+from app.services.transaction_rollup import delete_user_rollups
+from app.utils.count_cache import invalidate_counts
+from app.utils.report_cache import invalidate_reports
 
 
 @celery.task(name="send_email_change_otps", bind=True, max_retries=3)
@@ -100,6 +109,7 @@ def soft_delete_user_related_objects(self, user_id):
         logger.info(
             f"Soft deleted {transactions_deleted} transactions for user {user_id}"
         )
+        delete_user_rollups(user_id)
 
         # Soft delete budgets
         budgets_deleted = user.budgets.filter_by(is_deleted=False).update(
@@ -130,6 +140,19 @@ def soft_delete_user_related_objects(self, user_id):
         )
 
         db.session.commit()
+
+        # The bulk updates bypass the cache invalidation listeners
+        for model in (
+            Category,
+            Transaction,
+            Budget,
+            Wallet,
+            RecurringTransaction,
+            InterWalletTransaction,
+        ):
+            invalidate_counts(model.__tablename__, str(user_id))
+        invalidate_reports(str(user_id))
+
         logger.info(f"Cleanup completed for user {user_id}")
         return True
 
@@ -2,6 +2,7 @@ from flask import Blueprint
 from flask_restful import Api
 from app.resources.interwallet_transaction import (
     InterWalletTransactionListCreateResource,
+    InterWalletTransactionStreamResource,
     InterWalletTransactionDetailResource,
 )
 
@@ -12,6 +13,9 @@ interwallet_transaction_api = Api(interwallet_transaction_bp)
 interwallet_transaction_api.add_resource(
     InterWalletTransactionListCreateResource, "", endpoint="transactions"
 )
+interwallet_transaction_api.add_resource(
+    InterWalletTransactionStreamResource, "/stream", endpoint="transactions-stream"
+)
 interwallet_transaction_api.add_resource(
     InterWalletTransactionDetailResource, "/<id>", endpoint="transaction-detail"
 )
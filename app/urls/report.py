@@ -3,6 +3,7 @@ from flask_restful import Api
 from app.resources.report import (
     TransactionReportResource,
     SpendingTrendsResource,
+    TransactionTimeSeriesResource,
     TransactionExportResource,
 )
 
@@ -20,6 +21,11 @@ report_api.add_resource(
     "/transactions/spending-trends",
     endpoint="transaction-trends",
 )
+report_api.add_resource(
+    TransactionTimeSeriesResource,
+    "/transactions/time-series",
+    endpoint="transaction-time-series",
+)
 
 report_api.add_resource(
     TransactionExportResource,
@@ -1,12 +1,19 @@
 from flask import Blueprint
 from flask_restful import Api
-from app.resources.transaction import TransactionListResource, TransactionDetailResource
+from app.resources.transaction import (
+    TransactionListResource,
+    TransactionStreamResource,
+    TransactionDetailResource,
+)
 
 transaction_bp = Blueprint("transaction", __name__)
 transaction_api = Api(transaction_bp)
 
 # Register endpoints
 transaction_api.add_resource(TransactionListResource, "", endpoint="transactions")
+transaction_api.add_resource(
+    TransactionStreamResource, "/stream", endpoint="transactions-stream"
+)
 transaction_api.add_resource(
     TransactionDetailResource, "/<id>", endpoint="transaction-detail"
 )
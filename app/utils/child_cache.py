@@ -0,0 +1,49 @@
+import redis
+from flask import current_app
+
+from app.extensions import redis_client
+from app.utils.logger import logger
+
+# Stored for parents without an active child, so misses are cached as well
+NO_CHILD = ""
+
+
+def _child_key(parent_id):
+    return f"user_child:{parent_id}"
+
+
+def get_cached_child_id(parent_id):
+    """
+    Get the cached child id of a parent user.
+
+    Returns:
+        The child id as a string, NO_CHILD if the parent has no active child,
+        or None on a cache miss
+    """
+    try:
+        return redis_client.get(_child_key(parent_id))
+    except redis.RedisError as e:
+        logger.warning(f"Child cache lookup failed: {str(e)}")
+        return None
+
+
+def cache_child_id(parent_id, child_id):
+    """Store the child id of a parent user, or NO_CHILD when there is none."""
+    try:
+        redis_client.setex(
+            _child_key(parent_id),
+            current_app.config["CHILD_CACHE_TTL"],
+            str(child_id) if child_id else NO_CHILD,
+        )
+    except redis.RedisError as e:
+        logger.warning(f"Failed to cache child of user {parent_id}: {str(e)}")
+
+
+def invalidate_child_cache(parent_id):
+    """Drop the cached child of a parent user after the relation changed."""
+    try:
+        redis_client.delete(_child_key(parent_id))
+    except redis.RedisError as e:
+        logger.warning(
+            f"Failed to invalidate child cache of user {parent_id}: {str(e)}"
+        )
@@ -14,7 +14,11 @@ AMOUNT_MAX_VALUE = 99999999.99
 
 # Pagination defaults
 DEFAULT_PAGE_SIZE = 10
-MAX_PAGE_SIZE = 10000000
+MAX_PAGE_SIZE = 100
+STREAM_CHUNK_SIZE = 1000  # rows fetched per round trip by streaming endpoints
+
+# Report time series
+TIME_SERIES_MAX_BUCKETS = 1000
 
 # Budget constants
 BUDGET_WARNING_THRESHOLD = 80
@@ -0,0 +1,110 @@
+import hashlib
+import time
+
+import redis
+from flask import current_app, has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.extensions import redis_client
+from app.utils.logger import logger
+
+# Session.info key collecting (table, user_id) pairs written in a transaction
+_PENDING_KEY = "count_cache_writes"
+
+
+def _version_key(table_name, user_id):
+    return f"count_version:{table_name}:{user_id}"
+
+
+def _count_key(table_name, user_id, version, statement_hash):
+    return f"count:{table_name}:{user_id}:{version}:{statement_hash}"
+
+
+def hash_statement(query):
+    """Hash the SQL and parameters of a query to identify its filters"""
+    compiled = query.statement.compile()
+    params = sorted((key, str(value)) for key, value in compiled.params.items())
+    return hashlib.sha1(f"{compiled}|{params}".encode()).hexdigest()
+
+
+def get_cached_count(table_name, user_id, statement_hash):
+    """
+    Get the cached total of a list query owned by a user.
+
+    Returns:
+        Tuple of the owner's current version, to pass to cache_count (None
+        when the cache is unavailable), and the cached count or None on a
+        cache miss
+    """
+    try:
+        version = redis_client.get(_version_key(table_name, user_id)) or "0"
+        count = redis_client.get(
+            _count_key(table_name, user_id, version, statement_hash)
+        )
+        return version, int(count) if count is not None else None
+    except redis.RedisError as e:
+        logger.warning(f"Count cache lookup failed: {str(e)}")
+        return None, None
+
+
+def cache_count(table_name, user_id, statement_hash, version, count):
+    """
+    Store the total of a list query under the version read before it was
+    counted, so a write that commits while counting leaves the entry stale
+    on arrival instead of hiding the write.
+    """
+    try:
+        redis_client.setex(
+            _count_key(table_name, user_id, version, statement_hash),
+            current_app.config["COUNT_CACHE_TTL"],
+            count,
+        )
+    except redis.RedisError as e:
+        logger.warning(f"Failed to cache count for user {user_id}: {str(e)}")
+
+
+def invalidate_counts(table_name, user_id):
+    """
+    Invalidate all cached counts of a table for a user by moving its version
+    to the current time. Versions are never reused, so the key may expire
+    together with the counts stored under it.
+    """
+    try:
+        redis_client.set(
+            _version_key(table_name, user_id),
+            time.time_ns(),
+            ex=current_app.config["COUNT_CACHE_TTL"],
+        )
+    except redis.RedisError as e:
+        logger.warning(f"Failed to invalidate counts for user {user_id}: {str(e)}")
+
+
+def _collect_writes(session, flush_context):
+    """Remember the owners of objects inserted, updated or deleted in a flush"""
+    pending = session.info.setdefault(_PENDING_KEY, set())
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        user_id = getattr(obj, "user_id", None)
+        if user_id is not None:
+            pending.add((obj.__tablename__, str(user_id)))
+
+
+def _invalidate_committed(session):
+    if not has_app_context():
+        _discard_pending(session)
+        return
+
+    for table_name, user_id in session.info.pop(_PENDING_KEY, ()):
+        invalidate_counts(table_name, user_id)
+
+
+def _discard_pending(session):
+    session.info.pop(_PENDING_KEY, None)
+
+
+def register_count_cache_listeners():
+    """Invalidate cached counts whenever a write to a user's rows is committed"""
+    if not event.contains(Session, "after_flush", _collect_writes):
+        event.listen(Session, "after_flush", _collect_writes)
+        event.listen(Session, "after_commit", _invalidate_committed)
+        event.listen(Session, "after_rollback", _discard_pending)
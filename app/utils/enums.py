@@ -31,3 +31,19 @@ class TransactionFrequency(enum.Enum):
     WEEKLY = "WEEKLY"
     MONTHLY = "MONTHLY"
     YEARLY = "YEARLY"
+
+
+class CountStrategy(enum.Enum):
+    """Enum for how paginated lists compute their total count"""
+
+    EXACT = "EXACT"
+    CACHED = "CACHED"
+    ESTIMATED = "ESTIMATED"
+
+
+class TimeSeriesInterval(enum.Enum):
+    """Enum for the bucket size of report time series"""
+
+    DAY = "DAY"
+    WEEK = "WEEK"
+    MONTH = "MONTH"
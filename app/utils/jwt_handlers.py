@@ -1,6 +1,7 @@
-from flask import jsonify
+from flask import jsonify, g
 from app.utils.logger import logger
 from app.extensions import jwt
+from app.utils.tokens import TokenHandler
 
 
 def register_jwt_error_handlers(app):
@@ -45,6 +46,18 @@ def register_jwt_error_handlers(app):
             401,
         )
 
+    @jwt.token_in_blocklist_loader
+    def check_if_token_revoked(jwt_header, jwt_payload):
+        """
+        Access tokens are accepted only while their jti is in the allowlist.
+        The resolved principal is kept on g for authenticated_user.
+        """
+        if jwt_payload.get("type") != "access":
+            return False
+
+        g.principal = TokenHandler.get_active_principal(jwt_payload["jti"])
+        return g.principal is None
+
     @jwt.needs_fresh_token_loader
     def token_not_fresh_callback(jwt_header, jwt_payload):
         return (
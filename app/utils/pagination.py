@@ -1,6 +1,50 @@
+import base64
+import json
+import uuid
+from datetime import datetime
+
 from flask import request, url_for
-from sqlalchemy.orm import Query
+from marshmallow import ValidationError
+from sqlalchemy import tuple_
+from sqlalchemy.exc import SQLAlchemyError
+from marshmallow import fields
+from sqlalchemy.orm import Query, selectinload
 from app.utils.constants import MAX_PAGE_SIZE
+from app.utils.count_cache import cache_count, get_cached_count, hash_statement
+from app.utils.enums import CountStrategy
+from app.utils.logger import logger
+from app.utils.query_plan import explain
+from app.utils.serializers import ColumnSerializer
+
+
+def eager_load_options(schema, model):
+    """
+    Build loader options for the relationships a schema declares in its
+    Meta.eager_load, limited to the columns its nested fields dump.
+    Each relationship then costs one extra query per page instead of one per row.
+    """
+    options = []
+    for name in getattr(schema.Meta, "eager_load", ()):
+        relationship = getattr(model, name)
+        option = selectinload(relationship)
+
+        field = schema.fields.get(name)
+        if isinstance(field, fields.Nested) and field.only:
+            target = relationship.property.mapper.class_
+            option = option.load_only(
+                *[getattr(target, column) for column in field.only]
+            )
+
+        options.append(option)
+
+    return options
+
+
+def apply_eager_loading(query, schema):
+    """Apply the eager loading profile of a schema to a query of its model"""
+    model = query.column_descriptions[0]["entity"]
+    options = eager_load_options(schema, model)
+    return query.options(*options) if options else query
 
 
 class PaginatedResult:
@@ -10,7 +54,15 @@ class PaginatedResult:
     Similar to Django REST framework format with only previous and next links.
     """
 
-    def __init__(self, query, page=1, per_page=10, error_out=False):
+    def __init__(
+        self,
+        query,
+        page=1,
+        per_page=10,
+        error_out=False,
+        count_strategy=CountStrategy.EXACT,
+        count_owner_id=None,
+    ):
         """
         Initialize paginator with query and pagination parameters.
 
@@ -19,6 +71,8 @@ class PaginatedResult:
             page: Current page number (default: 1)
             per_page: Items per page (default: 10)
             error_out: Whether to raise 404 when out of range (default: False)
+            count_strategy: How the total is computed (default: exact COUNT(*))
+            count_owner_id: User owning the listed rows, required for cached counts
         """
         # Handle invalid pagination parameters
         self.page = max(1, page)  # Ensure page is at least 1
@@ -26,10 +80,51 @@ class PaginatedResult:
         self.query = query
         self.error_out = error_out
 
-        # Get paginated items
+        # Get paginated items, the total is filled in by the count strategy
         self.pagination = query.paginate(
-            page=self.page, per_page=self.per_page, error_out=error_out
+            page=self.page, per_page=self.per_page, error_out=error_out, count=False
         )
+        self.pagination.total = self._count(count_strategy, count_owner_id)
+
+    def _count(self, count_strategy, count_owner_id):
+        """Compute the total number of items with the given strategy"""
+        if count_strategy == CountStrategy.CACHED and count_owner_id:
+            table_name = self.query.column_descriptions[0]["entity"].__tablename__
+            statement_hash = hash_statement(self.query)
+
+            version, total = get_cached_count(
+                table_name, count_owner_id, statement_hash
+            )
+            if total is None:
+                total = self._exact_count()
+                if version is not None:
+                    cache_count(
+                        table_name, count_owner_id, statement_hash, version, total
+                    )
+            return total
+
+        if count_strategy == CountStrategy.ESTIMATED:
+            total = self._estimated_count()
+            if total is not None:
+                # The planner estimate must at least cover the rows already seen
+                seen = (self.page - 1) * self.per_page + len(self.pagination.items)
+                return max(total, seen)
+
+        return self._exact_count()
+
+    def _exact_count(self):
+        return self.query.order_by(None).count()
+
+    def _estimated_count(self):
+        """
+        Row estimate of the Postgres planner for the query, avoiding a full
+        COUNT(*) over large tables. Returns None if no estimate is available.
+        """
+        try:
+            return int(explain(self.query.order_by(None))["Plan Rows"])
+        except (SQLAlchemyError, NotImplementedError, KeyError, IndexError) as e:
+            logger.warning(f"Falling back to exact count: {str(e)}")
+            return None
 
     @property
     def items(self):
@@ -104,14 +199,148 @@ class PaginatedResult:
         return links
 
 
-def paginate(query, schema, endpoint=None, **kwargs):
+class CursorPaginatedResult:
+    """
+    Keyset (cursor) pagination over a query ordered descending by cursor_columns.
+    Pages are fetched with a row value comparison on the last seen key,
+    so neither COUNT(*) nor OFFSET is needed.
+    """
+
+    def __init__(self, query, cursor_columns, cursor=None, per_page=10):
+        """
+        Initialize paginator with query and cursor parameters.
+
+        Args:
+            query: SQLAlchemy query object
+            cursor_columns: Columns forming a unique descending sort key
+            cursor: Opaque cursor from a previous page (default: first page)
+            per_page: Items per page (default: 10)
+        """
+        self.cursor_columns = cursor_columns
+        self.per_page = max(1, per_page)
+        self.cursor = cursor
+
+        direction, values = self._decode_cursor(cursor) if cursor else ("next", None)
+        self.direction = direction
+
+        query = query.order_by(None)
+        key = tuple_(*cursor_columns)
+
+        if direction == "next":
+            if values is not None:
+                query = query.filter(key < tuple_(*values))
+            query = query.order_by(*[column.desc() for column in cursor_columns])
+        else:
+            query = query.filter(key > tuple_(*values))
+            query = query.order_by(*[column.asc() for column in cursor_columns])
+
+        # Fetch one extra row to know whether there is another page
+        items = query.limit(self.per_page + 1).all()
+        has_more = len(items) > self.per_page
+        items = items[: self.per_page]
+
+        if direction == "next":
+            self.has_next = has_more
+            self.has_prev = cursor is not None
+        else:
+            items.reverse()
+            self.has_next = True
+            self.has_prev = has_more
+
+        self.items = items
+
+    def _encode_cursor(self, direction, item):
+        """Build an opaque cursor pointing at the sort key of an item"""
+        values = []
+        for column in self.cursor_columns:
+            value = getattr(item, column.key)
+            values.append(
+                value.isoformat() if isinstance(value, datetime) else str(value)
+            )
+
+        payload = json.dumps({"d": direction, "v": values})
+        return base64.urlsafe_b64encode(payload.encode()).decode()
+
+    def _decode_cursor(self, cursor):
+        """Parse a cursor back into its direction and typed sort key values"""
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            direction = payload["d"]
+            raw_values = payload["v"]
+
+            if direction not in ("next", "prev") or len(raw_values) != len(
+                self.cursor_columns
+            ):
+                raise ValueError("Malformed cursor")
+
+            values = []
+            for column, value in zip(self.cursor_columns, raw_values):
+                python_type = column.type.python_type
+                if python_type is datetime:
+                    values.append(datetime.fromisoformat(value))
+                elif python_type is uuid.UUID:
+                    values.append(uuid.UUID(value))
+                else:
+                    values.append(python_type(value))
+
+            return direction, values
+        except (ValueError, TypeError, KeyError, NotImplementedError):
+            raise ValidationError("Invalid pagination cursor")
+
+    def to_dict(self, schema, endpoint=None, **kwargs):
+        """
+        Convert cursor paginated results to a response with previous/next links.
+
+        Args:
+            schema: Marshmallow schema to serialize items
+            endpoint: Optional endpoint name for generating URLs
+            **kwargs: Additional URL parameters to include in pagination links
+
+        Returns:
+            Dictionary with items and cursor pagination metadata
+        """
+        response = {"per_page": self.per_page, "previous": None, "next": None}
+
+        if endpoint and self.items:
+            # Keep the request filters, the cursor is only valid for them
+            params = {**request.args.to_dict(), **kwargs}
+            params["pagination"] = "cursor"
+            params["per_page"] = self.per_page
+
+            if self.has_prev:
+                params["cursor"] = self._encode_cursor("prev", self.items[0])
+                response["previous"] = url_for(endpoint, **params, _external=True)
+
+            if self.has_next:
+                params["cursor"] = self._encode_cursor("next", self.items[-1])
+                response["next"] = url_for(endpoint, **params, _external=True)
+
+        response["data"] = schema.dump(self.items)
+
+        return response
+
+
+def paginate(
+    query,
+    schema,
+    endpoint=None,
+    cursor_columns=None,
+    count_strategy=CountStrategy.EXACT,
+    count_owner_id=None,
+    **kwargs,
+):
     """
     Helper function to paginate a query and return standardized results.
 
     Args:
         query: SQLAlchemy query object
-        schema: Marshmallow schema for serializing items
+        schema: Marshmallow schema, or a ColumnSerializer of one, for serializing items
         endpoint: Optional endpoint name for generating navigation URLs
+        cursor_columns: Optional unique descending sort key enabling cursor
+            pagination when the request asks for it with ?pagination=cursor
+        count_strategy: How total_items is computed, exact, cached per owner
+            and filters, or estimated by the Postgres planner
+        count_owner_id: User owning the listed rows, used by cached counts
         **kwargs: Additional parameters (page, per_page, and URL params)
 
     Returns:
@@ -136,8 +365,28 @@ def paginate(query, schema, endpoint=None, **kwargs):
     # Ensure reasonable limits for pagination
     per_page = min(per_page, MAX_PAGE_SIZE)  # Cap at maximum page size
 
+    if isinstance(schema, ColumnSerializer):
+        # Fast path, select only the dumped columns instead of ORM objects
+        query = schema.select(query)
+    else:
+        # Load the relationships the schema dumps up front to avoid N+1 queries
+        query = apply_eager_loading(query, schema)
+
+    # Keyset pagination is opt-in so existing clients keep page numbers
+    if cursor_columns and request.args.get("pagination") == "cursor":
+        paginated_result = CursorPaginatedResult(
+            query, cursor_columns, request.args.get("cursor"), per_page
+        )
+        return paginated_result.to_dict(schema, endpoint, **kwargs)
+
     # Create paginated result
-    paginated_result = PaginatedResult(query, page, per_page)
+    paginated_result = PaginatedResult(
+        query,
+        page,
+        per_page,
+        count_strategy=count_strategy,
+        count_owner_id=count_owner_id,
+    )
 
     # Return formatted result
     return paginated_result.to_dict(schema, endpoint, **kwargs)
@@ -2,13 +2,15 @@ from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 from flask import jsonify, request, g
 from functools import wraps
 from app.models.user import User
-from app.models.auth import ActiveAccessToken
 import uuid
 from app.utils.logger import logger
 from app.utils.validators import is_valid_uuid
 from app.extensions import db
+from sqlalchemy import select
 from flask_jwt_extended import get_jwt
 from app.utils.enums import UserRole
+from app.utils.principal_cache import invalidate_principal
+from app.utils.tokens import TokenHandler
 
 
 def get_jwt_role():
@@ -21,17 +23,20 @@ def authenticated_user(fn):
     @wraps(fn)
     @jwt_required()
     def wrapper(*args, **kwargs):
-        token = request.headers.get("Authorization").split(" ")[1]
-        token_entry = ActiveAccessToken.query.filter_by(access_token=token).first()
-
-        if not token_entry or not token_entry.user:
-            logger.error(
-                f"Authentication failed: Invalid token or no user for '{token}'"
-            )
+        jti = get_jwt()["jti"]
+        principal = g.get("principal") or TokenHandler.get_active_principal(jti)
+        user = (
+            db.session.get(User, uuid.UUID(principal["user_id"])) if principal else None
+        )
+
+        if not user or principal["is_deleted"]:
+            logger.error(f"Authentication failed: Invalid token or no user for '{jti}'")
+            invalidate_principal(jti)
             return {"error": "Invalid authorization detail."}, 401
 
-        # Set user in context
-        g.user = token_entry.user
+        # Set user and its resolved principal in context
+        g.user = user
+        g.principal = principal
 
         # Also set role from token for easier access
         g.role = get_jwt_role()
@@ -42,9 +47,63 @@ def authenticated_user(fn):
     return wrapper
 
 
-def object_permission(model_class, id_param="id", check_fn=None):
+def get_child_id(user):
+    """
+    Get the id of the active child of a user.
+    Uses the child id resolved with the authenticated principal when available.
+    """
+    principal = g.get("principal")
+    if principal and principal["user_id"] == str(user.id):
+        return uuid.UUID(principal["child_id"]) if principal["child_id"] else None
+
+    child = user.get_child()
+    return child.id if child else None
+
+
+def get_visible_object(model_class, object_id, load_options=()):
+    """
+    Fetch an object in a single query, only if the request user can see it.
+
+    - ADMIN: any object for GET, non deleted objects otherwise
+    - CHILD_USER: own non deleted objects
+    - USER: own and its child's non deleted objects
+
+    Returns:
+        The object with load_options applied, or None if it is not visible
+    """
+    request_user = g.user
+    request_user_role = g.role
+
+    query = select(model_class).where(model_class.id == object_id)
+
+    if not (request_user_role == UserRole.ADMIN.value and request.method == "GET"):
+        query = query.where(model_class.is_deleted == False)
+
+    if request_user_role == UserRole.CHILD_USER.value:
+        query = query.where(model_class.user_id == request_user.id)
+
+    elif request_user_role != UserRole.ADMIN.value:
+        owner_ids = [request_user.id]
+        child_id = get_child_id(request_user)
+        if child_id:
+            owner_ids.append(child_id)
+        query = query.where(model_class.user_id.in_(owner_ids))
+
+    if load_options:
+        query = query.options(*load_options)
+
+    return db.session.execute(query).unique().scalar_one_or_none()
+
+
+def object_permission(
+    model_class, id_param="id", check_fn=None, scoped=False, load_options=()
+):
     """
     Generic object permission decorator that retrieves an object and checks permissions.
+
+    With scoped=True the object is fetched in one query that already applies the
+    default ownership rules, instead of being loaded first and checked afterwards.
+    load_options (e.g. joinedload of serialized relationships) are applied to it.
     """
 
     def decorator(fn):
@@ -56,6 +115,9 @@ def object_permission(model_class, id_param="id", check_fn=None):
                 logger.warning(f"Missing {id_param} in request")
                 return {"error": "Missing object ID"}, 400
 
+            if scoped and not check_fn:
+                return scoped_wrapper(object_id, *args, **kwargs)
+
             obj = db.session.get(model_class, uuid.UUID(object_id))
             if not obj:
                 logger.error(f"{model_class.__name__} not found for ID: {object_id}")
@@ -123,6 +185,33 @@ def object_permission(model_class, id_param="id", check_fn=None):
             )
             return fn(*args, **kwargs)
 
+        def scoped_wrapper(object_id, *args, **kwargs):
+            request_user = g.user
+            request_method = request.method
+
+            obj = get_visible_object(model_class, uuid.UUID(object_id), load_options)
+            if not obj:
+                logger.error(
+                    f"{model_class.__name__} {object_id} not found or not visible for user {request_user.id}"
+                )
+                return {"error": f"{model_class.__name__} not found"}, 404
+
+            # Parents can view their child's objects but not modify them
+            if (
+                request_method != "GET"
+                and g.role == UserRole.USER.value
+                and obj.user_id != request_user.id
+            ):
+                return {
+                    "error": "You don't have permission to modify your child resource."
+                }, 403
+
+            g.object = obj
+            logger.info(
+                f"Permission granted for user {request_user.id} on {model_class.__name__} {obj.id} ({request_method})"
+            )
+            return fn(*args, **kwargs)
+
         return wrapper
 
     return decorator
@@ -0,0 +1,304 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import redis
+from flask import current_app
+
+from app.extensions import redis_client
+from app.utils.logger import logger
+
+
+class LocalPrincipalCache:
+    """
+    Bounded in-memory LRU of resolved principals, one per worker process.
+    Entries expire after a short TTL so a missed invalidation message can
+    only keep a revoked token alive for that long.
+    """
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, jti):
+        with self._lock:
+            entry = self._entries.get(jti)
+            if not entry:
+                return None
+
+            expires_at, principal = entry
+            if expires_at < time.monotonic():
+                del self._entries[jti]
+                return None
+
+            self._entries.move_to_end(jti)
+            return principal
+
+    def set(self, jti, principal, ttl, max_size):
+        if ttl <= 0 or max_size <= 0:
+            return
+
+        with self._lock:
+            self._entries[jti] = (time.monotonic() + ttl, principal)
+            self._entries.move_to_end(jti)
+            while len(self._entries) > max_size:
+                self._entries.popitem(last=False)
+
+    def discard(self, jti):
+        with self._lock:
+            self._entries.pop(jti, None)
+
+    def discard_user(self, user_id, keep_jti=None):
+        with self._lock:
+            for jti, (_, principal) in list(self._entries.items()):
+                if principal["user_id"] == str(user_id) and jti != keep_jti:
+                    del self._entries[jti]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+local_principals = LocalPrincipalCache()
+
+_listener_lock = threading.Lock()
+_listener_pid = None
+_listener_thread = None
+
+
+# Cache a principal unless its token or user was revoked moments ago, as a
+# request that read the token before the revocation committed would put it back
+CACHE_PRINCIPAL_SCRIPT = """
+if redis.call("exists", KEYS[3]) == 1 then
+    return 0
+end
+local kept_jti = redis.call("get", KEYS[4])
+if kept_jti and kept_jti ~= ARGV[3] then
+    return 0
+end
+redis.call("setex", KEYS[1], ARGV[1], ARGV[2])
+redis.call("sadd", KEYS[2], ARGV[3])
+redis.call("expire", KEYS[2], ARGV[1])
+return 1
+"""
+
+
+def _principal_key(jti):
+    return f"principal:{jti}"
+
+
+def _user_principals_key(user_id):
+    return f"user_principals:{user_id}"
+
+
+def _revoked_key(jti):
+    return f"principal_revoked:{jti}"
+
+
+def _revoked_user_key(user_id):
+    """Revocation of all tokens of a user, holding the jti kept, if any"""
+    return f"principal_revoked_user:{user_id}"
+
+
+def _cache_locally(jti, principal):
+    local_principals.set(
+        str(jti),
+        principal,
+        current_app.config["PRINCIPAL_L1_CACHE_TTL"],
+        current_app.config["PRINCIPAL_L1_CACHE_SIZE"],
+    )
+
+
+def _handle_invalidation(message):
+    """Apply an invalidation published by any worker to the local cache."""
+    try:
+        data = json.loads(message["data"])
+    except (TypeError, ValueError):
+        logger.warning(f"Ignoring malformed principal invalidation: {message}")
+        return
+
+    if data.get("jti"):
+        local_principals.discard(data["jti"])
+    elif data.get("user_id"):
+        local_principals.discard_user(data["user_id"], data.get("keep_jti"))
+
+
+def _stop_listener(exception, pubsub, thread):
+    """Stop a listener whose connection failed, the next lookup restarts it."""
+    logger.warning(f"Principal invalidation listener stopped: {str(exception)}")
+    thread.stop()
+
+
+def _listener_running():
+    return (
+        _listener_pid == os.getpid()
+        and _listener_thread is not None
+        and _listener_thread.is_alive()
+    )
+
+
+def _ensure_invalidation_listener():
+    """
+    Subscribe this worker process to the principal invalidation channel.
+    Runs once per process, so forked gunicorn workers get their own listener,
+    and again whenever the listener thread died with its connection.
+    """
+    global _listener_pid, _listener_thread
+
+    if _listener_running():
+        return
+
+    with _listener_lock:
+        if _listener_running():
+            return
+
+        # Entries inherited from the parent process, or cached while the
+        # listener was down, may have missed their invalidation
+        local_principals.clear()
+
+        try:
+            pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(
+                **{
+                    current_app.config[
+                        "PRINCIPAL_INVALIDATION_CHANNEL"
+                    ]: _handle_invalidation
+                }
+            )
+            _listener_thread = pubsub.run_in_thread(
+                sleep_time=1, daemon=True, exception_handler=_stop_listener
+            )
+            _listener_pid = os.getpid()
+            logger.info(f"Principal invalidation listener started in {_listener_pid}")
+        except redis.RedisError as e:
+            logger.warning(f"Failed to start principal invalidation listener: {str(e)}")
+
+
+def _publish_invalidation(payload):
+    redis_client.publish(
+        current_app.config["PRINCIPAL_INVALIDATION_CHANNEL"], json.dumps(payload)
+    )
+
+
+def get_cached_principal(jti):
+    """
+    Get the cached principal for an access token by its jti.
+    Looks in the local worker cache first and then in Redis.
+
+    Returns:
+        dict with user_id, role, is_deleted and child_id, or None on a cache miss
+    """
+    _ensure_invalidation_listener()
+
+    principal = local_principals.get(str(jti))
+    if principal:
+        return principal
+
+    try:
+        data = redis_client.get(_principal_key(jti))
+    except redis.RedisError as e:
+        logger.warning(f"Principal cache lookup failed: {str(e)}")
+        return None
+
+    if not data:
+        return None
+
+    principal = json.loads(data)
+    _cache_locally(jti, principal)
+    return principal
+
+
+def cache_principal(jti, user, child=None):
+    """
+    Store the resolved principal for an access token in Redis.
+    The entry lives as long as an access token does. Nothing is cached for
+    a token revoked within PRINCIPAL_REVOCATION_TTL, the principal is only
+    returned.
+    """
+    ttl = current_app.config["JWT_ACCESS_TOKEN_EXPIRES"]
+
+    principal = {
+        "user_id": str(user.id),
+        "role": user.role.value,
+        "is_deleted": bool(user.is_deleted),
+        "child_id": str(child.id) if child else None,
+    }
+
+    try:
+        cached = redis_client.eval(
+            CACHE_PRINCIPAL_SCRIPT,
+            4,
+            _principal_key(jti),
+            _user_principals_key(user.id),
+            _revoked_key(jti),
+            _revoked_user_key(user.id),
+            ttl,
+            json.dumps(principal),
+            str(jti),
+        )
+    except redis.RedisError as e:
+        logger.warning(f"Failed to cache principal for user {user.id}: {str(e)}")
+        cached = True
+
+    if cached:
+        _cache_locally(jti, principal)
+    return principal
+
+
+def invalidate_principal(jti):
+    """
+    Remove the cached principal of a single access token from every worker.
+    Call it once the token is deleted from the database.
+    """
+    local_principals.discard(str(jti))
+
+    try:
+        pipe = redis_client.pipeline()
+        pipe.setex(_revoked_key(jti), current_app.config["PRINCIPAL_REVOCATION_TTL"], 1)
+        pipe.delete(_principal_key(jti))
+        pipe.execute()
+        _publish_invalidation({"jti": str(jti)})
+    except redis.RedisError as e:
+        logger.warning(f"Failed to invalidate cached principal: {str(e)}")
+
+
+def invalidate_user_principals(user_id, keep_jti=None):
+    """
+    Remove all cached principals of a user from every worker.
+    Call it once the user's changes are committed.
+
+    Args:
+        user_id: ID of the user whose cached principals should be dropped
+        keep_jti: Optional jti of an access token whose cached principal is kept
+    """
+    keep_jti = str(keep_jti) if keep_jti else None
+    local_principals.discard_user(user_id, keep_jti)
+
+    user_key = _user_principals_key(user_id)
+
+    try:
+        # Revoke first, principals cached before are all in the set below
+        redis_client.setex(
+            _revoked_user_key(user_id),
+            current_app.config["PRINCIPAL_REVOCATION_TTL"],
+            keep_jti or "",
+        )
+        stale_jtis = [jti for jti in redis_client.smembers(user_key) if jti != keep_jti]
+
+        pipe = redis_client.pipeline()
+        for jti in stale_jtis:
+            pipe.delete(_principal_key(jti))
+            pipe.srem(user_key, jti)
+        pipe.execute()
+
+        _publish_invalidation({"user_id": str(user_id), "keep_jti": keep_jti})
+
+        logger.info(
+            f"Invalidated {len(stale_jtis)} cached principals for user: {user_id}"
+        )
+    except redis.RedisError as e:
+        logger.warning(
+            f"Failed to invalidate cached principals for user {user_id}: {str(e)}"
+        )
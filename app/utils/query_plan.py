@@ -0,0 +1,64 @@
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+from app.extensions import db
+
+
+def explain(query, analyze=False):
+    """
+    Postgres plan of a query or select statement.
+
+    Bound parameters are rendered inline so the planner sees the actual
+    values, as it does for the parameterized query at runtime.
+
+    Returns:
+        The top "Plan" node of EXPLAIN (FORMAT JSON)
+    """
+    statement = getattr(query, "statement", query)
+    sql = statement.compile(
+        dialect=db.engine.dialect, compile_kwargs={"literal_binds": True}
+    )
+    options = "ANALYZE, FORMAT JSON" if analyze else "FORMAT JSON"
+    plan = db.session.connection().exec_driver_sql(f"EXPLAIN ({options}) {sql}")
+    return plan.scalar()[0]["Plan"]
+
+
+def iter_plan_nodes(plan):
+    """Walk a plan node and all nodes below it"""
+    yield plan
+    for child in plan.get("Plans", ()):
+        yield from iter_plan_nodes(child)
+
+
+def explain_statement(statement, parameters=None):
+    """
+    Postgres plan of a raw SQL statement with its DBAPI parameters, as
+    captured by capture_statements.
+
+    Returns:
+        The top "Plan" node of EXPLAIN (FORMAT JSON)
+    """
+    plan = db.session.connection().exec_driver_sql(
+        f"EXPLAIN (FORMAT JSON) {statement}", parameters or ()
+    )
+    return plan.scalar()[0]["Plan"]
+
+
+@contextmanager
+def capture_statements():
+    """
+    Collect the (statement, parameters) of every SELECT sent to the database
+    inside the block, e.g. to explain all queries a service issues.
+    """
+    statements = []
+
+    def collect(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            statements.append((statement, parameters))
+
+    event.listen(db.engine, "before_cursor_execute", collect)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, "before_cursor_execute", collect)
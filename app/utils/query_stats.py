@@ -0,0 +1,157 @@
+import re
+import time
+
+from flask import current_app, g, has_app_context, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config import Config
+from app.utils.logger import logger
+
+# Connection.info key holding the start times of the statements in flight
+_START_KEY = "query_start_times"
+
+# Longest statement text kept as the slowest query of a request
+SLOWEST_STATEMENT_LENGTH = 200
+
+
+class QueryStats:
+    """Queries issued while handling one request"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.slowest_duration = 0.0
+        self.slowest_statement = None
+        self.status_code = None
+
+    def record(self, statement, duration):
+        self.count += 1
+        self.duration += duration
+        if duration > self.slowest_duration:
+            self.slowest_duration = duration
+            self.slowest_statement = statement
+
+
+def _collapse(statement):
+    return re.sub(r"\s+", " ", statement).strip()
+
+
+def parameter_shape(parameters, executemany=False):
+    """
+    Names and types of bound parameters without their values, so slow query
+    logs never carry user data.
+    """
+    if executemany:
+        if not parameters:
+            return "[]"
+        return f"{len(parameters)} x {parameter_shape(parameters[0])}"
+    if isinstance(parameters, dict):
+        return str({key: type(value).__name__ for key, value in parameters.items()})
+    return str([type(value).__name__ for value in parameters or ()])
+
+
+def _slow_query_threshold():
+    if has_app_context():
+        return current_app.config["SLOW_QUERY_THRESHOLD_MS"]
+    return Config.SLOW_QUERY_THRESHOLD_MS
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault(_START_KEY, []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get(_START_KEY)
+    if not starts:
+        return
+    duration = (time.perf_counter() - starts.pop()) * 1000
+
+    if has_request_context() and "query_stats" in g:
+        g.query_stats.record(statement, duration)
+
+    if duration >= _slow_query_threshold():
+        logger.warning(
+            f"Slow query {duration:.2f} ms: {_collapse(statement)} "
+            f"params={parameter_shape(parameters, executemany)}"
+        )
+
+
+def _discard_failed(exception_context):
+    # A failed statement never reaches after_cursor_execute
+    connection = exception_context.connection
+    if connection is not None and connection.info.get(_START_KEY):
+        connection.info[_START_KEY].pop()
+
+
+def get_query_stats():
+    """Query stats of the current request, None outside of a request"""
+    if has_request_context():
+        return g.get("query_stats")
+    return None
+
+
+def server_timing(stats):
+    """Server-Timing header value of a request's query stats"""
+    return (
+        f'db;dur={stats.duration:.2f};desc="{stats.count} queries", '
+        f"db-slowest;dur={stats.slowest_duration:.2f}"
+    )
+
+
+def parse_query_count(header):
+    """
+    Number of queries from a Server-Timing header set by server_timing.
+
+    Returns:
+        The query count, or None when the header has no db metric
+    """
+    match = re.search(r'(?:^|,)\s*db;[^,]*desc="(\d+) queries"', header or "")
+    return int(match.group(1)) if match else None
+
+
+def _start_request():
+    g.query_stats = QueryStats()
+
+
+def _add_server_timing(response):
+    stats = get_query_stats()
+    if stats is not None:
+        stats.status_code = response.status_code
+        if current_app.config["QUERY_STATS_HEADER"]:
+            response.headers.add("Server-Timing", server_timing(stats))
+    return response
+
+
+def _log_request(exc):
+    stats = g.pop("query_stats", None)
+    if stats is None:
+        return
+    slowest = (
+        _collapse(stats.slowest_statement)[:SLOWEST_STATEMENT_LENGTH]
+        if stats.slowest_statement
+        else None
+    )
+    logger.info(
+        f"Query stats method={request.method} path={request.path} "
+        f"endpoint={request.endpoint} "
+        f"status={stats.status_code or 500} queries={stats.count} "
+        f"db_ms={stats.duration:.2f} slowest_ms={stats.slowest_duration:.2f} "
+        f"slowest={slowest!r}"
+    )
+
+
+def register_query_stats(app):
+    """
+    Count the queries, database time and slowest statement of every request,
+    report them in a Server-Timing header and a log line per request, and log
+    statements slower than SLOW_QUERY_THRESHOLD_MS with their parameter shape.
+    """
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(Engine, "handle_error", _discard_failed)
+
+    app.before_request(_start_request)
+    app.after_request(_add_server_timing)
+    app.teardown_request(_log_request)
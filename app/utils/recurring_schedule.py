@@ -0,0 +1,79 @@
+import redis
+from flask import current_app
+
+from app.extensions import redis_client
+from app.utils.logger import logger
+
+# Sorted set of recurring transaction ids scored by their next execution
+SCHEDULE_KEY = "recurring_transactions:schedule"
+
+# Take the due members and move them to the lease score, so a dispatched
+# execution is not dispatched again unless it is not rescheduled in time
+CLAIM_DUE_SCRIPT = """
+local due = redis.call("zrangebyscore", KEYS[1], "-inf", ARGV[1], "LIMIT", 0, ARGV[2])
+for _, member in ipairs(due) do
+    redis.call("zadd", KEYS[1], "XX", ARGV[3], member)
+end
+return due
+"""
+
+
+def execution_score(execution_at):
+    """Score of an execution time, execution times are naive local times"""
+    return execution_at.timestamp()
+
+
+def schedule_executions(executions):
+    """
+    Put recurring transactions in the schedule at their next execution.
+
+    Args:
+        executions: Dict of next execution times by recurring transaction id
+    """
+    if not executions:
+        return
+    try:
+        redis_client.zadd(
+            SCHEDULE_KEY,
+            {
+                str(recurring_id): execution_score(execution_at)
+                for recurring_id, execution_at in executions.items()
+            },
+        )
+    except redis.RedisError as e:
+        logger.warning(f"Failed to schedule recurring transactions: {str(e)}")
+
+
+def unschedule_executions(recurring_ids):
+    """Take recurring transactions that will not run anymore off the schedule"""
+    if not recurring_ids:
+        return
+    try:
+        redis_client.zrem(SCHEDULE_KEY, *(str(id) for id in recurring_ids))
+    except redis.RedisError as e:
+        logger.warning(f"Failed to unschedule recurring transactions: {str(e)}")
+
+
+def claim_due_executions(now, limit):
+    """
+    Claim up to limit recurring transactions scheduled at or before now.
+    Claimed ids are leased for RECURRING_DISPATCH_LEASE seconds, if their
+    execution does not reschedule them by then they come due again.
+
+    Returns:
+        List of recurring transaction ids, empty when the schedule is
+        unavailable
+    """
+    lease_until = execution_score(now) + current_app.config["RECURRING_DISPATCH_LEASE"]
+    try:
+        return redis_client.eval(
+            CLAIM_DUE_SCRIPT,
+            1,
+            SCHEDULE_KEY,
+            execution_score(now),
+            limit,
+            lease_until,
+        )
+    except redis.RedisError as e:
+        logger.warning(f"Failed to claim due recurring transactions: {str(e)}")
+        return []
@@ -0,0 +1,133 @@
+import hashlib
+import json
+import time
+
+import redis
+from flask import current_app, has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.extensions import redis_client
+from app.utils.logger import logger
+
+# Session.info key collecting the report data owners written in a transaction
+_PENDING_KEY = "report_cache_writes"
+
+# Tables whose rows end up in reports, transaction amounts and the names of
+# their categories and wallets
+REPORT_TABLES = ("transactions", "categories", "wallets")
+
+# Version scope of predefined categories, shown in the reports of every user
+GLOBAL_SCOPE = "global"
+
+
+def _version_key(scope):
+    return f"report_version:{scope}"
+
+
+def _report_key(kind, owner_id, versions, params_hash):
+    return f"report:{kind}:{owner_id}:{':'.join(versions)}:{params_hash}"
+
+
+def hash_params(params):
+    """Hash report parameters independently of their order"""
+    canonical = json.dumps(params, sort_keys=True, default=str)
+    return hashlib.sha1(canonical.encode()).hexdigest()
+
+
+def get_report_versions(owner_id):
+    """
+    Current data versions of an owner's reports, to read before building a
+    report and to pass to both get_cached_report and cache_report.
+
+    Returns:
+        List of versions, or None when the cache is unavailable
+    """
+    try:
+        values = redis_client.mget(_version_key(owner_id), _version_key(GLOBAL_SCOPE))
+        return [value or "0" for value in values]
+    except redis.RedisError as e:
+        logger.warning(f"Report version lookup failed: {str(e)}")
+        return None
+
+
+def get_cached_report(kind, owner_id, params, versions):
+    """
+    Get a cached report payload of an owner for the given parameters.
+
+    Returns:
+        The cached payload, or None on a cache miss
+    """
+    try:
+        payload = redis_client.get(
+            _report_key(kind, owner_id, versions, hash_params(params))
+        )
+        return json.loads(payload) if payload is not None else None
+    except redis.RedisError as e:
+        logger.warning(f"Report cache lookup failed: {str(e)}")
+        return None
+
+
+def cache_report(kind, owner_id, params, versions, payload):
+    """
+    Store a report payload under the versions read before it was built, so
+    a write that lands while the report is computed leaves the entry stale
+    on arrival instead of hiding the write.
+    """
+    try:
+        redis_client.setex(
+            _report_key(kind, owner_id, versions, hash_params(params)),
+            current_app.config["REPORT_CACHE_TTL"],
+            json.dumps(payload),
+        )
+    except redis.RedisError as e:
+        logger.warning(f"Failed to cache report for user {owner_id}: {str(e)}")
+
+
+def invalidate_reports(scope):
+    """
+    Invalidate the cached reports of a user (or of everyone for the global
+    scope) by moving its version to the current time. Versions are never
+    reused, so the key may expire together with the entries stored under it.
+    """
+    try:
+        redis_client.set(
+            _version_key(scope),
+            time.time_ns(),
+            ex=current_app.config["REPORT_CACHE_TTL"],
+        )
+    except redis.RedisError as e:
+        logger.warning(f"Failed to invalidate reports of {scope}: {str(e)}")
+
+
+def _collect_writes(session, flush_context):
+    """Remember whose reports the objects written in a flush show up in"""
+    pending = session.info.setdefault(_PENDING_KEY, set())
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if getattr(obj, "__tablename__", None) not in REPORT_TABLES:
+            continue
+        if getattr(obj, "is_predefined", False):
+            pending.add(GLOBAL_SCOPE)
+        elif obj.user_id is not None:
+            pending.add(str(obj.user_id))
+
+
+def _invalidate_committed(session):
+    if not has_app_context():
+        _discard_pending(session)
+        return
+
+    for scope in session.info.pop(_PENDING_KEY, ()):
+        invalidate_reports(scope)
+
+
+def _discard_pending(session):
+    session.info.pop(_PENDING_KEY, None)
+
+
+def register_report_cache_listeners():
+    """Invalidate cached reports whenever data they show is committed"""
+    if not event.contains(Session, "after_flush", _collect_writes):
+        event.listen(Session, "after_flush", _collect_writes)
+        event.listen(Session, "after_commit", _invalidate_committed)
+        event.listen(Session, "after_rollback", _discard_pending)
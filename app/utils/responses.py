@@ -1,4 +1,8 @@
-from flask import Response
+import json
+
+from flask import Response, stream_with_context
+from app.utils.constants import STREAM_CHUNK_SIZE
+from app.utils.pagination import apply_eager_loading
 from app.utils.logger import logger
 
 
@@ -13,3 +17,23 @@ def validation_error_response(error):
 
     logger.warning(f"Data validation error: {formatted_errors}")
     return {"error": formatted_errors}, 400
+
+
+def ndjson_stream_response(query, schema, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Stream the rows of a query as newline delimited JSON.
+    Rows are fetched through a server side cursor in chunks, with the
+    schema's eager loading profile applied per chunk, and serialized one
+    at a time, so memory stays flat whatever the size of the result.
+    """
+
+    query = apply_eager_loading(query, schema)
+
+    def generate():
+        count = 0
+        for item in query.yield_per(chunk_size):
+            yield json.dumps(schema.dump(item)) + "\n"
+            count += 1
+        logger.info(f"Streamed {count} rows")
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
@@ -0,0 +1,156 @@
+import decimal
+
+from marshmallow import fields
+from sqlalchemy.orm import aliased
+
+
+def _uuid(value):
+    return str(value)
+
+
+def _string(value):
+    return str(value)
+
+
+def _datetime(value):
+    return value.isoformat()
+
+
+def _boolean(value):
+    return bool(value)
+
+
+def _enum_value(value):
+    return value.value
+
+
+def _decimal_formatter(field):
+    places = field.places
+    rounding = field.rounding
+
+    def format_decimal(value):
+        number = decimal.Decimal(str(value))
+        if places is not None and number.is_finite():
+            number = number.quantize(places, rounding=rounding)
+        return str(number) if field.as_string else number
+
+    return format_decimal
+
+
+def _formatter(field, name):
+    """
+    Plain function formatting a non null column value exactly like the
+    marshmallow field would, falling back to the field itself for any
+    field type without a fast equivalent.
+    """
+    if isinstance(field, fields.UUID):
+        return _uuid
+    if isinstance(field, fields.DateTime) and field.format in (None, "iso"):
+        return _datetime
+    if isinstance(field, fields.Decimal) and not field.allow_nan:
+        return _decimal_formatter(field)
+    if isinstance(field, fields.Boolean):
+        return _boolean
+    if isinstance(field, fields.Enum) and field.by_value is True:
+        return _enum_value
+    if type(field) is fields.String:
+        return _string
+
+    return lambda value: field._serialize(value, name, None)
+
+
+class ColumnSerializer:
+    """
+    Fast path serializer for read only list responses.
+
+    Selects only the columns a schema dumps (joining the nested relationships it
+    dumps with their `only` columns) and turns each result row into a dict with
+    plain per column formatters, skipping ORM object loading and marshmallow's
+    per object machinery. Output is identical to schema.dump for the same rows.
+    Use it in place of the schema with paginate.
+    """
+
+    def __init__(self, schema):
+        self.schema = schema
+        self.model = schema.Meta.model
+        self._columns = None
+        self._nested = None
+
+    def _build(self):
+        """
+        Resolve the dumped columns on first use, once nested schemas referenced
+        by name are registered.
+        """
+        if self._columns is not None:
+            return
+
+        self._columns = []
+        self._nested = []
+        for name, field in self.schema.dump_fields.items():
+            attribute = field.attribute or name
+
+            if isinstance(field, fields.Nested):
+                relationship = getattr(self.model, attribute)
+                target = aliased(relationship.property.mapper.class_)
+                # The nested schema keeps its own field order for the `only` columns
+                columns = [
+                    (
+                        f"{name}__{column}",
+                        column,
+                        getattr(target, nested_field.attribute or column),
+                        _formatter(nested_field, column),
+                    )
+                    for column, nested_field in field.schema.dump_fields.items()
+                ]
+                self._nested.append((name, relationship, target, columns))
+                self._columns.append((name, None, None))
+            else:
+                self._columns.append(
+                    (name, getattr(self.model, attribute), _formatter(field, name))
+                )
+
+    def select(self, query):
+        """Turn a query of the schema's model into a query of just the dumped columns"""
+        self._build()
+
+        entities = [
+            column.label(name)
+            for name, column, _ in self._columns
+            if column is not None
+        ]
+        for _, relationship, target, columns in self._nested:
+            query = query.outerjoin(relationship.of_type(target))
+            entities.extend(column.label(label) for label, _, column, _ in columns)
+
+        return query.with_entities(*entities)
+
+    def dump(self, rows):
+        """Serialize rows of a query built with select"""
+        self._build()
+        nested = {name: columns for name, _, _, columns in self._nested}
+
+        result = []
+        for row in rows:
+            mapping = row._mapping
+            item = {}
+            for name, column, formatter in self._columns:
+                if column is None:
+                    columns = nested[name]
+                    # Outer joined relationship without a related row
+                    if all(mapping[label] is None for label, _, _, _ in columns):
+                        item[name] = None
+                    else:
+                        item[name] = {
+                            key: (
+                                formatter(mapping[label])
+                                if mapping[label] is not None
+                                else None
+                            )
+                            for label, key, _, formatter in columns
+                        }
+                else:
+                    value = mapping[name]
+                    item[name] = formatter(value) if value is not None else None
+            result.append(item)
+
+        return result
@@ -1,5 +1,6 @@
 import secrets
-from datetime import timedelta
+import uuid
+from datetime import datetime, timedelta, timezone
 
 from flask_jwt_extended import create_access_token, create_refresh_token
 from flask import current_app
@@ -7,6 +8,13 @@ from flask import current_app
 from app.models.auth import ActiveAccessToken
 from app.extensions import db, redis_client
 from app.utils.logger import logger
+from app.utils.enums import UserRole
+from app.utils.principal_cache import (
+    get_cached_principal,
+    cache_principal,
+    invalidate_principal,
+    invalidate_user_principals,
+)
 
 
 class TokenHandler:
@@ -18,18 +26,27 @@ class TokenHandler:
     def generate_access_token(user, fresh):
         """Generate access token for a user"""
 
+        jti = uuid.uuid4()
+        expires_delta = timedelta(
+            seconds=current_app.config["JWT_ACCESS_TOKEN_EXPIRES"]
+        )
+
         additional_claims = {
-            "role": user.role.value if hasattr(user.role, "value") else str(user.role)
+            "role": user.role.value if hasattr(user.role, "value") else str(user.role),
+            "jti": str(jti),
         }
         access_token = create_access_token(
             identity=str(user.id),
             fresh=fresh,  # This is not a fresh login
             additional_claims=additional_claims,
-            expires_delta=timedelta(
-                seconds=current_app.config["JWT_ACCESS_TOKEN_EXPIRES"]
-            ),
+            expires_delta=expires_delta,
+        )
+        # Only the jti is allowlisted, the encoded token itself is never stored
+        token_entry = ActiveAccessToken(
+            jti=jti,
+            user_id=user.id,
+            expires_at=datetime.now(timezone.utc) + expires_delta,
         )
-        token_entry = ActiveAccessToken(access_token=access_token, user_id=user.id)
         db.session.add(token_entry)
         db.session.commit()
         return access_token
@@ -52,17 +69,38 @@ class TokenHandler:
         return refresh_token
 
     @staticmethod
-    def invalidate_access_token(token):
+    def get_active_principal(jti):
+        """
+        Resolve the principal of an allowlisted access token by its jti.
+        Returns None if the token is not active anymore.
+        """
+        principal = get_cached_principal(jti)
+        if principal:
+            return principal
+
+        token_entry = db.session.get(ActiveAccessToken, uuid.UUID(str(jti)))
+        if not token_entry or not token_entry.user:
+            return None
+
+        user = token_entry.user
+        child = user.get_child() if user.role == UserRole.USER else None
+        return cache_principal(jti, user, child)
+
+    @staticmethod
+    def invalidate_access_token(jti):
         """
-        Invalidate a specific access token.
+        Invalidate a specific access token by its jti.
         """
-        token_entry = ActiveAccessToken.query.filter_by(access_token=token).first()
+        token_entry = db.session.get(ActiveAccessToken, uuid.UUID(str(jti)))
         if token_entry:
+            username = token_entry.user.username
             db.session.delete(token_entry)
             db.session.commit()
             logger.info(
-                f"Logout successfully and Invalidated token for user: {token_entry.user.username}"
+                f"Logout successfully and Invalidated token for user: {username}"
             )
+        # Only once committed, a lookup in between would cache the row again
+        invalidate_principal(jti)
 
     @staticmethod
     def invalidate_user_access_tokens(user_id):
@@ -73,6 +111,7 @@ class TokenHandler:
         for token in tokens:
             db.session.delete(token)
         db.session.commit()
+        invalidate_user_principals(user_id)
         logger.info(f"Invalidated all tokens for user: {user_id}")
 
     @staticmethod
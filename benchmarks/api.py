@@ -0,0 +1,255 @@
+"""
+Load test the main REST endpoints with concurrent clients.
+
+Seeds users with benchmarks.dataset, serves the app on a local threaded
+server and drives each scenario with --clients concurrent clients, one
+seeded user each. Reports p50/p95/p99 latency, throughput and SQL queries
+per request for every scenario as JSON, to diff runs across commits.
+
+Needs the Postgres and Redis of the selected config. The seeded rows are
+committed so the server threads see them, and removed again at the end
+unless --keep-data is given.
+
+Usage:
+    python -m benchmarks.api --users 200 --transactions-per-user 500 \\
+        --clients 16 --requests 50 --output bench.json
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import requests
+from sqlalchemy import event
+from werkzeug.serving import make_server
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app import create_app
+from app.config import Config, TestConfig
+from app.extensions import bcrypt, db
+from benchmarks.dataset import delete_dataset, seed_dataset
+
+PASSWORD = "Benchmark123!"
+
+SCENARIOS = (
+    "login",
+    "list_transactions",
+    "create_transaction",
+    "transaction_report",
+    "list_budgets",
+)
+
+
+class QueryCounter:
+    """Counts the statements the app sends to the database"""
+
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        with self._lock:
+            self.count += 1
+
+
+def percentile(sorted_values, fraction):
+    """Nearest rank percentile of already sorted values"""
+    if not sorted_values:
+        return None
+    rank = max(0, min(len(sorted_values) - 1, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def login(base_url, email):
+    response = requests.post(
+        f"{base_url}/api/auth/login",
+        json={"username": email, "password": PASSWORD},
+        timeout=30,
+    )
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+def build_scenarios(dataset, report_range):
+    """
+    Request builders per scenario, each taking the client's user index and
+    returning (method, path, json body)
+    """
+
+    def create_transaction(index):
+        user_id = dataset.user_ids[index]
+        return (
+            "POST",
+            "/api/transactions",
+            {
+                "user_id": str(user_id),
+                "wallet_id": str(dataset.wallet_ids[user_id]),
+                "category_id": str(random.choice(dataset.category_ids[user_id])),
+                "amount": f"{random.randint(1, 500)}.00",
+                "type": "DEBIT",
+                "description": "Benchmark transaction",
+            },
+        )
+
+    return {
+        "login": lambda index: (
+            "POST",
+            "/api/auth/login",
+            {"username": dataset.emails[index], "password": PASSWORD},
+        ),
+        "list_transactions": lambda index: (
+            "GET",
+            f"/api/transactions?page={random.randint(1, 5)}&per_page=20",
+            None,
+        ),
+        "create_transaction": create_transaction,
+        "transaction_report": lambda index: (
+            "GET",
+            "/api/transactions/summary-report"
+            f"?start_date={report_range[0]}&end_date={report_range[1]}",
+            None,
+        ),
+        "list_budgets": lambda index: ("GET", "/api/budgets", None),
+    }
+
+
+def run_scenario(base_url, build_request, tokens, requests_per_client, counter):
+    """Run one scenario with a client per token and collect its metrics"""
+    errors = []
+
+    def client(index):
+        session = requests.Session()
+        session.headers["Authorization"] = f"Bearer {tokens[index]}"
+        latencies = []
+        for _ in range(requests_per_client):
+            method, path, body = build_request(index)
+            started = time.perf_counter()
+            response = session.request(
+                method, f"{base_url}{path}", json=body, timeout=60
+            )
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors.append(response.status_code)
+        return latencies
+
+    queries_before = counter.count
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(tokens)) as executor:
+        results = list(executor.map(client, range(len(tokens))))
+    elapsed = time.perf_counter() - started
+    queries = counter.count - queries_before
+
+    latencies = sorted(latency * 1000 for result in results for latency in result)
+    total = len(latencies)
+    return {
+        "requests": total,
+        "errors": len(errors),
+        "error_statuses": sorted(set(errors)),
+        "throughput_rps": round(total / elapsed, 2),
+        "latency_ms": {
+            "mean": round(sum(latencies) / total, 2),
+            "p50": round(percentile(latencies, 0.50), 2),
+            "p95": round(percentile(latencies, 0.95), 2),
+            "p99": round(percentile(latencies, 0.99), 2),
+            "max": round(latencies[-1], 2),
+        },
+        "queries_per_request": round(queries / total, 2),
+    }
+
+
+def git_commit():
+    try:
+        return (
+            subprocess.check_output(
+                ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL
+            )
+            .decode()
+            .strip()
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    app = create_app(TestConfig if args.config == "test" else Config)
+    counter = QueryCounter()
+    scenario_names = args.scenarios or SCENARIOS
+
+    with app.app_context():
+        dataset = seed_dataset(
+            db.session,
+            users=args.users,
+            transactions_per_user=args.transactions_per_user,
+            password_hash=bcrypt.generate_password_hash(PASSWORD).decode("utf-8"),
+        )
+        db.session.commit()
+
+        server = make_server("127.0.0.1", 0, app, threaded=True)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        base_url = f"http://127.0.0.1:{server.server_port}"
+
+        event.listen(db.engine, "before_cursor_execute", counter)
+        try:
+            clients = min(args.clients, args.users)
+            scenarios = build_scenarios(dataset, ("2024-01-01", "2024-12-31"))
+            tokens = [login(base_url, dataset.emails[i]) for i in range(clients)]
+            results = {}
+
+            for name in scenario_names:
+                results[name] = run_scenario(
+                    base_url, scenarios[name], tokens, args.requests, counter
+                )
+        finally:
+            event.remove(db.engine, "before_cursor_execute", counter)
+            server.shutdown()
+            if not args.keep_data:
+                db.session.rollback()
+                delete_dataset(db.session, dataset)
+                db.session.commit()
+
+    return {
+        "commit": git_commit(),
+        "run_at": datetime.now(timezone.utc).isoformat(),
+        "parameters": {
+            "config": args.config,
+            "users": args.users,
+            "transactions_per_user": args.transactions_per_user,
+            "clients": clients,
+            "requests_per_client": args.requests,
+        },
+        "scenarios": results,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--config", choices=["test", "default"], default="test")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--transactions-per-user", type=int, default=200)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument(
+        "--requests", type=int, default=50, help="requests per client per scenario"
+    )
+    parser.add_argument(
+        "--scenarios",
+        nargs="+",
+        choices=SCENARIOS,
+    )
+    parser.add_argument("--output", help="write the JSON results to this file")
+    parser.add_argument("--keep-data", action="store_true")
+    args = parser.parse_args()
+
+    output = json.dumps(run(args), indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    print(output)
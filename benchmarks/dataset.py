@@ -0,0 +1,210 @@
+"""
+Synthetic dataset shared by the benchmarks and the query plan tests.
+
+Rows are inserted with bulk core inserts, bypassing the ORM listeners, the
+daily rollups are rebuilt and the tables are analyzed afterwards so the
+planner sees realistic statistics.
+"""
+
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+
+from sqlalchemy import delete, text
+
+from app.models.budget import Budget
+from app.models.category import Category
+from app.models.recurring_transaction import RecurringTransaction
+from app.models.transaction import Transaction
+from app.models.transaction_rollup import TransactionDailyRollup
+from app.models.user import User
+from app.models.wallet import Wallet
+from app.services.transaction_rollup import rebuild_rollups
+from app.utils.enums import TransactionFrequency, TransactionType, UserRole
+
+SEEDED_TABLES = (
+    "users",
+    "wallets",
+    "categories",
+    "transactions",
+    "budgets",
+    "recurring_transactions",
+    "transaction_daily_rollups",
+)
+
+# Insert batch size, keeps executemany parameter lists bounded
+BATCH_SIZE = 5000
+
+
+def _insert(session, table, rows):
+    for start in range(0, len(rows), BATCH_SIZE):
+        session.execute(table.insert(), rows[start : start + BATCH_SIZE])
+
+
+def seed_dataset(
+    session,
+    users=20,
+    transactions_per_user=500,
+    categories_per_user=10,
+    budget_months=24,
+    recurring_per_user=250,
+    due_recurring_per_user=1,
+    start=datetime(2024, 1, 1),
+    password_hash="x",
+):
+    """
+    Seed users with wallets, categories, transactions, budgets and recurring
+    transactions. Transactions are spread over budget_months months from
+    start, one in ten is soft deleted. Only due_recurring_per_user recurring
+    transactions per user are due, the rest run in the future. Users get
+    password_hash as their stored password, pass a real hash to log them in.
+
+    Returns:
+        Namespace with the seeded user_ids, their emails, and wallet_ids and
+        category_ids by user
+    """
+    seed = uuid.uuid4().hex[:8]
+    user_ids = [uuid.uuid4() for _ in range(users)]
+    wallet_ids = {user_id: uuid.uuid4() for user_id in user_ids}
+    category_ids = {
+        user_id: [uuid.uuid4() for _ in range(categories_per_user)]
+        for user_id in user_ids
+    }
+    span_minutes = budget_months * 30 * 24 * 60
+
+    _insert(
+        session,
+        User.__table__,
+        [
+            {
+                "id": user_id,
+                "username": f"seed_{seed}_{i}",
+                "email": f"seed_{seed}_{i}@seed.local",
+                "password": password_hash,
+                "name": f"Seed user {i}",
+                "role": UserRole.USER,
+                "is_verified": True,
+            }
+            for i, user_id in enumerate(user_ids)
+        ],
+    )
+    _insert(
+        session,
+        Wallet.__table__,
+        [
+            {
+                "id": wallet_ids[user_id],
+                "name": "Seed wallet",
+                "user_id": user_id,
+                "balance": 0,
+            }
+            for user_id in user_ids
+        ],
+    )
+    _insert(
+        session,
+        Category.__table__,
+        [
+            {"id": category_id, "name": f"Seed category {i}", "user_id": user_id}
+            for user_id in user_ids
+            for i, category_id in enumerate(category_ids[user_id])
+        ],
+    )
+
+    transactions = []
+    for user_id in user_ids:
+        for i in range(transactions_per_user):
+            transaction_at = start + timedelta(
+                minutes=i * span_minutes // transactions_per_user
+            )
+            transactions.append(
+                {
+                    "id": uuid.uuid4(),
+                    "user_id": user_id,
+                    "wallet_id": wallet_ids[user_id],
+                    "category_id": category_ids[user_id][i % categories_per_user],
+                    "amount": Decimal("10.00") + i % 90,
+                    "type": (
+                        TransactionType.CREDIT if i % 4 == 0 else TransactionType.DEBIT
+                    ),
+                    "transaction_at": transaction_at,
+                    "description": f"Seed transaction {i}",
+                    "is_deleted": i % 10 == 9,
+                    "created_at": transaction_at,
+                    "updated_at": transaction_at,
+                }
+            )
+    _insert(session, Transaction.__table__, transactions)
+
+    budgets = []
+    for user_id in user_ids:
+        for category_id in category_ids[user_id]:
+            for month in range(budget_months):
+                budgets.append(
+                    {
+                        "id": uuid.uuid4(),
+                        "user_id": user_id,
+                        "category_id": category_id,
+                        "amount": Decimal("500.00"),
+                        "spent_amount": Decimal("0.00"),
+                        "month": (start.month - 1 + month) % 12 + 1,
+                        "year": start.year + (start.month - 1 + month) // 12,
+                    }
+                )
+    _insert(session, Budget.__table__, budgets)
+
+    now = datetime.now()
+    recurring = []
+    for user_id in user_ids:
+        for i in range(recurring_per_user):
+            next_execution_at = (
+                now - timedelta(hours=1)
+                if i < due_recurring_per_user
+                else now + timedelta(days=1 + i)
+            )
+            recurring.append(
+                {
+                    "id": uuid.uuid4(),
+                    "user_id": user_id,
+                    "wallet_id": wallet_ids[user_id],
+                    "category_id": category_ids[user_id][i % categories_per_user],
+                    "amount": Decimal("25.00"),
+                    "type": TransactionType.DEBIT,
+                    "frequency": TransactionFrequency.MONTHLY,
+                    "start_at": start,
+                    "next_execution_at": next_execution_at,
+                    "is_deleted": False,
+                }
+            )
+    _insert(session, RecurringTransaction.__table__, recurring)
+
+    session.flush()
+    # The bulk inserts bypass the rollup listener, reports read the rollups
+    rebuild_rollups()
+
+    for table in SEEDED_TABLES:
+        session.execute(text(f"ANALYZE {table}"))
+
+    return SimpleNamespace(
+        user_ids=user_ids,
+        emails=[f"seed_{seed}_{i}@seed.local" for i in range(users)],
+        wallet_ids=wallet_ids,
+        category_ids=category_ids,
+    )
+
+
+def delete_dataset(session, dataset):
+    """Remove everything seed_dataset inserted"""
+    user_ids = dataset.user_ids
+    for model in (
+        TransactionDailyRollup,
+        RecurringTransaction,
+        Budget,
+        Transaction,
+        Category,
+        Wallet,
+    ):
+        session.execute(delete(model).where(model.user_id.in_(user_ids)))
+    session.execute(delete(User).where(User.id.in_(user_ids)))
+    session.flush()
@@ -0,0 +1,134 @@
+"""
+Compare the marshmallow and column serializer paths of the transaction list.
+
+Seeds the test database inside a transaction that is rolled back at the end,
+then times query plus serialization for both paths on the same rows.
+
+Usage:
+    python -m benchmarks.serializer --rows 10000 --repeat 5
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app import create_app
+from app.config import TestConfig
+from app.extensions import db
+from app.models.category import Category
+from app.models.transaction import Transaction
+from app.models.user import User
+from app.models.wallet import Wallet
+from app.schemas.transaction import transactions_schema, transactions_column_serializer
+from app.utils.enums import TransactionType
+
+
+def seed(rows):
+    """Insert one user with rows transactions and return the user id"""
+    user_id = uuid.uuid4()
+    db.session.add(
+        User(
+            id=user_id,
+            username=f"bench_{user_id.hex[:8]}",
+            email=f"bench_{user_id.hex[:8]}@bench.local",
+            password="x",
+            name="Benchmark User",
+        )
+    )
+    wallet = Wallet(id=uuid.uuid4(), name="Bench wallet", user_id=user_id)
+    category = Category(id=uuid.uuid4(), name="Bench category", user_id=user_id)
+    db.session.add_all([wallet, category])
+    db.session.flush()
+
+    start = datetime(2024, 1, 1)
+    db.session.execute(
+        Transaction.__table__.insert(),
+        [
+            {
+                "id": uuid.uuid4(),
+                "user_id": user_id,
+                "wallet_id": wallet.id,
+                "category_id": category.id,
+                "amount": Decimal("10.50") + i,
+                "type": TransactionType.DEBIT if i % 2 else TransactionType.CREDIT,
+                "transaction_at": start + timedelta(minutes=i),
+                "description": f"Transaction {i}",
+                "is_deleted": False,
+                "created_at": start,
+                "updated_at": start,
+            }
+            for i in range(rows)
+        ],
+    )
+    db.session.flush()
+    return user_id
+
+
+def measure(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        db.session.expunge_all()
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return {"min_s": min(timings), "mean_s": sum(timings) / len(timings)}
+
+
+def run(rows, repeat):
+    app = create_app(TestConfig)
+
+    with app.app_context():
+        connection = db.engine.connect()
+        transaction = connection.begin()
+        db.session.configure(bind=connection)
+
+        try:
+            user_id = seed(rows)
+            query = Transaction.query.filter_by(user_id=user_id).order_by(
+                Transaction.transaction_at.desc()
+            )
+
+            marshmallow_output = transactions_schema.dump(query.all())
+            column_output = transactions_column_serializer.dump(
+                transactions_column_serializer.select(query).all()
+            )
+
+            results = {
+                "rows": rows,
+                "identical_output": json.dumps(marshmallow_output)
+                == json.dumps(column_output),
+                "marshmallow": measure(
+                    lambda: transactions_schema.dump(query.all()), repeat
+                ),
+                "column_serializer": measure(
+                    lambda: transactions_column_serializer.dump(
+                        transactions_column_serializer.select(query).all()
+                    ),
+                    repeat,
+                ),
+            }
+            results["speedup"] = (
+                results["marshmallow"]["mean_s"]
+                / results["column_serializer"]["mean_s"]
+            )
+            return results
+        finally:
+            db.session.remove()
+            transaction.rollback()
+            connection.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(json.dumps(run(args.rows, args.repeat), indent=2))
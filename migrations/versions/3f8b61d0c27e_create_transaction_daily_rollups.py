@@ -0,0 +1,58 @@
+"""create transaction_daily_rollups table
+
+Revision ID: 3f8b61d0c27e
+Revises: 7c41d2e9a5b3
+Create Date: 2026-10-16 15:02:41.738215
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "3f8b61d0c27e"
+down_revision = "7c41d2e9a5b3"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "transaction_daily_rollups",
+        sa.Column("user_id", sa.UUID(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("category_id", sa.UUID(), nullable=False),
+        sa.Column("wallet_id", sa.UUID(), nullable=False),
+        sa.Column(
+            "type",
+            postgresql.ENUM(
+                "CREDIT", "DEBIT", name="transaction_type", create_type=False
+            ),
+            nullable=False,
+        ),
+        sa.Column("total_amount", sa.Numeric(precision=14, scale=2), nullable=False),
+        sa.Column("transaction_count", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["category_id"], ["categories.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["wallet_id"], ["wallets.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id", "day", "category_id", "wallet_id", "type"),
+    )
+
+    # Backfill from the existing transactions, later writes keep it up to date
+    op.execute(
+        """
+        INSERT INTO transaction_daily_rollups
+            (user_id, day, category_id, wallet_id, type, total_amount, transaction_count)
+        SELECT user_id, date(transaction_at), category_id, wallet_id, type,
+               sum(amount), count(id)
+        FROM transactions
+        WHERE is_deleted = false
+        GROUP BY user_id, date(transaction_at), category_id, wallet_id, type
+        """
+    )
+
+
+def downgrade():
+    op.drop_table("transaction_daily_rollups")
@@ -0,0 +1,87 @@
+"""store jti instead of the encoded token in active_access_tokens
+
+Revision ID: 7c41d2e9a5b3
+Revises: d60f2e3d05c9
+Create Date: 2026-10-16 11:18:06.412337
+
+"""
+
+from datetime import datetime, timezone
+
+import jwt
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "7c41d2e9a5b3"
+down_revision = "d60f2e3d05c9"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("active_access_tokens", schema=None) as batch_op:
+        batch_op.add_column(sa.Column("jti", sa.UUID(), nullable=True))
+        batch_op.add_column(
+            sa.Column("expires_at", sa.DateTime(timezone=True), nullable=True)
+        )
+
+    # Backfill jti and expiry from the claims of the stored tokens, the
+    # signature was already verified when the token was issued.
+    connection = op.get_bind()
+    tokens = connection.execute(
+        sa.text("SELECT id, access_token FROM active_access_tokens")
+    ).fetchall()
+
+    for token_id, access_token in tokens:
+        try:
+            claims = jwt.decode(access_token, options={"verify_signature": False})
+            connection.execute(
+                sa.text(
+                    "UPDATE active_access_tokens "
+                    "SET jti = :jti, expires_at = :expires_at WHERE id = :id"
+                ),
+                {
+                    "id": token_id,
+                    "jti": claims["jti"],
+                    "expires_at": datetime.fromtimestamp(claims["exp"], timezone.utc),
+                },
+            )
+        except (jwt.InvalidTokenError, KeyError):
+            connection.execute(
+                sa.text("DELETE FROM active_access_tokens WHERE id = :id"),
+                {"id": token_id},
+            )
+
+    with op.batch_alter_table("active_access_tokens", schema=None) as batch_op:
+        batch_op.alter_column("jti", existing_type=sa.UUID(), nullable=False)
+        batch_op.alter_column(
+            "expires_at", existing_type=sa.DateTime(timezone=True), nullable=False
+        )
+        batch_op.drop_constraint(
+            "active_access_tokens_access_token_key", type_="unique"
+        )
+        batch_op.drop_constraint("active_access_tokens_pkey", type_="primary")
+        batch_op.drop_column("access_token")
+        batch_op.drop_column("id")
+        batch_op.create_primary_key("active_access_tokens_pkey", ["jti"])
+
+
+def downgrade():
+    # The encoded tokens cannot be rebuilt from their jti, so every
+    # session has to log in again after a downgrade.
+    op.execute("DELETE FROM active_access_tokens")
+
+    with op.batch_alter_table("active_access_tokens", schema=None) as batch_op:
+        batch_op.drop_constraint("active_access_tokens_pkey", type_="primary")
+        batch_op.add_column(sa.Column("id", sa.UUID(), nullable=False))
+        batch_op.add_column(
+            sa.Column("access_token", sa.String(length=500), nullable=False)
+        )
+        batch_op.drop_column("expires_at")
+        batch_op.drop_column("jti")
+        batch_op.create_primary_key("active_access_tokens_pkey", ["id"])
+        batch_op.create_unique_constraint(
+            "active_access_tokens_access_token_key", ["access_token"]
+        )
@@ -0,0 +1,39 @@
+"""add partial index for monthly debit spending on transactions
+
+Revision ID: 9d2e4b7a1c55
+Revises: 3f8b61d0c27e
+Create Date: 2026-10-16 16:40:12.281904
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "9d2e4b7a1c55"
+down_revision = "3f8b61d0c27e"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Built concurrently so writes to transactions are not blocked meanwhile
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_transactions_debit_user_category_at",
+            "transactions",
+            ["user_id", "category_id", "transaction_at"],
+            unique=False,
+            postgresql_where=sa.text("is_deleted = false AND type = 'DEBIT'"),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_transactions_debit_user_category_at",
+            table_name="transactions",
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,64 @@
+"""add composite and partial indexes for transaction lists, budget lookup and due recurring transactions
+
+Revision ID: a4c7e19b3f20
+Revises: 9d2e4b7a1c55
+Create Date: 2026-10-16 17:25:48.903116
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "a4c7e19b3f20"
+down_revision = "9d2e4b7a1c55"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Built concurrently so writes to these tables are not blocked meanwhile
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_transactions_user_listing",
+            "transactions",
+            ["user_id", "is_deleted", "transaction_at", "created_at", "id"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_budgets_user_category_period",
+            "budgets",
+            ["user_id", "category_id", "year", "month"],
+            unique=False,
+            postgresql_where=sa.text("is_deleted = false"),
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_recurring_transactions_due",
+            "recurring_transactions",
+            ["next_execution_at"],
+            unique=False,
+            postgresql_where=sa.text("is_deleted = false"),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_recurring_transactions_due",
+            table_name="recurring_transactions",
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_budgets_user_category_period",
+            table_name="budgets",
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_transactions_user_listing",
+            table_name="transactions",
+            postgresql_concurrently=True,
+        )
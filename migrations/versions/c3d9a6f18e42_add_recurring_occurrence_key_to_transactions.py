@@ -0,0 +1,58 @@
+"""add recurring occurrence idempotency key to transactions
+
+Revision ID: c3d9a6f18e42
+Revises: a4c7e19b3f20
+Create Date: 2026-10-16 23:52:11.418305
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "c3d9a6f18e42"
+down_revision = "a4c7e19b3f20"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("transactions", schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column("recurring_transaction_id", sa.UUID(), nullable=True)
+        )
+        batch_op.add_column(sa.Column("occurrence_at", sa.DateTime(), nullable=True))
+        batch_op.create_foreign_key(
+            "transactions_recurring_transaction_id_fkey",
+            "recurring_transactions",
+            ["recurring_transaction_id"],
+            ["id"],
+            ondelete="SET NULL",
+        )
+
+    # Built concurrently so writes to transactions are not blocked meanwhile
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_transactions_recurring_occurrence",
+            "transactions",
+            ["recurring_transaction_id", "occurrence_at"],
+            unique=True,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_transactions_recurring_occurrence",
+            table_name="transactions",
+            postgresql_concurrently=True,
+        )
+
+    with op.batch_alter_table("transactions", schema=None) as batch_op:
+        batch_op.drop_constraint(
+            "transactions_recurring_transaction_id_fkey", type_="foreignkey"
+        )
+        batch_op.drop_column("occurrence_at")
+        batch_op.drop_column("recurring_transaction_id")
@@ -1,6 +1,11 @@
 import json
+import uuid
 import pytest
 from flask import url_for
+from flask_jwt_extended import decode_token
+
+from app.extensions import db
+from app.models.auth import ActiveAccessToken
 
 
 class TestLogin:
@@ -27,6 +32,21 @@ class TestLogin:
         assert len(data["access_token"]) > 20
         assert len(data["refresh_token"]) > 20
 
+    def test_login_allowlists_token_jti(self, client, test_user):
+        """Test login stores only the jti of the issued access token."""
+        response = client.post(
+            url_for("auth.login"),
+            json={"username": "testuser", "password": "Password123!"},
+        )
+
+        assert response.status_code == 200
+        claims = decode_token(response.get_json()["access_token"])
+
+        token_entry = db.session.get(ActiveAccessToken, uuid.UUID(claims["jti"]))
+        assert token_entry is not None
+        assert token_entry.user_id == test_user.id
+        assert token_entry.expires_at is not None
+
     def test_successful_login_with_username(self, client, test_user):
         """Test successful login with username as identifier."""
         response = client.post(
@@ -2,6 +2,14 @@ import json
 import pytest
 from unittest.mock import patch
 from flask import url_for
+from flask_jwt_extended import decode_token
+
+from app.utils.principal_cache import (
+    cache_principal,
+    get_cached_principal,
+    invalidate_principal,
+)
+from app.utils.tokens import TokenHandler
 
 
 class TestLogout:
@@ -35,3 +43,49 @@ class TestLogout:
         data = response.get_json()
         assert "error" in data
         assert "Invalid token" in data["error"]
+
+    def test_token_rejected_after_logout(self, client, test_user, auth_headers):
+        """Test the cached principal is dropped when the token is logged out."""
+        url = url_for("user.user-detail", id=test_user.id)
+
+        # First request resolves and caches the principal
+        response = client.get(url, headers=auth_headers)
+        assert response.status_code == 200
+
+        response = client.post(url_for("auth.logout"), headers=auth_headers)
+        assert response.status_code == 200
+
+        response = client.get(url, headers=auth_headers)
+        assert response.status_code == 401
+
+    def test_principal_cached_during_logout_is_dropped(
+        self, client, test_user, auth_token, auth_headers
+    ):
+        """Test a principal cached between the token delete and the invalidation is dropped."""
+        jti = decode_token(auth_token)["jti"]
+
+        def cache_then_invalidate(jti):
+            # A concurrent request that read the token before the delete committed
+            cache_principal(jti, test_user)
+            invalidate_principal(jti)
+
+        with patch(
+            "app.utils.tokens.invalidate_principal", side_effect=cache_then_invalidate
+        ):
+            response = client.post(url_for("auth.logout"), headers=auth_headers)
+        assert response.status_code == 200
+
+        assert TokenHandler.get_active_principal(jti) is None
+
+    def test_principal_not_cached_again_after_logout(
+        self, client, test_user, auth_token, auth_headers
+    ):
+        """Test a request that read the token before the logout cannot cache it again."""
+        jti = decode_token(auth_token)["jti"]
+        response = client.post(url_for("auth.logout"), headers=auth_headers)
+        assert response.status_code == 200
+
+        cache_principal(jti, test_user)
+
+        assert get_cached_principal(jti) is None
+        assert TokenHandler.get_active_principal(jti) is None
@@ -0,0 +1,90 @@
+import json
+
+import pytest
+
+from app.utils import principal_cache
+from app.utils.principal_cache import LocalPrincipalCache
+
+
+def make_principal(user_id):
+    return {"user_id": user_id, "role": "USER", "is_deleted": False, "child_id": None}
+
+
+class TestLocalPrincipalCache:
+    """Test cases for the in-process principal cache."""
+
+    @pytest.fixture
+    def clock(self, mocker):
+        """Controllable monotonic clock of the principal cache."""
+        clock = mocker.patch("app.utils.principal_cache.time.monotonic")
+        clock.return_value = 100.0
+        return clock
+
+    def test_least_recently_used_entry_evicted(self, clock):
+        """Test the cache drops its least recently used entry when full."""
+        cache = LocalPrincipalCache()
+        cache.set("a", make_principal("1"), ttl=5, max_size=2)
+        cache.set("b", make_principal("2"), ttl=5, max_size=2)
+        cache.get("a")  # "b" becomes the least recently used
+
+        cache.set("c", make_principal("3"), ttl=5, max_size=2)
+
+        assert cache.get("a") is not None
+        assert cache.get("b") is None
+        assert cache.get("c") is not None
+
+    def test_entry_expires_after_ttl(self, clock):
+        """Test an entry is dropped once its TTL has passed."""
+        cache = LocalPrincipalCache()
+        cache.set("a", make_principal("1"), ttl=5, max_size=10)
+
+        clock.return_value = 104.0
+        assert cache.get("a") is not None
+
+        clock.return_value = 106.0
+        assert cache.get("a") is None
+
+    def test_invalidation_message_drops_token(self, clock, monkeypatch):
+        """Test a published jti invalidation removes that token's entry."""
+        cache = LocalPrincipalCache()
+        monkeypatch.setattr(principal_cache, "local_principals", cache)
+        cache.set("a", make_principal("1"), ttl=5, max_size=10)
+        cache.set("b", make_principal("1"), ttl=5, max_size=10)
+
+        principal_cache._handle_invalidation({"data": json.dumps({"jti": "a"})})
+
+        assert cache.get("a") is None
+        assert cache.get("b") is not None
+
+    def test_invalidation_message_drops_user_tokens(self, clock, monkeypatch):
+        """Test a published user invalidation removes all but the kept token."""
+        cache = LocalPrincipalCache()
+        monkeypatch.setattr(principal_cache, "local_principals", cache)
+        cache.set("a", make_principal("1"), ttl=5, max_size=10)
+        cache.set("b", make_principal("1"), ttl=5, max_size=10)
+        cache.set("c", make_principal("2"), ttl=5, max_size=10)
+
+        principal_cache._handle_invalidation(
+            {"data": json.dumps({"user_id": "1", "keep_jti": "b"})}
+        )
+
+        assert cache.get("a") is None
+        assert cache.get("b") is not None
+        assert cache.get("c") is not None
+
+    def test_dead_listener_restarted(self, app, mocker, monkeypatch):
+        """Test the invalidation listener is started again once its thread died."""
+        monkeypatch.setattr(principal_cache, "_listener_pid", None)
+        monkeypatch.setattr(principal_cache, "_listener_thread", None)
+        redis_mock = mocker.patch("app.utils.principal_cache.redis_client")
+        thread = redis_mock.pubsub.return_value.run_in_thread.return_value
+        thread.is_alive.return_value = True
+
+        with app.app_context():
+            principal_cache._ensure_invalidation_listener()
+            principal_cache._ensure_invalidation_listener()
+            assert redis_mock.pubsub.call_count == 1
+
+            thread.is_alive.return_value = False
+            principal_cache._ensure_invalidation_listener()
+            assert redis_mock.pubsub.call_count == 2
@@ -1,6 +1,12 @@
+from datetime import datetime
+from decimal import Decimal
+
 from flask import url_for
 import pytest
 
+from app.models.transaction import Transaction
+from app.utils.enums import TransactionType
+
 
 class TestBudgetListResource:
 
@@ -25,6 +31,51 @@ class TestBudgetListResource:
         assert data["spent_amount"] == "50.00"
         assert data["amount"] == "100.00"
 
+    def test_create_budget_spent_amount_month_boundaries(
+        self, client, auth_headers, budget_data, db_session, test_user, user_wallet
+    ):
+        """Test only debits inside the budget month count as initial spending"""
+        year = datetime.now().year + 1
+        transactions = [
+            Transaction(
+                user_id=test_user.id,
+                wallet_id=user_wallet.id,
+                category_id=budget_data["category_id"],
+                amount=amount,
+                type=transaction_type,
+                transaction_at=transaction_at,
+            )
+            for amount, transaction_type, transaction_at in [
+                (
+                    Decimal("5.00"),
+                    TransactionType.DEBIT,
+                    datetime(year - 1, 12, 31, 23, 59, 59, 999999),
+                ),
+                (Decimal("10.00"), TransactionType.DEBIT, datetime(year, 1, 1)),
+                (
+                    Decimal("20.00"),
+                    TransactionType.DEBIT,
+                    datetime(year, 1, 31, 23, 59, 59, 999999),
+                ),
+                (Decimal("40.00"), TransactionType.DEBIT, datetime(year, 2, 1)),
+                (Decimal("80.00"), TransactionType.CREDIT, datetime(year, 1, 10)),
+            ]
+        ]
+        db_session.add_all(transactions)
+        db_session.commit()
+
+        response = client.post(
+            url_for("budget.budgets"),
+            json={**budget_data, "month": 1, "year": year},
+            headers=auth_headers,
+        )
+        assert response.status_code == 201
+        assert response.get_json()["spent_amount"] == "30.00"
+
+        for transaction in transactions:
+            db_session.delete(transaction)
+        db_session.commit()
+
     def test_create_budget_as_admin(
         self, client, admin_headers, child_user, child_category
     ):
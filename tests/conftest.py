@@ -26,6 +26,7 @@ from app.utils.enums import TransactionFrequency
 from app.models.recurring_transaction import RecurringTransaction
 
 from app.models.budget import Budget
+from app.utils.query_stats import parse_query_count
 from app import create_app
 
 
@@ -184,6 +185,18 @@ def child_user(db_session, test_user):
     db_session.commit()
 
 
+@pytest.fixture
+def query_count():
+    """Number of SQL queries issued by the request of a test client response."""
+
+    def count(response):
+        queries = parse_query_count(response.headers.get("Server-Timing"))
+        assert queries is not None, "Response has no query stats"
+        return queries
+
+    return count
+
+
 @pytest.fixture
 def runner(app):
     """Flask CLI test runner."""
@@ -0,0 +1,213 @@
+"""
+Query plan regression checks for the service layer.
+
+Seeds 100k transactions across 1k users, runs each service and explains
+every SELECT it sends. A test fails when a plan sequentially scans a large
+table, or when the plan shape of a scenario differs from the checked-in
+baseline.json. The shape is how the scenario reads the large tables, e.g.
+"transactions: index", which unlike estimated costs does not depend on the
+Postgres version and settings. The scenario also fails when its estimated
+total cost grows by more than COST_REGRESSION_THRESHOLD over the recorded
+one, which is loose enough for estimates drifting between Postgres versions.
+
+After an intended plan change, record a new baseline with:
+    QUERY_PLAN_BASELINE_UPDATE=1 python -m pytest tests/query_plans
+"""
+
+import json
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from app.models.user import User
+from app.services.budget import calculate_month_spending, get_user_budgets
+from app.services.category import get_user_categories
+from app.services.manage_budget import find_matching_budget
+from app.services.recurring_transaction import (
+    get_due_recurring_transactions,
+    get_user_recurring_transactions,
+)
+from app.services.report import (
+    aggregate_report_transactions,
+    generate_transaction_report,
+    get_transactions_query,
+)
+from app.services.transaction import get_user_transactions
+from app.utils.constants import DEFAULT_PAGE_SIZE
+from app.utils.enums import UserRole
+from app.utils.query_plan import capture_statements, explain_statement, iter_plan_nodes
+from benchmarks.dataset import delete_dataset, seed_dataset
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+UPDATE_BASELINE = os.getenv("QUERY_PLAN_BASELINE_UPDATE") == "1"
+
+# Allowed growth of a scenario's estimated total cost over its baseline
+COST_REGRESSION_THRESHOLD = 1.0
+
+# Tables that grow with usage and must never be read in full by a request
+LARGE_TABLES = {
+    "transactions",
+    "budgets",
+    "recurring_transactions",
+    "transaction_daily_rollups",
+}
+
+USER = UserRole.USER.value
+
+
+def _page(query):
+    return query.limit(DEFAULT_PAGE_SIZE).all()
+
+
+def _partial_day_report(user):
+    """
+    Report over a range starting and ending mid-day, the whole days are read
+    from the rollups and the partial days at its edges from transactions
+    """
+    start_date = datetime(2024, 1, 1, 12, tzinfo=timezone.utc)
+    end_date = datetime(2024, 6, 30, 12, tzinfo=timezone.utc)
+    return aggregate_report_transactions(
+        get_transactions_query(user, USER, start_date, end_date),
+        user.id,
+        start_date,
+        end_date,
+    )
+
+
+SCENARIOS = {
+    "get_user_transactions": lambda user, dataset: _page(
+        get_user_transactions(user, USER, {})
+    ),
+    "get_user_budgets": lambda user, dataset: _page(get_user_budgets(user, USER, {})),
+    "get_user_recurring_transactions": lambda user, dataset: _page(
+        get_user_recurring_transactions(user, USER, {})
+    ),
+    "get_user_categories": lambda user, dataset: _page(
+        get_user_categories(user, USER, {})
+    ),
+    "generate_transaction_report": lambda user, dataset: generate_transaction_report(
+        user, {"start_date": "2024-01-01", "end_date": "2024-06-30"}
+    ),
+    "aggregate_report_transactions_partial_days": lambda user, dataset: (
+        _partial_day_report(user)
+    ),
+    "find_matching_budget": lambda user, dataset: find_matching_budget(
+        SimpleNamespace(
+            user_id=user.id,
+            category_id=dataset.category_ids[user.id][0],
+            transaction_at=datetime(2024, 5, 3),
+        )
+    ),
+    "calculate_month_spending": lambda user, dataset: calculate_month_spending(
+        user.id, dataset.category_ids[user.id][0], 5, 2024
+    ),
+    "get_due_recurring_transactions": lambda user, dataset: _page(
+        get_due_recurring_transactions(datetime(2024, 5, 3))
+    ),
+}
+
+
+@pytest.fixture(scope="module")
+def dataset(db_session):
+    """Seed a realistic volume of rows, 100 transactions for each of 1k users"""
+    dataset = seed_dataset(
+        db_session,
+        users=1000,
+        transactions_per_user=100,
+        categories_per_user=5,
+        budget_months=12,
+        recurring_per_user=10,
+    )
+    yield dataset
+    delete_dataset(db_session, dataset)
+
+
+@pytest.fixture(scope="module")
+def baseline():
+    baseline = json.loads(BASELINE_PATH.read_text())
+    yield baseline
+    if UPDATE_BASELINE:
+        BASELINE_PATH.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+
+
+# Scan nodes that read a table through an index
+INDEX_SCANS = {"Index Scan", "Index Only Scan", "Bitmap Heap Scan"}
+
+
+def _plan_shape(plan):
+    """How a plan reads the large tables, e.g. {"transactions: index"}"""
+    shape = set()
+    for node in iter_plan_nodes(plan):
+        if node.get("Relation Name") not in LARGE_TABLES:
+            continue
+        if node["Node Type"] in INDEX_SCANS:
+            access = "index"
+        elif node["Node Type"] == "Seq Scan":
+            access = "seq"
+        else:
+            access = node["Node Type"].lower()
+        shape.add(f"{node['Relation Name']}: {access}")
+    return shape
+
+
+def _sequential_scans(plan):
+    return sorted(
+        {
+            node["Relation Name"]
+            for node in iter_plan_nodes(plan)
+            if node["Node Type"] == "Seq Scan"
+        }
+    )
+
+
+class TestQueryPlanRegression:
+    @pytest.mark.parametrize("scenario", SCENARIOS)
+    def test_service_query_plans(self, scenario, dataset, baseline, db_session):
+        """Test service queries keep index based plans and their baseline shape"""
+        user = db_session.get(User, dataset.user_ids[len(dataset.user_ids) // 2])
+
+        with capture_statements() as statements:
+            SCENARIOS[scenario](user, dataset)
+        assert statements, f"{scenario} sent no query"
+
+        shape = set()
+        cost = 0
+        for position, (statement, parameters) in enumerate(statements):
+            plan = explain_statement(statement, parameters)
+            shape |= _plan_shape(plan)
+            cost += plan["Total Cost"]
+
+            large_scans = set(_sequential_scans(plan)) & LARGE_TABLES
+            assert not large_scans, (
+                f"{scenario}[{position}] sequentially scans "
+                f"{sorted(large_scans)}:\n{statement}"
+            )
+
+        if UPDATE_BASELINE:
+            baseline[scenario] = {
+                "shape": sorted(shape),
+                "total_cost": round(cost, 2),
+            }
+            return
+
+        if scenario not in baseline:
+            pytest.fail(
+                f"No baseline for {scenario}, record it with "
+                "QUERY_PLAN_BASELINE_UPDATE=1"
+            )
+
+        expected = baseline[scenario]
+        assert sorted(shape) == expected["shape"], (
+            f"{scenario} reads large tables as {sorted(shape)}, "
+            f"baseline is {expected['shape']}"
+        )
+
+        allowed = expected["total_cost"] * (1 + COST_REGRESSION_THRESHOLD)
+        assert cost <= allowed, (
+            f"{scenario} estimated cost {cost} exceeds baseline "
+            f"{expected['total_cost']} by more than "
+            f"{COST_REGRESSION_THRESHOLD:.0%}"
+        )
@@ -0,0 +1,94 @@
+import logging
+from datetime import datetime, timedelta
+
+import pytest
+from flask import url_for
+
+from app.utils.query_stats import parameter_shape, parse_query_count
+
+# Most queries a warm request to an endpoint may issue. Raise a budget only
+# together with the change that needs the extra query.
+QUERY_BUDGETS = [
+    ("transaction.transactions", {}, 6),
+    ("transaction.transaction-detail", {"id": "transaction"}, 5),
+    ("budget.budgets", {}, 6),
+    (
+        "report.transaction-report",
+        {
+            "start_date": (datetime.today() - timedelta(days=30)).date(),
+            "end_date": (datetime.today() + timedelta(days=30)).date(),
+        },
+        6,
+    ),
+]
+
+
+class TestQueryBudgets:
+    @pytest.mark.parametrize(
+        "endpoint,params,budget", QUERY_BUDGETS, ids=[b[0] for b in QUERY_BUDGETS]
+    )
+    def test_endpoint_within_query_budget(
+        self,
+        client,
+        auth_headers,
+        user_transaction,
+        user_budget,
+        query_count,
+        endpoint,
+        params,
+        budget,
+    ):
+        """Test each endpoint stays within its query budget once caches are warm"""
+        params = {
+            key: str(user_transaction.id) if value == "transaction" else value
+            for key, value in params.items()
+        }
+        url = url_for(endpoint, **params)
+        client.get(url, headers=auth_headers)  # warm up the principal cache
+
+        response = client.get(url, headers=auth_headers)
+        assert response.status_code == 200
+        assert query_count(response) <= budget
+
+    def test_server_timing_header(self, client, auth_headers):
+        """Test the query stats are reported in the Server-Timing header"""
+        response = client.get(url_for("transaction.transactions"), headers=auth_headers)
+        header = response.headers["Server-Timing"]
+        assert header.startswith("db;dur=")
+        assert "db-slowest;dur=" in header
+        assert parse_query_count(header) >= 1
+
+    def test_server_timing_header_disabled(
+        self, app, client, auth_headers, monkeypatch
+    ):
+        """Test the Server-Timing header can be switched off"""
+        monkeypatch.setitem(app.config, "QUERY_STATS_HEADER", False)
+        response = client.get(url_for("transaction.transactions"), headers=auth_headers)
+        assert response.status_code == 200
+        assert "Server-Timing" not in response.headers
+
+    def test_slow_query_logged_without_values(
+        self, app, client, auth_headers, test_user, monkeypatch, caplog
+    ):
+        """Test slow queries are logged with the shape of their parameters only"""
+        monkeypatch.setitem(app.config, "SLOW_QUERY_THRESHOLD_MS", 0)
+        with caplog.at_level(logging.WARNING):
+            response = client.get(
+                url_for("user.user-detail", id=test_user.id), headers=auth_headers
+            )
+        assert response.status_code == 200
+
+        slow = [r.getMessage() for r in caplog.records if "Slow query" in r.message]
+        assert slow
+        assert all("params=" in message for message in slow)
+        assert not any(str(test_user.id) in message for message in slow)
+
+    def test_parameter_shape(self):
+        """Test parameter shapes keep names and types but drop values"""
+        assert parameter_shape({"id_1": "secret", "limit": 5}) == str(
+            {"id_1": "str", "limit": "int"}
+        )
+        assert parameter_shape(("secret", 5)) == str(["str", "int"])
+        assert parameter_shape([{"a": 1}, {"a": 2}], executemany=True) == (
+            f"2 x {str({'a': 'int'})}"
+        )
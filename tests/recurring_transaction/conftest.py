@@ -0,0 +1,12 @@
+import pytest
+
+from app.extensions import redis_client
+from app.utils.recurring_schedule import SCHEDULE_KEY
+
+
+@pytest.fixture(autouse=True)
+def empty_recurring_schedule():
+    """Start and leave every recurring test with an empty execution schedule."""
+    redis_client.delete(SCHEDULE_KEY)
+    yield
+    redis_client.delete(SCHEDULE_KEY)
@@ -1,6 +1,9 @@
 from datetime import datetime, timedelta, timezone
 from flask import url_for
 
+from app.extensions import redis_client
+from app.utils.recurring_schedule import SCHEDULE_KEY
+
 
 class TestRecurringTransactionCreate:
     def test_create_success(
@@ -26,6 +29,18 @@ class TestRecurringTransactionCreate:
         assert result["amount"] == "25.00"
         assert result["frequency"] == "WEEKLY"
 
+    def test_create_adds_execution_to_schedule(
+        self, client, auth_headers, recurring_transaction_data
+    ):
+        response = client.post(
+            url_for("recurring_transaction.recurring_transactions"),
+            json=recurring_transaction_data,
+            headers=auth_headers,
+        )
+        assert response.status_code == 201
+        recurring_id = response.get_json()["id"]
+        assert redis_client.zscore(SCHEDULE_KEY, recurring_id) is not None
+
     def test_create_as_admin_for_user(
         self, client, admin_headers, test_user, user_wallet, user_category
     ):
@@ -1,7 +1,13 @@
+from datetime import datetime, timedelta, timezone
+
 from flask import url_for
+from app.models.category import Category
 from app.models.recurring_transaction import (
+    RecurringTransaction,
     TransactionFrequency,
 )
+from app.models.wallet import Wallet
+from app.utils.enums import TransactionType
 
 
 class TestRecurringTransactionList:
@@ -61,3 +67,46 @@ class TestRecurringTransactionList:
         response = client.get(url_for("recurring_transaction.recurring_transactions"))
         assert response.status_code == 401
         assert "error" in response.get_json()
+
+    def test_list_query_count_independent_of_page_size(
+        self, client, auth_headers, test_user, db_session, query_count
+    ):
+        """Test nested wallet and category are eager loaded instead of per row"""
+        next_execution_at = datetime.now(timezone.utc) + timedelta(days=1)
+        for i in range(6):
+            wallet = Wallet(name=f"Wallet {i}", balance=0.00, user_id=test_user.id)
+            category = Category(
+                name=f"Category {i}", user_id=test_user.id, is_predefined=False
+            )
+            db_session.add_all([wallet, category])
+            db_session.flush()
+            db_session.add(
+                RecurringTransaction(
+                    amount=10.00,
+                    type=TransactionType.DEBIT,
+                    frequency=TransactionFrequency.MONTHLY,
+                    start_at=next_execution_at,
+                    next_execution_at=next_execution_at,
+                    user_id=test_user.id,
+                    wallet_id=wallet.id,
+                    category_id=category.id,
+                )
+            )
+        db_session.commit()
+
+        def queries_for(per_page):
+            # Nothing may come from objects already in the identity map
+            db_session.expire_all()
+            response = client.get(
+                url_for("recurring_transaction.recurring_transactions")
+                + f"?per_page={per_page}",
+                headers=auth_headers,
+            )
+            assert response.status_code == 200
+            rows = response.get_json()["data"]
+            assert len(rows) == per_page
+            assert len({row["category"]["id"] for row in rows}) == per_page
+            return query_count(response)
+
+        queries_for(1)  # warm up the principal and count caches
+        assert queries_for(6) == queries_for(1)
@@ -0,0 +1,260 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+from app.models.transaction import Transaction
+from app.models.transaction_rollup import TransactionDailyRollup
+from app.services.recurring_processing import claim_due_chunk, process_due_chunk
+from app.extensions import redis_client
+from app.tasks.recurring_transaction import (
+    RUN_LOCK_KEY,
+    dispatch_due_recurring_transactions,
+    process_due_in_batches,
+    process_recurring_transactions,
+    process_recurring_shard,
+    process_scheduled_recurring,
+    summarize_recurring_shards,
+)
+from app.utils.enums import TransactionFrequency
+from app.utils.recurring_schedule import (
+    SCHEDULE_KEY,
+    execution_score,
+    schedule_executions,
+)
+
+
+class TestProcessRecurringTransactions:
+    @pytest.fixture(autouse=True)
+    def mock_notifications(self, mocker):
+        """Keep emails and budget checks out of the batch tests"""
+        self.send_email = mocker.patch(
+            "app.tasks.recurring_transaction.send_recurring_transaction_email.delay"
+        )
+        self.check_budget = mocker.patch(
+            "app.services.recurring_processing.check_budget_thresholds.delay"
+        )
+
+    @pytest.fixture
+    def due_recurring_transaction(self, db_session, recurring_transaction):
+        due_at = datetime.utcnow().replace(microsecond=0) - timedelta(minutes=5)
+        recurring_transaction.start_at = due_at
+        recurring_transaction.next_execution_at = due_at
+        db_session.commit()
+        return recurring_transaction
+
+    def test_batch_executes_due_occurrence(
+        self,
+        db_session,
+        due_recurring_transaction,
+        user_wallet,
+        user_budget,
+    ):
+        """Test a chunk creates the transaction and applies every side effect"""
+        due_at = due_recurring_transaction.next_execution_at
+
+        counts = process_due_in_batches(datetime.utcnow(), batch_size=10)
+        assert counts == {
+            "processed": 1,
+            "skipped": 0,
+            "failed": 0,
+            "occurrences": 1,
+        }
+
+        transaction = Transaction.query.filter_by(
+            wallet_id=user_wallet.id, transaction_at=due_at
+        ).one()
+        assert transaction.amount == Decimal("50.00")
+        assert transaction.description == "Monthly bill"
+
+        db_session.refresh(user_wallet)
+        db_session.refresh(user_budget)
+        db_session.refresh(due_recurring_transaction)
+        assert user_wallet.balance == Decimal("-50.00")
+        assert user_budget.spent_amount == Decimal("50.00")
+        assert due_recurring_transaction.last_executed_at == due_at
+        assert due_recurring_transaction.next_execution_at > datetime.utcnow()
+
+        rollup = TransactionDailyRollup.query.filter_by(
+            wallet_id=user_wallet.id, day=due_at.date()
+        ).one()
+        assert rollup.transaction_count == 1
+
+        self.send_email.assert_called_once_with(
+            due_recurring_transaction.id, transaction.id
+        )
+        self.check_budget.assert_called_once_with(user_budget.id)
+
+    def test_batch_skips_expired_items(
+        self, db_session, due_recurring_transaction, user_wallet, mocker
+    ):
+        """Test items past their end date are retired without a transaction"""
+        due_recurring_transaction.end_at = (
+            due_recurring_transaction.next_execution_at - timedelta(days=2)
+        )
+        db_session.commit()
+        invalidate_counts = mocker.patch(
+            "app.services.recurring_processing.invalidate_counts"
+        )
+
+        now = datetime.utcnow()
+        result = process_due_chunk(claim_due_chunk(now, 10), now)
+        assert result == {
+            "processed": 0,
+            "skipped": 1,
+            "occurrences": 0,
+            "created": [],
+        }
+
+        db_session.refresh(due_recurring_transaction)
+        assert due_recurring_transaction.is_deleted is True
+        assert Transaction.query.filter_by(wallet_id=user_wallet.id).count() == 0
+        self.send_email.assert_not_called()
+        invalidate_counts.assert_called_once_with(
+            "recurring_transactions", str(due_recurring_transaction.user_id)
+        )
+
+    def test_batch_catches_up_missed_occurrences(
+        self, db_session, due_recurring_transaction, user_wallet
+    ):
+        """Test an item several periods behind gets every missed occurrence"""
+        due_at = due_recurring_transaction.next_execution_at - timedelta(days=3)
+        due_recurring_transaction.frequency = TransactionFrequency.DAILY
+        due_recurring_transaction.start_at = due_at
+        due_recurring_transaction.next_execution_at = due_at
+        db_session.commit()
+
+        now = datetime.utcnow()
+        result = process_due_chunk(claim_due_chunk(now, 10), now)
+        assert result["processed"] == 1
+        assert result["occurrences"] == 4
+
+        transactions = (
+            Transaction.query.filter_by(wallet_id=user_wallet.id)
+            .order_by(Transaction.transaction_at)
+            .all()
+        )
+        assert [t.transaction_at for t in transactions] == [
+            due_at + timedelta(days=day) for day in range(4)
+        ]
+        assert result["created"] == [
+            (due_recurring_transaction.id, transactions[-1].id)
+        ]
+
+        db_session.refresh(user_wallet)
+        db_session.refresh(due_recurring_transaction)
+        assert user_wallet.balance == Decimal("-200.00")
+        assert (
+            due_recurring_transaction.last_executed_at
+            == transactions[-1].transaction_at
+        )
+        assert due_recurring_transaction.next_execution_at == due_at + timedelta(days=4)
+
+    def test_batch_executes_due_occurrence_without_catch_up(
+        self, app, db_session, due_recurring_transaction, monkeypatch
+    ):
+        """Test a catch-up limit below one still executes the due occurrence"""
+        monkeypatch.setitem(app.config, "RECURRING_CATCH_UP_LIMIT", 0)
+
+        now = datetime.utcnow()
+        result = process_due_chunk(claim_due_chunk(now, 10), now)
+        assert result["processed"] == 1
+        assert result["occurrences"] == 1
+
+    def test_shard_claims_only_its_users(
+        self, db_session, test_user, due_recurring_transaction
+    ):
+        """Test a shard leaves the items of users outside its id range alone"""
+        shards = 4
+        own_shard = test_user.id.int * shards // 2**128
+        other_shard = (own_shard + 1) % shards
+        now = datetime.utcnow().isoformat()
+
+        assert process_recurring_shard(other_shard, shards, now)["processed"] == 0
+        assert process_recurring_shard(own_shard, shards, now)["processed"] == 1
+
+    def test_summary_adds_up_shards(self):
+        """Test the chord callback sums shard counts and counts failed shards"""
+        results = [
+            {"processed": 3, "skipped": 1, "failed": 0, "occurrences": 5},
+            {
+                "processed": 0,
+                "skipped": 0,
+                "failed": 0,
+                "occurrences": 0,
+                "error": "boom",
+            },
+            {"processed": 2, "skipped": 0, "failed": 1, "occurrences": 2},
+        ]
+        assert summarize_recurring_shards(results, "2024-01-01T00:00:00") == {
+            "processed": 5,
+            "skipped": 1,
+            "failed": 1,
+            "occurrences": 7,
+            "failed_shards": 1,
+        }
+
+    def test_executed_occurrence_not_repeated(
+        self, db_session, due_recurring_transaction, user_wallet
+    ):
+        """Test an occurrence that already has a transaction is not executed again"""
+        due_at = due_recurring_transaction.next_execution_at
+        now = datetime.utcnow()
+        process_due_chunk(claim_due_chunk(now, 10), now)
+
+        # As if the schedule was never advanced after the first execution
+        due_recurring_transaction.next_execution_at = due_at
+        db_session.commit()
+
+        result = process_due_chunk(claim_due_chunk(now, 10), now)
+        assert result["processed"] == 1
+        assert result["occurrences"] == 0
+        assert result["created"] == []
+
+        assert (
+            Transaction.query.filter_by(
+                recurring_transaction_id=due_recurring_transaction.id
+            ).count()
+            == 1
+        )
+        db_session.refresh(user_wallet)
+        db_session.refresh(due_recurring_transaction)
+        assert user_wallet.balance == Decimal("-50.00")
+        assert due_recurring_transaction.next_execution_at > now
+
+    def test_run_skipped_while_previous_run_holds_lock(
+        self, due_recurring_transaction, user_wallet
+    ):
+        """Test a tick does nothing while the previous run holds the run lock"""
+        redis_client.set(RUN_LOCK_KEY, "previous-run", ex=60)
+        try:
+            assert process_recurring_transactions() is False
+        finally:
+            redis_client.delete(RUN_LOCK_KEY)
+
+        assert Transaction.query.filter_by(wallet_id=user_wallet.id).count() == 0
+
+    def test_dispatcher_executes_scheduled_items(
+        self, db_session, due_recurring_transaction, user_wallet, mocker
+    ):
+        """Test the dispatcher hands out due scheduled items, which are rescheduled"""
+        process = mocker.patch(
+            "app.tasks.recurring_transaction.process_scheduled_recurring.delay"
+        )
+        recurring_id = str(due_recurring_transaction.id)
+        schedule_executions({recurring_id: due_recurring_transaction.next_execution_at})
+
+        assert dispatch_due_recurring_transactions() == 1
+        process.assert_called_once()
+        dispatched_ids, now = process.call_args.args
+        assert dispatched_ids == [recurring_id]
+        # Leased, not handed out again while the execution runs
+        assert dispatch_due_recurring_transactions() == 0
+
+        process_scheduled_recurring(dispatched_ids, now)
+
+        assert Transaction.query.filter_by(wallet_id=user_wallet.id).count() == 1
+        db_session.refresh(due_recurring_transaction)
+        assert redis_client.zscore(SCHEDULE_KEY, recurring_id) == execution_score(
+            due_recurring_transaction.next_execution_at
+        )
@@ -2,6 +2,11 @@ from datetime import datetime, timedelta
 from flask import url_for
 from unittest.mock import patch
 
+from app.models.category import Category
+from app.models.transaction import Transaction, TransactionType
+from app.models.transaction_rollup import TransactionDailyRollup
+from app.services.report import aggregate_report_transactions
+
 
 class TestReport:
     def test_transaction_report_success(
@@ -22,6 +27,183 @@ class TestReport:
         assert data["end_date"] == end_date.strftime("%Y-%m-%d")
         assert float(data["total_debit"]) == 50.00
 
+    def test_transaction_report_summaries(
+        self,
+        client,
+        auth_headers,
+        test_user,
+        user_transaction,
+        user_category,
+        second_wallet,
+        db_session,
+    ):
+        """Test category, wallet and total summaries come out of one aggregation"""
+        credit = Transaction(
+            user_id=test_user.id,
+            wallet_id=second_wallet.id,
+            category_id=user_category.id,
+            amount=120.00,
+            type=TransactionType.CREDIT,
+        )
+        db_session.add(credit)
+        db_session.commit()
+
+        start_date = datetime.today().date() - timedelta(days=30)
+        end_date = datetime.today().date() + timedelta(days=30)
+        url = url_for(
+            "report.transaction-report", start_date=start_date, end_date=end_date
+        )
+
+        response = client.get(url, headers=auth_headers)
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data["total_credit"] == "120.00"
+        assert data["total_debit"] == "50.00"
+
+        assert data["category_summary"] == [
+            {
+                "category": {"id": str(user_category.id), "name": "Test category"},
+                "total_credit": "120.00",
+                "total_debit": "50.00",
+                "transaction_count": 2,
+            }
+        ]
+
+        wallets = {w["wallet"]["id"]: w for w in data["wallet_summary"]}
+        assert wallets[str(user_transaction.wallet_id)]["total_debit"] == "50.00"
+        assert wallets[str(second_wallet.id)]["total_credit"] == "120.00"
+
+        db_session.delete(credit)
+        db_session.commit()
+
+    def test_transaction_report_reads_daily_rollups(
+        self, client, auth_headers, test_user, user_transaction, db_session
+    ):
+        """Test transaction writes keep the daily rollups read by reports in step"""
+        rollup = TransactionDailyRollup.query.filter_by(
+            user_id=test_user.id, type=TransactionType.DEBIT
+        ).one()
+        assert float(rollup.total_amount) == 50.00
+        assert rollup.transaction_count == 1
+
+        user_transaction.amount = 80.00
+        db_session.commit()
+
+        start_date = datetime.today().date() - timedelta(days=30)
+        end_date = datetime.today().date() + timedelta(days=30)
+        url = url_for(
+            "report.transaction-report", start_date=start_date, end_date=end_date
+        )
+
+        response = client.get(url, headers=auth_headers)
+        assert response.status_code == 200
+        assert response.get_json()["total_debit"] == "80.00"
+
+        user_transaction.is_deleted = True
+        db_session.commit()
+
+        response = client.get(url, headers=auth_headers)
+        assert response.get_json()["total_debit"] == "0.00"
+        assert response.get_json()["category_summary"] == []
+
+        user_transaction.is_deleted = False
+        user_transaction.amount = 50.00
+        db_session.commit()
+
+    def test_rollups_dropped_with_deleted_category(
+        self, test_user, user_wallet, db_session
+    ):
+        """Test deleting a category along with its transactions drops their rollups"""
+        category = Category(name="Deleted category", user_id=test_user.id)
+        db_session.add(category)
+        db_session.flush()
+        db_session.add(
+            Transaction(
+                user_id=test_user.id,
+                wallet_id=user_wallet.id,
+                category_id=category.id,
+                amount=20.00,
+                type=TransactionType.DEBIT,
+            )
+        )
+        db_session.commit()
+        category_id = category.id
+
+        db_session.delete(category)
+        db_session.commit()
+
+        assert (
+            TransactionDailyRollup.query.filter_by(category_id=category_id).count() == 0
+        )
+
+    def test_transaction_report_cached_until_data_changes(
+        self, client, auth_headers, test_user, user_transaction, db_session
+    ):
+        """Test repeated reports are served from cache until a transaction changes"""
+        start_date = datetime.today().date() - timedelta(days=30)
+        end_date = datetime.today().date() + timedelta(days=30)
+        url = url_for(
+            "report.transaction-report", start_date=start_date, end_date=end_date
+        )
+
+        with patch(
+            "app.services.report.aggregate_report_transactions",
+            wraps=aggregate_report_transactions,
+        ) as aggregate:
+            first = client.get(url, headers=auth_headers).get_json()
+            second = client.get(url, headers=auth_headers).get_json()
+            assert first == second
+            assert aggregate.call_count == 1
+
+            user_transaction.amount = 70.00
+            db_session.commit()
+
+            third = client.get(url, headers=auth_headers).get_json()
+            assert third["total_debit"] == "70.00"
+            assert aggregate.call_count == 2
+
+        user_transaction.amount = 50.00
+        db_session.commit()
+
+    def test_transaction_time_series(
+        self, client, auth_headers, user_transaction, user_category
+    ):
+        """Test monthly buckets are gap filled and split by category"""
+        today = datetime.today().date()
+        start_date = (today.replace(day=1) - timedelta(days=1)).replace(day=1)
+        url = url_for(
+            "report.transaction-time-series",
+            start_date=start_date,
+            end_date=today,
+            interval="month",
+            group_by="category",
+        )
+
+        response = client.get(url, headers=auth_headers)
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data["interval"] == "month"
+
+        previous_month, current_month = data["series"]
+        assert previous_month["bucket"] == start_date.strftime("%Y-%m-%d")
+        assert previous_month["total_debit"] == "0.00"
+        assert previous_month["categories"] == []
+
+        assert current_month["total_debit"] == "50.00"
+        assert current_month["transaction_count"] == 1
+        assert current_month["categories"][0]["category"]["id"] == str(user_category.id)
+
+    def test_transaction_time_series_invalid_interval(self, client, auth_headers):
+        """Test an unknown bucket size is rejected"""
+        url = url_for(
+            "report.transaction-time-series",
+            start_date="2024-01-01",
+            end_date="2024-12-31",
+            interval="year",
+        )
+        response = client.get(url, headers=auth_headers)
+        assert response.status_code == 400
+
     def test_spending_trends_success(
         self, client, auth_headers, test_user, user_transaction, app
     ):
@@ -0,0 +1,52 @@
+import json
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from app.models.transaction import Transaction, TransactionType
+from app.models.wallet import Wallet
+from app.schemas.transaction import transactions_schema, transactions_column_serializer
+from app.schemas.wallet import wallets_schema, wallets_column_serializer
+
+
+class TestColumnSerializer:
+    """Tests the fast path serializer gives the same output as the schemas"""
+
+    def test_transactions_parity(
+        self, test_user, user_wallet, user_category, db_session
+    ):
+        for i in range(5):
+            db_session.add(
+                Transaction(
+                    user_id=test_user.id,
+                    wallet_id=user_wallet.id,
+                    category_id=user_category.id,
+                    amount=Decimal("10.005") + i,
+                    type=TransactionType.DEBIT if i % 2 else TransactionType.CREDIT,
+                    transaction_at=datetime(2024, 1, 1) + timedelta(hours=i),
+                    description=f"Test {i}" if i % 2 else None,
+                )
+            )
+        db_session.commit()
+
+        query = Transaction.query.filter_by(user_id=test_user.id).order_by(
+            Transaction.transaction_at.desc()
+        )
+
+        expected = transactions_schema.dump(query.all())
+        result = transactions_column_serializer.dump(
+            transactions_column_serializer.select(query).all()
+        )
+
+        assert len(result) == 5
+        assert json.dumps(result) == json.dumps(expected)
+
+    def test_wallets_parity(self, test_user, user_wallet, second_wallet):
+        query = Wallet.query.filter_by(user_id=test_user.id).order_by(Wallet.name)
+
+        expected = wallets_schema.dump(query.all())
+        result = wallets_column_serializer.dump(
+            wallets_column_serializer.select(query).all()
+        )
+
+        assert len(result) >= 2
+        assert json.dumps(result) == json.dumps(expected)
@@ -92,3 +92,16 @@ class TestTransactionGet:
         # Cleanup
         db_session.delete(other_transaction)
         db_session.commit()
+
+    def test_admin_get_deleted_transaction(
+        self, client, user_transaction, admin_headers, db_session
+    ):
+        user_transaction.is_deleted = True
+        db_session.commit()
+        url = url_for("transaction.transaction-detail", id=str(user_transaction.id))
+        response = client.get(url, headers=admin_headers)
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data["is_deleted"] is True
+        assert data["wallet"]["id"] == str(user_transaction.wallet_id)
+        assert data["category"]["id"] == str(user_transaction.category_id)
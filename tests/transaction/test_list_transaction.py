@@ -1,5 +1,11 @@
+import json
+from unittest.mock import patch
 from flask import url_for
+from app.models.category import Category
 from app.models.transaction import Transaction, TransactionType
+from app.models.wallet import Wallet
+from app.utils.pagination import PaginatedResult
+from app.utils.constants import MAX_PAGE_SIZE
 
 
 class TestTransactionList:
@@ -118,3 +124,167 @@ class TestTransactionList:
         data = response.get_json()
         assert len(data["data"]) == 2
         assert data["total_items"] >= 3
+
+    def test_list_cursor_pagination(
+        self, client, auth_headers, test_user, user_wallet, user_category, db_session
+    ):
+        """Test cursor pagination walks all transactions without counting"""
+        for i in range(5):
+            t = Transaction(
+                user_id=test_user.id,
+                wallet_id=user_wallet.id,
+                category_id=user_category.id,
+                amount=10.00,
+                type=TransactionType.DEBIT,
+                description=f"Test {i}",
+            )
+            db_session.add(t)
+        db_session.commit()
+
+        url = url_for("transaction.transactions", pagination="cursor", per_page=2)
+        seen = []
+        while url:
+            response = client.get(url, headers=auth_headers)
+            assert response.status_code == 200
+            data = response.get_json()
+            assert "total_items" not in data
+            assert len(data["data"]) <= 2
+            seen.extend(t["id"] for t in data["data"])
+            url = data["next"]
+
+        assert len(seen) == 5
+        assert len(set(seen)) == 5
+
+    def test_list_with_invalid_cursor(self, client, auth_headers):
+        """Test cursor pagination with a malformed cursor"""
+        url = url_for("transaction.transactions", pagination="cursor", cursor="bad")
+        response = client.get(url, headers=auth_headers)
+        assert response.status_code == 400
+        assert "Invalid pagination cursor" in response.get_json()["error"]
+
+    def test_list_total_refreshed_after_write(
+        self, client, auth_headers, test_user, user_wallet, user_category, db_session
+    ):
+        """Test the cached total count is invalidated by a new transaction"""
+        url = url_for("transaction.transactions")
+        response = client.get(url, headers=auth_headers)
+        assert response.status_code == 200
+        total = response.get_json()["total_items"]
+
+        db_session.add(
+            Transaction(
+                user_id=test_user.id,
+                wallet_id=user_wallet.id,
+                category_id=user_category.id,
+                amount=10.00,
+                type=TransactionType.DEBIT,
+            )
+        )
+        db_session.commit()
+
+        response = client.get(url, headers=auth_headers)
+        assert response.status_code == 200
+        assert response.get_json()["total_items"] == total + 1
+
+    def test_list_total_counted_during_write_not_cached(
+        self, client, auth_headers, test_user, user_wallet, user_category, db_session
+    ):
+        """Test a total counted while a write commits is not served after it"""
+        exact_count = PaginatedResult._exact_count
+
+        def count_then_write(result):
+            total = exact_count(result)
+            db_session.add(
+                Transaction(
+                    user_id=test_user.id,
+                    wallet_id=user_wallet.id,
+                    category_id=user_category.id,
+                    amount=10.00,
+                    type=TransactionType.DEBIT,
+                )
+            )
+            db_session.commit()
+            return total
+
+        url = url_for("transaction.transactions")
+        with patch.object(
+            PaginatedResult, "_exact_count", autospec=True, side_effect=count_then_write
+        ):
+            stale_total = client.get(url, headers=auth_headers).get_json()[
+                "total_items"
+            ]
+
+        response = client.get(url, headers=auth_headers)
+        assert response.get_json()["total_items"] == stale_total + 1
+
+    def test_list_per_page_capped(self, client, auth_headers):
+        """Test per_page is capped at the maximum page size"""
+        url = url_for("transaction.transactions", per_page=10000000)
+        response = client.get(url, headers=auth_headers)
+        assert response.status_code == 200
+        assert response.get_json()["per_page"] == MAX_PAGE_SIZE
+
+    def test_stream_transactions(
+        self, client, auth_headers, user_transaction, child_transaction
+    ):
+        """Test streaming own transactions as NDJSON"""
+        url = url_for("transaction.transactions-stream")
+        response = client.get(url, headers=auth_headers)
+        assert response.status_code == 200
+        assert response.mimetype == "application/x-ndjson"
+
+        rows = [json.loads(line) for line in response.data.decode().splitlines()]
+        assert any(t["id"] == str(user_transaction.id) for t in rows)
+        assert not any(t["id"] == str(child_transaction.id) for t in rows)
+        assert all("wallet" in t and "category" in t for t in rows)
+
+    def test_stream_with_invalid_filter(self, client, auth_headers):
+        """Test streaming with an invalid filter is rejected like the list"""
+        url = url_for("transaction.transactions-stream", wallet_id="not-a-uuid")
+        response = client.get(url, headers=auth_headers)
+        assert response.status_code == 400
+        data = response.get_json()
+        assert "Invalid wallet_id" in data["error"]
+
+    def test_list_query_count_independent_of_page_size(
+        self,
+        app,
+        client,
+        auth_headers,
+        test_user,
+        db_session,
+        query_count,
+    ):
+        """Test nested wallet and category are eager loaded instead of per row"""
+        # Distinct wallets and categories, so each row has its own to load
+        for i in range(6):
+            wallet = Wallet(name=f"Wallet {i}", balance=0.00, user_id=test_user.id)
+            category = Category(
+                name=f"Category {i}", user_id=test_user.id, is_predefined=False
+            )
+            db_session.add_all([wallet, category])
+            db_session.flush()
+            db_session.add(
+                Transaction(
+                    user_id=test_user.id,
+                    wallet_id=wallet.id,
+                    category_id=category.id,
+                    amount=10.00,
+                    type=TransactionType.DEBIT,
+                )
+            )
+        db_session.commit()
+
+        def queries_for(per_page):
+            # Nothing may come from objects already in the identity map
+            db_session.expire_all()
+            url = url_for("transaction.transactions", per_page=per_page)
+            response = client.get(url, headers=auth_headers)
+            assert response.status_code == 200
+            rows = response.get_json()["data"]
+            assert len(rows) == per_page
+            assert len({row["wallet"]["id"] for row in rows}) == per_page
+            return query_count(response)
+
+        queries_for(1)  # warm up the principal and count caches
+        assert queries_for(6) == queries_for(1)
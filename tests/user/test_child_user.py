@@ -1,6 +1,13 @@
 import uuid
 from unittest.mock import patch
 from app.models.user import ParentChildRelation
+from app.services.user import delete_user_account
+from app.utils.child_cache import (
+    NO_CHILD,
+    cache_child_id,
+    get_cached_child_id,
+    invalidate_child_cache,
+)
 from flask import url_for
 
 
@@ -105,3 +112,45 @@ class TestChildUserResource:
             str(data["error"]).lower()
             == "a child user already exists for this user".lower()
         )
+
+    def test_get_child_user_caches_parent_child_lookup(
+        self, client, test_user, child_user, auth_headers, db_session
+    ):
+        """Test the parent->child lookup is cached after the first request"""
+        response = client.get(
+            url_for("user.child-user", id=test_user.id), headers=auth_headers
+        )
+        assert response.status_code == 200
+
+        assert get_cached_child_id(test_user.id) == str(child_user.id)
+
+        invalidate_child_cache(test_user.id)
+        assert get_cached_child_id(test_user.id) is None
+
+    @patch("app.services.user.soft_delete_user_related_objects.delay")
+    @patch("app.services.user.invalidate_user_principals")
+    def test_delete_child_invalidates_parent_principal(
+        self, invalidate_mock, delete_task_mock, test_user, child_user, db_session
+    ):
+        """Test deleting a child drops the parent's cached principal too"""
+        delete_user_account(test_user, child_user)
+
+        invalidated = {call.args[0] for call in invalidate_mock.call_args_list}
+        assert invalidated == {child_user.id, test_user.id}
+
+    def test_get_child_ignores_cached_deleted_child(
+        self, test_user, child_user, db_session
+    ):
+        """Test a cached child id is dropped once the child is soft deleted"""
+        cache_child_id(test_user.id, child_user.id)
+        # Deleted without invalidating the parent's cache entry
+        child_user.is_deleted = True
+        db_session.commit()
+
+        try:
+            assert test_user.get_child() is None
+            assert get_cached_child_id(test_user.id) == NO_CHILD
+        finally:
+            child_user.is_deleted = False
+            db_session.commit()
+            invalidate_child_cache(test_user.id)
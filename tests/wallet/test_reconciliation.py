@@ -0,0 +1,36 @@
+from decimal import Decimal
+
+from app.services.reconciliation import partition_bounds, reconcile_user_range
+
+
+class TestReconciliation:
+    def test_reconcile_repairs_drifted_wallet_and_budget(
+        self, db_session, test_user, user_wallet, user_transaction, user_budget
+    ):
+        """Test wallet balance and budget spending are recomputed from transactions"""
+        user_wallet.balance = Decimal("999.00")
+        user_budget.spent_amount = Decimal("0.00")
+        db_session.commit()
+
+        metrics = reconcile_user_range(test_user.id, test_user.id)
+
+        db_session.refresh(user_wallet)
+        db_session.refresh(user_budget)
+        assert user_wallet.balance == Decimal("-50.00")
+        assert user_budget.spent_amount == Decimal("50.00")
+        assert metrics["wallets_repaired"] == 1
+        assert metrics["budgets_repaired"] == 1
+
+        # A second pass finds nothing left to repair
+        metrics = reconcile_user_range(test_user.id, test_user.id)
+        assert metrics["wallets_repaired"] == 0
+        assert metrics["budgets_repaired"] == 0
+
+    def test_partitions_cover_the_uuid_space(self, test_user):
+        """Test every user id falls in exactly one partition"""
+        matches = []
+        for partition in range(4):
+            lower, upper = partition_bounds(partition, 4)
+            if lower <= test_user.id and (upper is None or test_user.id < upper):
+                matches.append(partition)
+        assert len(matches) == 1